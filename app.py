@@ -2,17 +2,32 @@ import streamlit as st
 import os
 from PIL import Image, ImageDraw
 
-# ================= IMPORT VIEWS =================
-from views.upload import upload_page
-from views.preprocessing import preprocessing_page
-from views.eda import eda_page
-from views.supervised import supervised_learning_page
-from views.kmeans_clustering import kmeans_clustering_page
-from views.factor_analysis import factor_analysis_page
-from views.arm import arm_page
-from views.pca import pca_page          # ✅ PCA ADDED
-from views.model import model_page
-from views.prediction import prediction_page
+# ================= VIEW REGISTRY =================
+# Page modules are imported lazily on first visit (see views/loader.py),
+# so heavy dependencies like shap / sklearn only load when needed.
+from views.loader import run_page, import_report, page_load_times
+from views.perf_panel import render_perf_panel
+from views.session import render_memory_panel, render_precision_panel, active_imputation, active_outlier_filter
+from views.resources import render_resource_panel
+from engine.governor import get_governor
+from engine.precision import DEFAULT_PRECISION, set_precision
+from perf import StageRecorder, recording, stage
+
+PAGES = {
+    "📂 Upload Dataset": ("views.upload", "upload_page"),
+    "🛠️ Preprocessing Stage": ("views.preprocessing", "preprocessing_page"),
+    "📊 EDA": ("views.eda", "eda_page"),
+    "📉 Factor Analysis": ("views.factor_analysis", "factor_analysis_page"),
+    "📉 PCA": ("views.pca", "pca_page"),                          # ✅ PCA ADDED
+    "📊 K-Means Clustering": ("views.kmeans_clustering", "kmeans_clustering_page"),
+    "🧩 Mixed-Type Clustering": ("views.mixed_clustering", "mixed_clustering_page"),
+    "🌀 Density Clustering": ("views.density_clustering", "density_clustering_page"),
+    "🌳 Hierarchical Clustering": ("views.hierarchical_clustering", "hierarchical_clustering_page"),
+    "🧺 Association Rule Mining": ("views.arm", "arm_page"),
+    "⚙️ Supervised Learning": ("views.supervised", "supervised_learning_page"),
+    "🤖 Model Building": ("views.model", "model_page"),
+    "📈 Prediction & Insights": ("views.prediction", "prediction_page"),
+}
 
 
 # ================= PAGE CONFIG =================
@@ -45,16 +60,19 @@ logo_path = os.path.join(
     "logo1.png"
 )
 
-if os.path.exists(logo_path):
-    img = Image.open(logo_path).convert("RGBA")
+@st.cache_resource
+def load_circular_logo(path):
+    img = Image.open(path).convert("RGBA")
     img = img.resize((110, 110))
 
     mask = Image.new("L", (110, 110), 0)
     draw = ImageDraw.Draw(mask)
     draw.ellipse((0, 0, 110, 110), fill=255)
     img.putalpha(mask)
+    return img
 
-    st.sidebar.image(img)
+if os.path.exists(logo_path):
+    st.sidebar.image(load_circular_logo(logo_path))
 else:
     st.sidebar.warning("Logo not found")
 
@@ -65,53 +83,64 @@ st.sidebar.title("DataThon_X")
 
 page = st.sidebar.radio(
     "Navigation",
-    [
-        "📂 Upload Dataset",
-        "🛠️ Preprocessing Stage",
-        "📊 EDA",
-        "📉 Factor Analysis",
-        "📉 PCA",                        # ✅ PCA OPTION
-        "📊 K-Means Clustering",
-        "🧺 Association Rule Mining",
-        "⚙️ Supervised Learning",
-        "🤖 Model Building",
-        "📈 Prediction & Insights",
-    ],
+    list(PAGES.keys()),
     index=0
 )
 
 
-# ================= MAIN ROUTING =================
-
-if page == "📂 Upload Dataset":
-    upload_page()
-
-elif page == "🛠️ Preprocessing Stage":
-    preprocessing_page()
-
-elif page == "📊 EDA":
-    eda_page()
+imputation = active_imputation()
+if imputation is not None:
+    st.sidebar.caption(f"🩹 Analysis pages use imputed data ({imputation['label']}).")
+outlier_filter = active_outlier_filter()
+if outlier_filter is not None:
+    st.sidebar.caption(f"🎯 {outlier_filter['excluded']:,} outlier rows excluded from analysis pages.")
 
-elif page == "📉 Factor Analysis":
-    factor_analysis_page()
 
-elif page == "📉 PCA":                 # ✅ PCA ROUTE
-    pca_page()
-
-elif page == "📊 K-Means Clustering":
-    kmeans_clustering_page()
-
-elif page == "🧺 Association Rule Mining":
-    arm_page()
-
-elif page == "⚙️ Supervised Learning":
-    supervised_learning_page()
+# ================= MAIN ROUTING =================
 
-elif page == "🤖 Model Building":
-    model_page()
+# Every rerun gets a fresh recorder; views mark their hot paths with stage()
+recorder = StageRecorder(
+    label=page,
+    track_memory=st.session_state.get("perf_track_memory", False)
+)
 
-elif page == "📈 Prediction & Insights":
-    prediction_page()
+# Row-sized matrices are built in the precision chosen in the sidebar
+set_precision(st.session_state.get("compute_precision", DEFAULT_PRECISION))
+
+# Caps the app process's BLAS / OpenMP pools to the session thread budget;
+# compute-heavy stages take their CPU leases from the same governor
+get_governor()
+
+with recording(recorder):
+    with stage(f"page: {PAGES[page][0]}"):
+        run_page(*PAGES[page])
+
+render_perf_panel(recorder)
+render_memory_panel()
+render_precision_panel()
+render_resource_panel()
+
+
+# ================= IMPORT TIME REPORT =================
+
+with st.sidebar.expander("⏱️ Import Times"):
+    report = import_report()
+    if report:
+        st.caption("First-visit load time per page (ms)")
+        st.dataframe(
+            [
+                {"Page Module": name, "Load (ms)": ms}
+                for name, ms in page_load_times().items()
+            ],
+            hide_index=True
+        )
+        st.caption("Slowest imported modules")
+        st.dataframe(
+            sorted(report, key=lambda r: r["Self (ms)"], reverse=True)[:25],
+            hide_index=True
+        )
+    else:
+        st.caption("No page modules loaded yet.")
 
 
 # ================= FOOTER =================
@@ -0,0 +1,161 @@
+import io
+
+import numpy as np
+import pandas as pd
+
+from engine import arm, clustering, eda, factor, pca, profiling, supervised
+
+
+# ===============================
+# Benchmark Cases
+# ===============================
+# Each case runs the engine functions behind one page, exactly as the
+# page calls them. `prepare(df)` builds the inputs (untimed) and returns a
+# zero-argument callable that is timed by the runner.
+
+def _features(df):
+    cols = df.select_dtypes(include=["int64", "float64"]).columns
+    return [c for c in cols if c != "target"]
+
+
+# ---------- Upload ----------
+def prepare_ingest(df):
+    payload = df.to_csv(index=False).encode()
+
+    def run():
+        return pd.read_csv(io.BytesIO(payload))
+
+    return run
+
+
+# ---------- Preprocessing ----------
+def prepare_profiling(df):
+    def run():
+        return profiling.column_quality_summary(df), profiling.duplicate_rows(df)
+
+    return run
+
+
+# ---------- EDA ----------
+def prepare_correlation(df):
+    def run():
+        return (
+            eda.pearson_with_target(df, "target"),
+            eda.spearman_with_target(df, "target")
+        )
+
+    return run
+
+
+def prepare_shap(df):
+    X, y = eda.shap_inputs(df, "target")
+
+    def run():
+        return eda.shap_importance(X, y)
+
+    return run
+
+
+# ---------- PCA ----------
+def prepare_pca(df):
+    features = _features(df)
+
+    def run():
+        return pca.run_pca(df, features, n_components=2)
+
+    return run
+
+
+# ---------- Factor Analysis ----------
+def prepare_factor_analysis(df):
+    data = factor.prepare_factor_data(df, _features(df))
+
+    def run():
+        return factor.run_factor_analysis(data, 3)
+
+    return run
+
+
+# ---------- K-Means ----------
+def prepare_kmeans_elbow(df):
+    data = df[_features(df)].dropna()
+
+    def run():
+        X_scaled, _ = pca.standardize(data)
+        return clustering.elbow_inertia(X_scaled)
+
+    return run
+
+
+def prepare_k_selection(df):
+    data = df[_features(df)].dropna()
+
+    def run():
+        X_scaled, _ = pca.standardize(data)
+        return clustering.k_selection_diagnostics(X_scaled)
+
+    return run
+
+
+def prepare_kprototypes(df):
+    categorical = df.select_dtypes(exclude=np.number).columns.tolist()
+    encoded = clustering.encode_mixed(df, _features(df), categorical)
+
+    def run():
+        return clustering.fit_kprototypes(encoded, 5, n_init=1)
+
+    return run
+
+
+def prepare_cluster_profile(df):
+    features = _features(df)
+    labels = np.random.default_rng(0).integers(0, 8, len(df))
+
+    def run():
+        return clustering.profile_clusters(df, labels, features)
+
+    return run
+
+
+# ---------- ARM ----------
+def prepare_apriori(df):
+    cols = (
+        df.select_dtypes(exclude=np.number).columns.tolist()[:6]
+        or _features(df)[:4]
+    )
+
+    def run():
+        encoded = arm.encode_transactions(df, cols)
+        itemsets = arm.frequent_itemsets(encoded, 0.05)
+        if itemsets.empty:
+            return itemsets
+        return arm.mine_rules(itemsets, 0.6, 1.2)
+
+    return run
+
+
+# ---------- Supervised ----------
+def prepare_supervised(df):
+    clean = df.dropna()
+
+    def run():
+        X, y = supervised.prepare_features(clean, "target")
+        return supervised.train_and_evaluate(X, y, "Regression")
+
+    return run
+
+
+CASES = {
+    "ingest": prepare_ingest,
+    "profiling": prepare_profiling,
+    "correlation": prepare_correlation,
+    "shap": prepare_shap,
+    "pca": prepare_pca,
+    "factor_analysis": prepare_factor_analysis,
+    "kmeans_elbow": prepare_kmeans_elbow,
+    "k_selection": prepare_k_selection,
+    "kprototypes": prepare_kprototypes,
+    "cluster_profile": prepare_cluster_profile,
+    "apriori": prepare_apriori,
+    "supervised": prepare_supervised,
+}
@@ -0,0 +1,76 @@
+import numpy as np
+import pandas as pd
+
+
+# ===============================
+# Synthetic Survey-like Datasets
+# ===============================
+# Numeric columns are generated from a small latent factor model and then
+# binned to Likert scales (or left continuous), so factor analysis, PCA and
+# clustering see realistic correlation structure. Categorical columns carry
+# `cardinality` string levels whose frequencies follow a Zipf-like curve.
+# A numeric "target" is a noisy linear function of the latent factors.
+
+def make_survey_dataset(
+    rows,
+    cols,
+    cardinality=5,
+    categorical_share=0.3,
+    continuous_share=0.3,
+    n_factors=3,
+    missing_rate=0.0,
+    seed=42
+):
+    rng = np.random.default_rng(seed)
+
+    n_cat = int(round(cols * categorical_share))
+    n_num = max(cols - n_cat, 2)
+    n_cont = int(round(n_num * continuous_share))
+    n_likert = n_num - n_cont
+
+    latent = rng.standard_normal((rows, n_factors))
+    loadings = rng.uniform(0.4, 0.9, (n_factors, n_num)) * (
+        rng.random((n_factors, n_num)) < 0.6
+    )
+    numeric = latent @ loadings + rng.standard_normal((rows, n_num)) * 0.6
+
+    data = {}
+
+    # ---------- Likert (1..5) ----------
+    cuts = np.array([-1.2, -0.4, 0.4, 1.2])
+    for j in range(n_likert):
+        data[f"q{j + 1}"] = (np.searchsorted(cuts, numeric[:, j]) + 1).astype("int64")
+
+    # ---------- Continuous ----------
+    for j in range(n_cont):
+        data[f"x{j + 1}"] = numeric[:, n_likert + j] * 10 + 50
+
+    # ---------- Categorical ----------
+    weights = 1.0 / np.arange(1, cardinality + 1)
+    weights /= weights.sum()
+    for j in range(n_cat):
+        levels = np.array([f"c{j + 1}_{v}" for v in range(cardinality)], dtype=object)
+        # Tie the category to a latent factor so ARM / Spearman find signal
+        shift = np.argsort(np.argsort(latent[:, j % n_factors])) * cardinality // rows
+        base = rng.choice(cardinality, size=rows, p=weights)
+        codes = np.where(rng.random(rows) < 0.5, shift, base)
+        data[f"cat{j + 1}"] = levels[codes]
+
+    data["target"] = latent @ rng.uniform(0.5, 1.5, n_factors) + rng.standard_normal(rows)
+
+    df = pd.DataFrame(data)
+
+    if missing_rate > 0:
+        feature_cols = [c for c in df.columns if c != "target"]
+        mask = rng.random((rows, len(feature_cols))) < missing_rate
+        for j, col in enumerate(feature_cols):
+            if mask[:, j].any():
+                if df[col].dtype == "int64":
+                    df[col] = df[col].astype("float64")
+                df.loc[mask[:, j], col] = np.nan
+
+    return df
+
+
+def parse_grid(spec):
+    return [int(float(v)) for v in str(spec).split(",") if v.strip()]
@@ -0,0 +1,198 @@
+"""Headless benchmark runner for the page computations.
+
+Usage:
+
+    python -m benchmarks.run --rows 1000,10000,100000 --cols 20 --cardinality 5
+    python -m benchmarks.run --cases pca,kmeans_elbow --save-baseline
+    python -m benchmarks.run --fail-on-regression
+
+Every (case, rows, cols, cardinality) point is timed `--repeat` times
+without memory tracing, then once more with tracemalloc for peak memory.
+Results are written as JSON and compared against the stored baseline.
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+
+from perf import StageRecorder, recording, stage
+from benchmarks.cases import CASES
+from benchmarks.datasets import make_survey_dataset, parse_grid
+
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_BASELINE = os.path.join(HERE, "baseline.json")
+DEFAULT_OUTPUT = os.path.join(HERE, "results.json")
+
+
+# ===============================
+# Measurement
+# ===============================
+def _measure(run, repeat):
+    timings = StageRecorder(label="timing", track_memory=False)
+    with recording(timings):
+        for _ in range(repeat):
+            with stage("run"):
+                run()
+
+    memory = StageRecorder(label="memory", track_memory=True)
+    with recording(memory):
+        with stage("run"):
+            run()
+
+    # Engine functions record their own nested stages; keep the outer run
+    runs = [r for r in timings.records if r["depth"] == 0]
+    walls = [r["wall_ms"] for r in runs]
+    cpus = [r["cpu_ms"] for r in runs]
+    peak = next(r["peak_mb"] for r in memory.records if r["depth"] == 0)
+    return {
+        "wall_ms_median": statistics.median(walls),
+        "wall_ms_min": min(walls),
+        "cpu_ms_median": statistics.median(cpus),
+        "peak_mb": peak
+    }
+
+
+def run_suite(rows_grid, cols_grid, card_grid, cases, repeat=3, seed=42, log=print):
+    results = []
+    for rows in rows_grid:
+        for cols in cols_grid:
+            for cardinality in card_grid:
+                df = make_survey_dataset(rows, cols, cardinality=cardinality, seed=seed)
+                for name in cases:
+                    run = CASES[name](df)
+                    stats = _measure(run, repeat)
+                    stats["rows_per_s"] = rows / (stats["wall_ms_median"] / 1000)
+                    results.append({
+                        "case": name,
+                        "rows": rows,
+                        "cols": cols,
+                        "cardinality": cardinality,
+                        **stats
+                    })
+                    log(
+                        f"{name:<16} rows={rows:<9} cols={cols:<4} card={cardinality:<4} "
+                        f"wall={stats['wall_ms_median']:>10.1f} ms  "
+                        f"peak={stats['peak_mb']:>8.1f} MB"
+                    )
+    return results
+
+
+# ===============================
+# Baseline Comparison
+# ===============================
+def _key(r):
+    return (r["case"], r["rows"], r["cols"], r["cardinality"])
+
+
+def compare(results, baseline, tolerance):
+    base = {_key(r): r for r in baseline.get("results", [])}
+    comparison = []
+    for r in results:
+        b = base.get(_key(r))
+        if b is None:
+            status, ratio = "new", None
+        else:
+            ratio = r["wall_ms_median"] / max(b["wall_ms_median"], 1e-9)
+            if ratio > 1 + tolerance:
+                status = "regression"
+            elif ratio < 1 - tolerance:
+                status = "improvement"
+            else:
+                status = "unchanged"
+        comparison.append({
+            "case": r["case"],
+            "rows": r["rows"],
+            "cols": r["cols"],
+            "cardinality": r["cardinality"],
+            "wall_ratio": ratio,
+            "peak_mb_delta": None if b is None else r["peak_mb"] - b["peak_mb"],
+            "status": status
+        })
+    return comparison
+
+
+def environment():
+    import numpy
+    import pandas
+    import sklearn
+
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "numpy": numpy.__version__,
+        "pandas": pandas.__version__,
+        "sklearn": sklearn.__version__
+    }
+
+
+# ===============================
+# CLI
+# ===============================
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the analysis cores headlessly.")
+    parser.add_argument("--rows", default="1000,10000", help="comma-separated row counts")
+    parser.add_argument("--cols", default="20", help="comma-separated column counts")
+    parser.add_argument("--cardinality", default="5", help="comma-separated category counts")
+    parser.add_argument("--cases", default=",".join(CASES), help="comma-separated case names")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", default=DEFAULT_OUTPUT)
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="relative wall-time change treated as noise")
+    parser.add_argument("--save-baseline", action="store_true",
+                        help="store these results as the new baseline")
+    parser.add_argument("--fail-on-regression", action="store_true")
+    args = parser.parse_args(argv)
+
+    cases = [c.strip() for c in args.cases.split(",") if c.strip()]
+    unknown = sorted(set(cases) - set(CASES))
+    if unknown:
+        parser.error(f"unknown cases: {', '.join(unknown)}")
+
+    results = run_suite(
+        parse_grid(args.rows),
+        parse_grid(args.cols),
+        parse_grid(args.cardinality),
+        cases,
+        repeat=args.repeat,
+        seed=args.seed
+    )
+
+    report = {"environment": environment(), "results": results}
+
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            report["comparison"] = compare(results, json.load(f), args.tolerance)
+        for c in report["comparison"]:
+            if c["status"] != "unchanged":
+                ratio = "-" if c["wall_ratio"] is None else f"{c['wall_ratio']:.2f}x"
+                print(f"{c['status']:<12} {c['case']:<16} rows={c['rows']} "
+                      f"cols={c['cols']} card={c['cardinality']} {ratio}")
+    else:
+        print(f"No baseline at {args.baseline}; run with --save-baseline to create one.")
+
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {args.output}")
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump({"environment": report["environment"], "results": results}, f, indent=2)
+        print(f"Baseline saved to {args.baseline}")
+
+    regressions = [c for c in report.get("comparison", []) if c["status"] == "regression"]
+    if args.fail_on_regression and regressions:
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,2 @@
+# Headless analysis engine: pure functions over frames / arrays, shared by
+# the Streamlit views, the batch CLI (`python -m engine`) and benchmarks.
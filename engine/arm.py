@@ -0,0 +1,68 @@
+import pandas as pd
+
+from perf import stage
+
+
+# ===============================
+# Transactions
+# ===============================
+def encode_transactions(df, cols):
+    from mlxtend.preprocessing import TransactionEncoder
+
+    with stage("transaction encoding"):
+        # Missing answers are left out of a transaction instead of
+        # becoming a "nan" item
+        values = df[cols].to_numpy(dtype=object)
+        missing = pd.isna(values)
+        transactions = [
+            [str(v) for v, m in zip(row, row_missing) if not m]
+            for row, row_missing in zip(values, missing)
+        ]
+
+        te = TransactionEncoder()
+        te_array = te.fit(transactions).transform(transactions)
+        return pd.DataFrame(te_array, columns=te.columns_)
+
+
+# ===============================
+# Itemsets & Rules
+# ===============================
+def frequent_itemsets(df_encoded, min_support):
+    from mlxtend.frequent_patterns import apriori
+
+    with stage("apriori"):
+        return apriori(
+            df_encoded,
+            min_support=min_support,
+            use_colnames=True
+        )
+
+
+def mine_rules(itemsets, min_confidence, min_lift):
+    from mlxtend.frequent_patterns import association_rules
+
+    with stage("association rules"):
+        rules = association_rules(
+            itemsets,
+            metric="confidence",
+            min_threshold=min_confidence
+        )
+
+        rules = rules[rules["lift"] >= min_lift].copy()
+
+    rules["antecedents_str"] = rules["antecedents"].apply(lambda x: ", ".join(list(x)))
+    rules["consequents_str"] = rules["consequents"].apply(lambda x: ", ".join(list(x)))
+    rules["antecedent_len"] = rules["antecedents"].apply(len)
+    return rules
+
+
+def mine_association_rules(df_encoded, min_support, min_confidence, min_lift, progress=None):
+    if progress:
+        progress(0.0, "mining frequent itemsets")
+    itemsets = frequent_itemsets(df_encoded, min_support)
+    if itemsets.empty:
+        return itemsets, None
+
+    if progress:
+        progress(0.7, "generating rules")
+    return itemsets, mine_rules(itemsets, min_confidence, min_lift)
@@ -0,0 +1,187 @@
+"""Run the full analysis pipeline over one or many files, without a UI.
+
+Usage:
+
+    python -m engine analyze survey.csv --target Satisfaction --out results/
+    python -m engine analyze data/ "exports/*.parquet" --jobs 8 --steps profile,pca,kmeans
+    python -m engine analyze big.parquet --precision float32
+
+Each input gets its own sub-directory under --out, named after the file
+(with a short hash of its path when two inputs share a name), with one CSV
+per output table plus summary.json (metrics, skipped steps, errors and
+timings).
+A batch index is written to --out/index.json.
+
+Assign new records to a segmentation saved from the K-Means page:
+
+    python -m engine assign segmentation.npz new_customers.csv --out labels.parquet --id-column CustomerID
+"""
+
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from perf import StageRecorder, recording
+
+
+SUPPORTED = (".csv", ".parquet")
+
+
+def _expand_inputs(patterns):
+    paths = []
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            for name in sorted(os.listdir(pattern)):
+                if name.lower().endswith(SUPPORTED):
+                    paths.append(os.path.join(pattern, name))
+        else:
+            paths.extend(sorted(glob.glob(pattern)) or [pattern])
+    # A file matched by several patterns is analyzed once
+    unique = {}
+    for path in paths:
+        unique.setdefault(os.path.abspath(path), path)
+    return list(unique.values())
+
+
+def _output_names(paths):
+    import hashlib
+    from collections import Counter
+
+    stems = [os.path.splitext(os.path.basename(p))[0] for p in paths]
+    counts = Counter(stems)
+    return {
+        p: stem if counts[stem] == 1
+        else f"{stem}-{hashlib.sha1(os.path.abspath(p).encode()).hexdigest()[:8]}"
+        for p, stem in zip(paths, stems)
+    }
+
+
+def analyze_file(path, out_root, config, name=None):
+    from engine.io import read_table
+    from engine.pipeline import run_analysis, write_outputs
+
+    name = name or os.path.splitext(os.path.basename(path))[0]
+    out_dir = os.path.join(out_root, name)
+    recorder = StageRecorder(label=name, track_memory=False)
+    start = time.perf_counter()
+
+    with recording(recorder):
+        df = read_table(path)
+        outputs, summary = run_analysis(df, config)
+
+    summary["source"] = os.path.abspath(path)
+    summary["seconds"] = round(time.perf_counter() - start, 3)
+    summary["stages"] = recorder.summary()
+    write_outputs(outputs, summary, out_dir)
+    return {"source": path, "output": out_dir, "errors": summary["errors"]}
+
+
+def build_parser():
+    from engine.pipeline import STEPS
+
+    parser = argparse.ArgumentParser(prog="python -m engine")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("analyze", help="run the analysis pipeline on files")
+    p.add_argument("inputs", nargs="+", help="files, directories or glob patterns")
+    p.add_argument("--out", default="analysis_output")
+    p.add_argument("--target")
+    p.add_argument("--drop", nargs="*", default=[], help="columns to drop first")
+    p.add_argument("--steps", default=",".join(STEPS))
+    p.add_argument("--components", type=int, help="PCA components")
+    p.add_argument("--factors", type=int, help="number of factors")
+    p.add_argument("--k", type=int, help="number of clusters")
+    p.add_argument("--arm-columns", nargs="*")
+    p.add_argument("--min-support", type=float)
+    p.add_argument("--min-confidence", type=float)
+    p.add_argument("--min-lift", type=float)
+    p.add_argument("--jobs", type=int, default=1, help="files processed in parallel")
+    p.add_argument("--precision", choices=["float64", "float32"],
+                   help="precision of row-sized matrices (default: $COMPUTE_PRECISION or float64)")
+
+    a = sub.add_parser("assign", help="assign rows to a saved K-Means segmentation")
+    a.add_argument("segmentation", help=".npz file saved from the K-Means page")
+    a.add_argument("input", help="CSV or Parquet file with the segmentation features")
+    a.add_argument("--out", required=True, help="output .csv or .parquet")
+    a.add_argument("--id-column", help="column copied next to each label (default: row number)")
+    return parser
+
+
+def assign_main(args):
+    from engine.segmentation import load_segmentation, assign_file
+
+    start = time.perf_counter()
+    segmentation = load_segmentation(args.segmentation)
+    result = assign_file(args.input, segmentation, args.out, id_column=args.id_column)
+    seconds = time.perf_counter() - start
+
+    print(f"Assigned {result['rows']:,} rows in {seconds:.1f}s to {args.out}")
+    for cluster, rows in result["sizes"].items():
+        print(f"  cluster {cluster}: {rows:,}")
+    if result["unassigned"]:
+        print(f"  unassigned (missing features): {result['unassigned']:,}")
+    return 0
+
+
+def main(argv=None):
+    from engine.pipeline import STEPS, default_config
+
+    args = build_parser().parse_args(argv)
+    if args.command == "assign":
+        return assign_main(args)
+
+    steps = [s.strip() for s in args.steps.split(",") if s.strip()]
+    unknown = sorted(set(steps) - set(STEPS))
+    if unknown:
+        print(f"Unknown steps: {', '.join(unknown)}", file=sys.stderr)
+        return 2
+
+    config = default_config(
+        target=args.target,
+        drop_columns=args.drop,
+        steps=steps,
+        components=args.components,
+        factors=args.factors,
+        k=args.k,
+        arm_columns=args.arm_columns,
+        min_support=args.min_support,
+        min_confidence=args.min_confidence,
+        min_lift=args.min_lift,
+        precision=args.precision
+    )
+
+    paths = _expand_inputs(args.inputs)
+    names = _output_names(paths)
+    os.makedirs(args.out, exist_ok=True)
+    index = []
+
+    if args.jobs > 1 and len(paths) > 1:
+        with ProcessPoolExecutor(max_workers=args.jobs) as pool:
+            futures = {pool.submit(analyze_file, p, args.out, config, names[p]): p for p in paths}
+            for fut in as_completed(futures):
+                index.append(_collect(futures[fut], fut))
+    else:
+        for path in paths:
+            index.append(_collect(path, None, lambda p=path: analyze_file(p, args.out, config, names[p])))
+
+    with open(os.path.join(args.out, "index.json"), "w") as f:
+        json.dump(index, f, indent=2)
+
+    failed = [r for r in index if "failure" in r]
+    print(f"Analyzed {len(index) - len(failed)}/{len(index)} files into {args.out}")
+    return 1 if failed else 0
+
+
+def _collect(path, future, call=None):
+    try:
+        result = future.result() if future is not None else call()
+        status = "with step errors" if result["errors"] else "ok"
+        print(f"{status:<16} {path}")
+        return result
+    except Exception as exc:
+        print(f"{'failed':<16} {path}: {exc}", file=sys.stderr)
+        return {"source": path, "failure": f"{type(exc).__name__}: {exc}"}
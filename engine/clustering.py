@@ -0,0 +1,746 @@
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from perf import stage
+
+
+# ===============================
+# K-Means
+# ===============================
+def elbow_inertia(X_scaled, k_range=range(1, 11), n_init=10, random_state=42, progress=None):
+    from sklearn.cluster import KMeans
+
+    k_range = list(k_range)
+    with stage("elbow loop"):
+        inertia = []
+        for i, k in enumerate(k_range):
+            if progress:
+                progress(i / len(k_range), f"fitting K={k}")
+            km = KMeans(n_clusters=k, random_state=random_state, n_init=n_init)
+            km.fit(X_scaled)
+            inertia.append(km.inertia_)
+    return inertia
+
+
+# ===============================
+# K Selection on a Coreset
+# ===============================
+# Candidate K values are compared on a lightweight coreset (Bachem et al.,
+# 2018): points are sampled with probability mixing uniform and squared
+# distance to the mean, and weighted by the inverse probability, so
+# weighted k-means on the coreset approximates k-means on the full data.
+# Scores that need labels on real points (inertia, silhouette,
+# Calinski-Harabasz, Davies-Bouldin, gap) are computed on a separate
+# uniform holdout sample; inertia is scaled to the full data with a
+# standard-error band, which bounds the estimate's error.
+
+CORESET_CHUNK_ROWS = 50_000
+
+
+def lightweight_coreset(X, size, random_state=42):
+    # X keeps its dtype (float32 input is not widened); distances are
+    # accumulated in float64 over row chunks, and only the coreset itself
+    # is returned as float64
+    rng = np.random.default_rng(random_state)
+    n = len(X)
+    if n <= size:
+        return X.astype(float), np.ones(n)
+
+    mean = X.mean(axis=0, dtype=float)
+    d2 = np.empty(n)
+    for s in range(0, n, CORESET_CHUNK_ROWS):
+        D = X[s:s + CORESET_CHUNK_ROWS] - mean.astype(X.dtype)
+        d2[s:s + CORESET_CHUNK_ROWS] = np.einsum("ij,ij->i", D, D, dtype=float)
+    q = 0.5 / n + 0.5 * d2 / d2.sum() if d2.sum() > 0 else np.full(n, 1.0 / n)
+    idx = rng.choice(n, size=size, replace=True, p=q / q.sum())
+    return X[idx].astype(float), 1.0 / (size * q[idx])
+
+
+def _log_dispersion(X, k, random_state):
+    from sklearn.cluster import KMeans
+
+    km = KMeans(n_clusters=k, n_init=1, random_state=random_state).fit(X)
+    return np.log(max(km.inertia_, 1e-12))
+
+
+def k_selection_diagnostics(X_scaled, k_range=range(1, 11), coreset_size=5000,
+                            sample_size=2000, n_refs=5, n_init=3,
+                            random_state=42, progress=None):
+    from sklearn.cluster import KMeans
+    from sklearn.metrics import (
+        silhouette_score,
+        calinski_harabasz_score,
+        davies_bouldin_score
+    )
+
+    X = np.asarray(X_scaled)
+    n = len(X)
+    rng = np.random.default_rng(random_state)
+    k_range = [k for k in k_range if k <= n]
+
+    with stage("coreset sampling"):
+        C, weights = lightweight_coreset(X, coreset_size, random_state)
+        H = X[rng.choice(n, size=min(sample_size, n), replace=False)].astype(float)
+        lo, hi = H.min(axis=0), H.max(axis=0)
+        refs = [rng.uniform(lo, hi, size=H.shape) for _ in range(n_refs)]
+
+    rows = []
+    with stage("k selection"):
+        for i, k in enumerate(k_range):
+            if progress:
+                progress(i / len(k_range), f"scoring K={k}")
+
+            km = KMeans(n_clusters=k, n_init=n_init, random_state=random_state)
+            km.fit(C, sample_weight=weights)
+
+            labels = km.predict(H)
+            d2 = ((H - km.cluster_centers_[labels]) ** 2).sum(axis=1)
+            inertia = n * d2.mean()
+            inertia_se = n * d2.std(ddof=1) / np.sqrt(len(H)) if len(H) > 1 else 0.0
+
+            scored = 1 < len(np.unique(labels)) < len(H)
+            # Gap statistic: the sample and every reference are clustered the
+            # same way, so both dispersions are optimised alike
+            log_w = _log_dispersion(H, k, random_state)
+            ref_log_w = np.array([_log_dispersion(R, k, random_state) for R in refs])
+
+            rows.append({
+                "k": k,
+                "inertia": inertia,
+                "inertia_low": inertia - 1.96 * inertia_se,
+                "inertia_high": inertia + 1.96 * inertia_se,
+                "silhouette": silhouette_score(H, labels) if scored else np.nan,
+                "calinski_harabasz": calinski_harabasz_score(H, labels) if scored else np.nan,
+                "davies_bouldin": davies_bouldin_score(H, labels) if scored else np.nan,
+                "gap": ref_log_w.mean() - log_w,
+                "gap_se": ref_log_w.std() * np.sqrt(1 + 1 / n_refs)
+            })
+
+    table = pd.DataFrame(rows).set_index("k")
+    return {
+        "table": table,
+        "coreset_size": len(C),
+        "sample_size": len(H),
+        "suggested": suggest_k(table)
+    }
+
+
+def suggest_k(table):
+    suggested = {}
+    scored = table.dropna(subset=["silhouette"])
+    if not scored.empty:
+        suggested["silhouette"] = int(scored["silhouette"].idxmax())
+        suggested["calinski_harabasz"] = int(scored["calinski_harabasz"].idxmax())
+        suggested["davies_bouldin"] = int(scored["davies_bouldin"].idxmin())
+
+    # Tibshirani's rule: smallest k with gap(k) >= gap(k+1) - s(k+1)
+    ks = list(table.index)
+    for k, k_next in zip(ks, ks[1:]):
+        if table.loc[k, "gap"] >= table.loc[k_next, "gap"] - table.loc[k_next, "gap_se"]:
+            suggested["gap"] = int(k)
+            break
+    else:
+        suggested["gap"] = int(ks[-1]) if ks else None
+    return suggested
+
+
+def fit_kmeans(X_scaled, k, n_init=10, random_state=42, init=None):
+    from sklearn.cluster import KMeans
+
+    with stage("kmeans fit", warm=init is not None):
+        if init is not None:
+            kmeans = KMeans(n_clusters=k, init=init, n_init=1, random_state=random_state)
+        else:
+            kmeans = KMeans(n_clusters=k, random_state=random_state, n_init=n_init)
+        labels = kmeans.fit_predict(X_scaled)
+
+    return {
+        "labels": labels,
+        "centers": kmeans.cluster_centers_,
+        "inertia": kmeans.inertia_
+    }
+
+
+# ===============================
+# Nearest-centroid Assignment
+# ===============================
+ASSIGN_CHUNK_ROWS = 200_000
+ASSIGN_BLOCK_ELEMENTS = 8_000_000
+
+
+def assign_nearest(X, centers, chunk_rows=ASSIGN_CHUNK_ROWS):
+    # ||x - c||^2 = ||x||^2 - 2 x.c + ||c||^2; ||x||^2 does not change the argmin
+    # float32 rows stay float32 (centers are cast to match)
+    dtype = np.float32 if getattr(X, "dtype", None) == np.float32 else np.float64
+    centers = np.asarray(centers, dtype=dtype)
+    half_sq = 0.5 * (centers ** 2).sum(axis=1)
+    # Many centers shrink the chunk so the rows x centers block stays bounded
+    chunk_rows = max(1, min(chunk_rows, ASSIGN_BLOCK_ELEMENTS // max(len(centers), 1)))
+    labels = np.empty(len(X), dtype=np.int32)
+    for start in range(0, len(X), chunk_rows):
+        block = np.asarray(X[start:start + chunk_rows], dtype=dtype)
+        labels[start:start + len(block)] = (block @ centers.T - half_sq).argmax(axis=1)
+    return labels
+
+
+def _cluster_means(X, labels, k):
+    # One weighted bincount per column; much faster than np.add.at.
+    # Unassigned rows (label -1) are left out
+    if (labels < 0).any():
+        keep = labels >= 0
+        X, labels = X[keep], labels[keep]
+    counts = np.bincount(labels, minlength=k).astype(float)
+    sums = np.column_stack([
+        np.bincount(labels, weights=X[:, j], minlength=k) for j in range(X.shape[1])
+    ]) if X.shape[1] else np.zeros((k, 0))
+    return sums, counts
+
+
+# ===============================
+# Incremental K-Means
+# ===============================
+# A fitted segmentation is kept as a small state dict (features, scaler,
+# centroids, counts, labels). When the feature set or K changes on the
+# same rows, the next fit is warm-started from the previous partition;
+# when rows are appended, the new rows are assigned to the existing
+# centroids and the centroids move by a running-mean update, without
+# refitting the historical rows.
+
+def kmeans_state(features, scaler_mean, scaler_scale, centers, labels, row_hash, version=1):
+    k = len(centers)
+    labels = np.asarray(labels, dtype=np.int32)
+    return {
+        "features": list(features),
+        "mean": np.asarray(scaler_mean, dtype=float),
+        "scale": np.asarray(scaler_scale, dtype=float),
+        "centers": np.asarray(centers, dtype=float),
+        "counts": np.bincount(labels[labels >= 0], minlength=k),
+        "labels": labels,
+        "row_hash": row_hash,
+        "version": version
+    }
+
+
+def row_hash(df, features, rows=None):
+    # Order-sensitive: the same rows sorted or shuffled are a different
+    # dataset, since labels are stored by row position
+    import hashlib
+
+    frame = df[features] if rows is None else df[features].iloc[:rows]
+    return hashlib.sha1(
+        pd.util.hash_pandas_object(frame, index=False).to_numpy().tobytes()
+    ).hexdigest()
+
+
+def warm_start_compatible(prev, features, k, max_changed=1):
+    # Warm starts only pay off when the previous partition is close to the
+    # one being fitted: same K and at most one feature added or removed.
+    # Anything further is fitted fresh with the usual restarts.
+    if len(prev["centers"]) != k:
+        return False
+    changed = set(prev["features"]) ^ set(features)
+    return len(changed) <= max_changed and bool(set(prev["features"]) & set(features))
+
+
+def warm_start_centers(prev, X_scaled, k, random_state=42):
+    # Means of the new feature space under the previous partition handle
+    # added, removed and kept features alike
+    sums, counts = _cluster_means(X_scaled, prev["labels"], len(prev["centers"]))
+    keep = counts > 0
+    centers = sums[keep] / counts[keep][:, None]
+    order = np.argsort(counts[keep])[::-1]
+    centers = centers[order][:k]
+
+    if len(centers) < k:
+        # Extra clusters start at the points farthest from the current centers
+        rng = np.random.default_rng(random_state)
+        sample = X_scaled[rng.choice(len(X_scaled), size=min(len(X_scaled), 20_000), replace=False)]
+        while len(centers) < k:
+            d2 = ((sample[:, None, :] - centers[None, :, :]) ** 2).sum(axis=2).min(axis=1)
+            centers = np.vstack([centers, sample[d2.argmax()]])
+    return centers
+
+
+def update_kmeans(state, X_new):
+    # Rows with a missing feature are not assigned (label -1) and do not
+    # move the centroids, as in segmentation assignment
+    with stage("kmeans update", rows=len(X_new)):
+        k = len(state["centers"])
+        keep = ~np.isnan(X_new).any(axis=1)
+        labels_new = np.full(len(X_new), -1, dtype=np.int32)
+        labels_new[keep] = assign_nearest(X_new[keep], state["centers"])
+        sums, counts_new = _cluster_means(np.asarray(X_new, dtype=float), labels_new, k)
+
+        counts = state["counts"] + counts_new
+        centers = np.where(
+            counts[:, None] > 0,
+            (state["centers"] * state["counts"][:, None] + sums) / np.maximum(counts, 1)[:, None],
+            state["centers"]
+        )
+    return {
+        **state,
+        "centers": centers,
+        "counts": counts.astype(int),
+        "labels": np.concatenate([state["labels"], labels_new]),
+        "version": state["version"] + 1
+    }
+
+
+def cluster_drift(prev, new):
+    from scipy.optimize import linear_sum_assignment
+    from sklearn.metrics import adjusted_rand_score
+
+    common = [f for f in new["features"] if f in prev["features"]]
+    if not common:
+        return None, None
+
+    # Compare centroids in original units so different scalers line up
+    def original(state):
+        idx = [state["features"].index(f) for f in common]
+        return state["centers"][:, idx] * state["scale"][idx] + state["mean"][idx]
+
+    scale = new["scale"][[new["features"].index(f) for f in common]]
+    a, b = original(prev) / scale, original(new) / scale
+    dist = np.sqrt(((b[:, None, :] - a[None, :, :]) ** 2).sum(axis=2))
+    rows, cols = linear_sum_assignment(dist)
+    match = dict(zip(rows, cols))
+
+    prev_share = prev["counts"] / max(prev["counts"].sum(), 1)
+    new_share = new["counts"] / max(new["counts"].sum(), 1)
+    table = pd.DataFrame([
+        {
+            "Cluster": i,
+            "Previous Cluster": match.get(i),
+            "Centroid Shift (SD)": dist[i, match[i]] if i in match else np.nan,
+            "Size Before": int(prev["counts"][match[i]]) if i in match else 0,
+            "Size After": int(new["counts"][i]),
+            "Share Change": new_share[i] - (prev_share[match[i]] if i in match else 0.0)
+        }
+        for i in range(len(new["centers"]))
+    ]).set_index("Cluster")
+
+    overlap = min(len(prev["labels"]), len(new["labels"]))
+    agreement = adjusted_rand_score(prev["labels"][:overlap], new["labels"][:overlap]) if overlap else None
+    return table, agreement
+
+
+# ===============================
+# Density Clustering on a kNN Graph
+# ===============================
+# DBSCAN only needs each row's neighbours within eps. Restricting it to
+# the approximate k-nearest-neighbour graph (engine.neighbors) as a
+# sparse precomputed distance matrix keeps it near-linear; the graph is
+# built once per data and feature set, so changing eps or min_samples
+# only re-runs the cheap DBSCAN pass. min_samples counts the row itself,
+# so it is bounded by n_neighbors + 1.
+
+def knn_distance_matrix(graph):
+    from scipy import sparse
+
+    indices = graph["indices"]
+    n, k = indices.shape
+    # Zero distances (duplicate rows) must stay stored entries
+    distances = np.maximum(graph["distances"].ravel(), np.finfo(float).tiny)
+    A = sparse.csr_matrix((distances, (np.repeat(np.arange(n), k), indices.ravel())), shape=(n, n))
+    return A.maximum(A.T).tocsr()
+
+
+def k_distances(graph, min_samples):
+    # Distance to the (min_samples - 1)-th neighbour, the core-point radius
+    column = min(max(min_samples - 2, 0), graph["n_neighbors"] - 1)
+    return np.sort(graph["distances"][:, column])
+
+
+def suggest_eps(k_dist):
+    # Knee of the sorted k-distance curve: farthest point below its chord
+    y = np.asarray(k_dist, dtype=float)
+    if len(y) < 3 or y[-1] == y[0]:
+        return float(y[-1]) if len(y) else 0.5
+    x = np.linspace(0.0, 1.0, len(y))
+    return float(y[np.argmax(x - (y - y[0]) / (y[-1] - y[0]))])
+
+
+def density_clusters(distance_matrix, eps, min_samples):
+    from sklearn.cluster import DBSCAN
+
+    with stage("dbscan on knn graph", rows=distance_matrix.shape[0]):
+        return DBSCAN(eps=eps, min_samples=min_samples, metric="precomputed").fit_predict(distance_matrix)
+
+
+# ===============================
+# k-Prototypes (mixed numeric / categorical)
+# ===============================
+# Huang's k-prototypes: the cost of a row against a prototype is the
+# squared Euclidean distance on standardized numerics plus gamma times
+# the number of categorical mismatches. Numerics are float32 and
+# categoricals int32 codes (missing values are their own code), so there
+# is no one-hot expansion. Assignment runs in row chunks on a thread pool
+# (NumPy releases the GIL); prototypes are updated with bincounts.
+
+def encode_mixed(df, numeric, categorical):
+    data = df[list(numeric) + list(categorical)]
+    if numeric and data[numeric].isna().to_numpy().any():
+        data = data.dropna(subset=numeric)
+
+    values = data[numeric].to_numpy(dtype=np.float64)
+    mean = values.mean(axis=0) if len(values) else np.zeros(len(numeric))
+    scale = values.std(axis=0) if len(values) else np.ones(len(numeric))
+    scale = np.where(scale > 0, scale, 1.0)
+
+    codes = np.empty((len(data), len(categorical)), dtype=np.int32)
+    categories = []
+    for j, col in enumerate(categorical):
+        c, uniques = pd.factorize(data[col])
+        codes[:, j] = np.where(c < 0, len(uniques), c)
+        categories.append(list(uniques) + ([None] if (c < 0).any() else []))
+
+    return {
+        "index": data.index,
+        "numeric": ((values - mean) / scale).astype(np.float32),
+        "codes": codes,
+        "numeric_features": list(numeric),
+        "categorical_features": list(categorical),
+        "categories": categories,
+        "mean": mean,
+        "scale": scale
+    }
+
+
+def _prototype_costs(num, codes, centers, modes, gamma):
+    costs = (
+        (num ** 2).sum(axis=1, dtype=np.float32)[:, None]
+        - 2 * num @ centers.T
+        + (centers ** 2).sum(axis=1)[None, :]
+    ) if num.shape[1] else np.zeros((len(num), len(modes)), dtype=np.float32)
+    if codes.shape[1]:
+        mismatches = np.zeros(costs.shape, dtype=np.int32)
+        for j in range(codes.shape[1]):
+            mismatches += codes[:, j][:, None] != modes[None, :, j]
+        costs += gamma * mismatches
+    return costs
+
+
+def assign_prototypes(num, codes, centers, modes, gamma,
+                      chunk_rows=ASSIGN_CHUNK_ROWS // 4, n_jobs=None):
+    from engine.governor import thread_budget
+    from concurrent.futures import ThreadPoolExecutor
+
+    centers = centers.astype(np.float32)
+    labels = np.empty(len(num), dtype=np.int32)
+    cost = np.empty(len(num), dtype=np.float64)
+
+    def run(start):
+        c = _prototype_costs(num[start:start + chunk_rows], codes[start:start + chunk_rows],
+                             centers, modes, gamma)
+        best = c.argmin(axis=1)
+        labels[start:start + len(c)] = best
+        cost[start:start + len(c)] = np.maximum(c[np.arange(len(c)), best], 0.0)
+
+    starts = range(0, len(num), chunk_rows)
+    with ThreadPoolExecutor(n_jobs or min(4, thread_budget())) as pool:
+        list(pool.map(run, starts))
+    return labels, cost
+
+
+def _update_prototypes(num, codes, labels, k, n_categories):
+    sums, counts = _cluster_means(num, labels, k)
+    centers = sums / np.maximum(counts, 1)[:, None]
+    modes = np.column_stack([
+        np.bincount(labels * m + codes[:, j], minlength=k * m).reshape(k, m).argmax(axis=1)
+        for j, m in enumerate(n_categories)
+    ]).astype(np.int32) if n_categories else np.zeros((k, 0), dtype=np.int32)
+    return centers, modes, counts
+
+
+def fit_kprototypes(encoded, k, gamma=None, max_iter=50, n_init=3, tol=1e-4,
+                    random_state=42, n_jobs=None, progress=None):
+    num = encoded["numeric"]
+    codes = encoded["codes"]
+    n = len(num)
+    k = min(k, n)
+    n_categories = [len(c) for c in encoded["categories"]]
+    # Huang's default: half the mean numeric std (1 after standardizing)
+    gamma = 0.5 if gamma is None else gamma
+    rng = np.random.default_rng(random_state)
+
+    best = None
+    with stage("kprototypes fit", rows=n, k=k):
+        for run in range(n_init):
+            # k-means++ style seeding on a sample with the mixed cost
+            sample = rng.choice(n, size=min(n, 20_000), replace=False)
+            seeds = [sample[rng.integers(len(sample))]]
+            for _ in range(1, k):
+                _, d = assign_prototypes(num[sample], codes[sample], num[seeds],
+                                         codes[seeds], gamma, n_jobs=1)
+                p = d / d.sum() if d.sum() > 0 else None
+                seeds.append(sample[rng.choice(len(sample), p=p)])
+            centers, modes = num[seeds].astype(np.float64), codes[seeds]
+
+            previous, restarted = np.inf, False
+            for it in range(max_iter):
+                if progress:
+                    progress((run + it / max_iter) / n_init, f"run {run + 1}, iteration {it + 1}")
+                labels, cost = assign_prototypes(num, codes, centers, modes, gamma, n_jobs=n_jobs)
+                total = float(cost.sum())
+                # Stop before updating, so labels and cost belong to the
+                # returned prototypes
+                if not restarted and np.isfinite(previous) and previous - total <= tol * previous:
+                    break
+                previous = total
+                centers, modes, counts = _update_prototypes(num, codes, labels, k, n_categories)
+
+                # Empty prototypes restart at the worst-fitted rows
+                empty = np.flatnonzero(counts == 0)
+                restarted = bool(len(empty))
+                if restarted:
+                    worst = np.argsort(cost)[::-1][:len(empty)]
+                    centers[empty] = num[worst]
+                    modes[empty] = codes[worst]
+            else:
+                # max_iter reached: the prototypes moved after the last assignment
+                labels, cost = assign_prototypes(num, codes, centers, modes, gamma, n_jobs=n_jobs)
+                total = float(cost.sum())
+
+            if best is None or total < best["cost"]:
+                best = {"labels": labels, "centers": centers, "modes": modes,
+                        "cost": total, "n_iter": it + 1}
+
+    return {**best, "gamma": gamma}
+
+
+def prototype_table(encoded, fit):
+    # Prototypes in original units and category labels
+    centers = fit["centers"] * encoded["scale"] + encoded["mean"]
+    table = pd.DataFrame(centers, columns=encoded["numeric_features"])
+    for j, col in enumerate(encoded["categorical_features"]):
+        table[col] = [encoded["categories"][j][m] for m in fit["modes"][:, j]]
+    return table.rename_axis("Cluster")
+
+
+# ===============================
+# Hierarchical Clustering on a CF-tree
+# ===============================
+# Agglomerative clustering of raw rows needs an n x n distance matrix.
+# Rows are first summarized by a BIRCH CF-tree built in one streaming
+# pass (partial_fit per chunk); Ward linkage then runs on the subcluster
+# centroids weighted by their row counts, so the dendrogram is exact for
+# the summary and cutting it at any level is an index lookup per row.
+
+def _subcluster_sizes(birch, X, centers):
+    # Rows summarized by each subcluster, in subcluster_centers_ order: the
+    # leaves' linked list from the public dummy_leaf_ attribute. If the
+    # tree's layout ever differs, count the rows nearest to each centroid.
+    sizes = []
+    leaf = getattr(birch.dummy_leaf_, "next_leaf_", None)
+    try:
+        while leaf is not None:
+            sizes.extend(sc.n_samples_ for sc in leaf.subclusters_)
+            leaf = leaf.next_leaf_
+    except AttributeError:
+        sizes = []
+    if len(sizes) == len(centers):
+        return np.asarray(sizes, dtype=float)
+    return np.bincount(assign_nearest(X, centers), minlength=len(centers)).astype(float)
+
+
+def cf_summary(X_scaled, threshold=0.5, branching_factor=50, max_subclusters=2000,
+               chunk_rows=50_000, random_state=42, progress=None):
+    from sklearn.cluster import Birch, KMeans
+
+    X = np.asarray(X_scaled, dtype=float)
+    birch = Birch(threshold=threshold, branching_factor=branching_factor, n_clusters=None)
+
+    with stage("cf-tree build", rows=len(X)):
+        for start in range(0, len(X), chunk_rows):
+            if progress:
+                progress(start / len(X), f"summarizing rows {start:,}+")
+            birch.partial_fit(X[start:start + chunk_rows])
+
+    centers = birch.subcluster_centers_
+    if len(centers) > max_subclusters:
+        # Too fine a tree for the linkage step: merge subclusters with a
+        # k-means on their centroids, weighted by the rows each summarizes
+        with stage("subcluster compression", subclusters=len(centers)):
+            weights = _subcluster_sizes(birch, X, centers)
+            km = KMeans(n_clusters=max_subclusters, n_init=1, max_iter=50,
+                        random_state=random_state)
+            centers = km.fit(centers, sample_weight=weights).cluster_centers_
+
+    # Exact centroids and counts of the rows nearest to each subcluster
+    with stage("cf-tree assignment", subclusters=len(centers)):
+        assignment = assign_nearest(X, centers)
+        sums, counts = _cluster_means(X, assignment, len(centers))
+
+    keep = counts > 0
+    remap = np.cumsum(keep) - 1
+    assignment = remap[assignment].astype(np.int32)
+    centers, counts = sums[keep] / counts[keep][:, None], counts[keep]
+
+    return {
+        "centers": centers,
+        "counts": counts.astype(np.int64),
+        "assignment": assignment,
+        "threshold": threshold
+    }
+
+
+def ward_linkage(centers, counts):
+    # Weighted Ward by the nearest-neighbour chain algorithm, returned in
+    # scipy's linkage-matrix format (heights use scipy's Ward scaling)
+    centers = np.array(centers, dtype=float)
+    weights = np.asarray(counts, dtype=float).copy()
+    m = len(centers)
+    active = np.ones(m, dtype=bool)
+    merges = []
+    chain = []
+
+    with stage("ward linkage", subclusters=m):
+        while len(merges) < m - 1:
+            if not chain:
+                chain.append(int(np.flatnonzero(active)[0]))
+            a = chain[-1]
+            d = weights[a] * weights / (weights[a] + weights) * ((centers - centers[a]) ** 2).sum(axis=1)
+            d[~active] = np.inf
+            d[a] = np.inf
+            b = int(d.argmin())
+            if len(chain) > 1 and d[chain[-2]] <= d[b]:
+                b = chain[-2]
+
+            if len(chain) > 1 and b == chain[-2]:
+                chain = chain[:-2]
+                total = weights[a] + weights[b]
+                centers[a] = (weights[a] * centers[a] + weights[b] * centers[b]) / total
+                weights[a] = total
+                active[b] = False
+                merges.append((a, b, np.sqrt(2 * d[b])))
+            else:
+                chain.append(b)
+
+    # Relabel in height order the way scipy does: leaves are 0..m-1, the
+    # i-th merge creates cluster m + i and the last column counts leaves
+    merges.sort(key=lambda r: r[2])
+    parent = list(range(m))
+    cluster_id = list(range(m))
+    size = [1] * m
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    Z = np.empty((len(merges), 4))
+    for i, (a, b, height) in enumerate(merges):
+        ra, rb = find(a), find(b)
+        ids = sorted((cluster_id[ra], cluster_id[rb]))
+        parent[rb] = ra
+        size[ra] += size[rb]
+        cluster_id[ra] = m + i
+        Z[i] = (ids[0], ids[1], height, size[ra])
+    return Z
+
+
+def cut_hierarchy(Z, assignment, n_clusters):
+    from scipy.cluster.hierarchy import fcluster
+
+    if len(Z) == 0:
+        return np.zeros(len(assignment), dtype=np.int32)
+    subcluster_labels = fcluster(Z, t=n_clusters, criterion="maxclust") - 1
+    return subcluster_labels.astype(np.int32)[assignment]
+
+
+def pca_2d(X_scaled):
+    from sklearn.decomposition import PCA
+
+    with stage("pca projection"):
+        return PCA(n_components=2).fit_transform(X_scaled)
+
+
+# ===============================
+# Cluster Profiling
+# ===============================
+# Profiles are built from the label array alone: rows are ordered by
+# cluster once, so every cluster is a contiguous segment. Sums and counts
+# come from np.add.reduceat over the segments and quantiles from one
+# nanquantile per segment, in column blocks, so no labelled copy of the
+# frame is built. Categorical columns are counted with one bincount over
+# (cluster, category) codes.
+
+PROFILE_BLOCK_COLUMNS = 64
+PROFILE_QUANTILES = (0.25, 0.5, 0.75)
+
+
+def _segment_stats(values, starts, counts):
+    present = ~np.isnan(values)
+    filled = np.where(present, values, 0.0)
+    n = np.add.reduceat(present, starts, axis=0).astype(float)
+    total = np.add.reduceat(filled, starts, axis=0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean = total / n
+        centered = np.where(present, values - np.repeat(mean, counts, axis=0), 0.0)
+        var = np.add.reduceat(centered ** 2, starts, axis=0) / (n - 1)
+    with warnings.catch_warnings():
+        # A column that is all-missing within a cluster has no quantiles
+        warnings.simplefilter("ignore", RuntimeWarning)
+        quantiles = np.stack([
+            np.nanquantile(values[s:s + c], PROFILE_QUANTILES, axis=0)
+            for s, c in zip(starts, counts)
+        ], axis=1)
+    return n, mean, np.sqrt(var), quantiles
+
+
+def profile_clusters(df, labels, features, categorical=None):
+    labels = np.asarray(labels)
+    classes, codes = np.unique(labels, return_inverse=True)
+    k = len(classes)
+    counts = np.bincount(codes, minlength=k)
+    starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+    index = pd.Index(classes, name="Cluster")
+
+    numeric = [c for c in features if pd.api.types.is_numeric_dtype(df[c])]
+    if categorical is None:
+        categorical = [c for c in df.columns if c not in numeric
+                       and not pd.api.types.is_numeric_dtype(df[c])]
+
+    stats = {name: [] for name in ("non_null", "mean", "std", "q25", "median", "q75")}
+    with stage("cluster profile", rows=len(labels), features=len(numeric) + len(categorical)):
+        order = np.argsort(codes, kind="stable")
+        for i in range(0, len(numeric), PROFILE_BLOCK_COLUMNS):
+            block = numeric[i:i + PROFILE_BLOCK_COLUMNS]
+            values = df[block].to_numpy(dtype=float, na_value=np.nan)[order]
+            n, mean, std, q = _segment_stats(values, starts, counts)
+            for name, part in zip(stats, (n, mean, std, q[0], q[1], q[2])):
+                stats[name].append(pd.DataFrame(part, index=index, columns=block))
+
+        modes = {}
+        for col in categorical:
+            cat_codes, uniques = pd.factorize(df[col])
+            ok = cat_codes >= 0
+            table = np.bincount(
+                codes[ok] * len(uniques) + cat_codes[ok], minlength=k * len(uniques)
+            ).reshape(k, len(uniques))
+            top = table.argmax(axis=1) if len(uniques) else np.zeros(k, dtype=int)
+            observed = table.sum(axis=1)
+            modes[(col, "Mode")] = [uniques[t] if o else None for t, o in zip(top, observed)]
+            modes[(col, "Share")] = np.where(
+                observed > 0, table[np.arange(k), top] / np.maximum(observed, 1), np.nan
+            ) if len(uniques) else np.full(k, np.nan)
+
+    def joined(parts):
+        return pd.concat(parts, axis=1) if parts else pd.DataFrame(index=index)
+
+    return {
+        "sizes": pd.DataFrame({"Count": counts, "Share": counts / max(len(labels), 1)}, index=index),
+        **{name: joined(parts) for name, parts in stats.items()},
+        "categorical": pd.DataFrame(modes, index=index)
+    }
+
+
+def cluster_profile(df, labels, features):
+    return profile_clusters(df, labels, features, categorical=[])["mean"]
+
+
+def cluster_sizes(labels):
+    return pd.Series(labels).value_counts().sort_index()
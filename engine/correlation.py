@@ -0,0 +1,268 @@
+import numpy as np
+import pandas as pd
+
+from perf import stage
+
+
+# ===============================
+# Ranking
+# ===============================
+# Every column is ranked exactly once (average ranks for ties, NaN kept
+# as NaN). Spearman correlations are then Pearson correlations of the
+# rank matrix, computed for all pairs with a few matrix products.
+
+RANK_BLOCK_COLUMNS = 64
+
+
+def _average_ranks(X):
+    n = X.shape[0]
+    order = np.argsort(X, axis=0, kind="stable")
+    xs = np.take_along_axis(X, order, axis=0)
+
+    # Tie groups: a group starts where the sorted value changes
+    starts = np.ones(xs.shape, dtype=bool)
+    starts[1:] = xs[1:] != xs[:-1]
+    ends = np.ones(xs.shape, dtype=bool)
+    ends[:-1] = starts[1:]
+
+    pos = np.arange(1, n + 1, dtype=float)[:, None]
+    first = np.maximum.accumulate(np.where(starts, pos, 0.0), axis=0)
+    last = np.minimum.accumulate(np.where(ends, pos, n + 1.0)[::-1], axis=0)[::-1]
+
+    ranks = np.empty(xs.shape, dtype=float)
+    np.put_along_axis(ranks, order, (first + last) / 2.0, axis=0)
+    ranks[np.isnan(X)] = np.nan
+    return ranks
+
+
+def _code_ranks(codes):
+    # Ordinal codes rank in O(n): a code's average rank follows from the
+    # counts of the codes below it
+    valid = codes >= 0
+    counts = np.bincount(codes[valid], minlength=int(codes.max()) + 1 if valid.any() else 0)
+    below = np.cumsum(counts) - counts
+    avg = below + (counts + 1) / 2.0
+    ranks = np.full(codes.shape, np.nan)
+    ranks[valid] = avg[codes[valid]]
+    return ranks
+
+
+def rank_frame(df, columns=None):
+    columns = list(df.columns if columns is None else columns)
+    ranks = np.empty((len(df), len(columns)), dtype=float)
+
+    numeric = [i for i, c in enumerate(columns) if pd.api.types.is_numeric_dtype(df[c])
+               and not pd.api.types.is_bool_dtype(df[c])]
+    with stage("rank columns", columns=len(columns)):
+        for start in range(0, len(numeric), RANK_BLOCK_COLUMNS):
+            block = numeric[start:start + RANK_BLOCK_COLUMNS]
+            values = df[[columns[i] for i in block]].to_numpy(dtype=float, na_value=np.nan)
+            ranks[:, block] = _average_ranks(values)
+
+        # Categorical columns: sorted category order, as OrdinalEncoder does
+        numeric_set = set(numeric)
+        for i, c in enumerate(columns):
+            if i not in numeric_set:
+                codes, _ = pd.factorize(df[c], sort=True)
+                ranks[:, i] = _code_ranks(codes)
+
+    return ranks
+
+
+# ===============================
+# Pairwise Correlation of Ranks
+# ===============================
+def _pearson_complete(A, B):
+    A = A - A.mean(axis=0)
+    B = B - B.mean(axis=0)
+    cov = A.T @ B
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return cov / np.sqrt(np.outer((A * A).sum(axis=0), (B * B).sum(axis=0)))
+
+
+def _pearson_pairwise(A, B):
+    Ma = (~np.isnan(A)).astype(float)
+    Mb = (~np.isnan(B)).astype(float)
+    # Centring on each column's own mean keeps the sums small
+    Za = np.nan_to_num(A - np.nanmean(A, axis=0))
+    Zb = np.nan_to_num(B - np.nanmean(B, axis=0))
+
+    n = Ma.T @ Mb
+    sa = Za.T @ Mb
+    sb = Ma.T @ Zb
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cov = Za.T @ Zb - sa * sb / n
+        va = (Za * Za).T @ Mb - sa * sa / n
+        vb = Ma.T @ (Zb * Zb) - sb * sb / n
+        r = cov / np.sqrt(va * vb)
+
+    # Rows where only one of the pair is missing change the ranks of the
+    # pair's common rows; spearman_matrix(exact_missing=True) re-ranks
+    # those pairs on their common rows
+    discordant = Ma.T @ (1.0 - Mb) + (1.0 - Ma).T @ Mb
+    return r, n, discordant
+
+
+def _rank_pair(a, b):
+    keep = ~(np.isnan(a) | np.isnan(b))
+    if keep.sum() < 2:
+        return np.nan
+    ranks = _average_ranks(np.column_stack([a[keep], b[keep]]))
+    return _pearson_complete(ranks[:, :1], ranks[:, 1:])[0, 0]
+
+
+def spearman_matrix(df, columns=None, other=None, exact_missing=False):
+    # With missing values the default is the mask-based estimate: each
+    # column is ranked once over its own observed rows and every pair is
+    # correlated on the rows both observe. That differs slightly from
+    # ranking each pair on its common rows. exact_missing=True does the
+    # latter for every pair with a row missing on one side only, at the
+    # cost of one sort per such pair (nearly all p² on data with gaps).
+    columns = list(df.columns if columns is None else columns)
+    other = columns if other is None else list(other)
+
+    ranks = rank_frame(df, list(dict.fromkeys(columns + other)))
+    index = {c: i for i, c in enumerate(dict.fromkeys(columns + other))}
+    A = ranks[:, [index[c] for c in columns]]
+    B = ranks[:, [index[c] for c in other]]
+
+    with stage("spearman matrix", pairs=len(columns) * len(other)):
+        if not (np.isnan(A).any() or np.isnan(B).any()):
+            r = _pearson_complete(A, B)
+        else:
+            r, n, discordant = _pearson_pairwise(A, B)
+            r[n < 2] = np.nan
+            if exact_missing:
+                for i, j in zip(*np.nonzero(discordant > 0)):
+                    r[i, j] = _rank_pair(A[:, i], B[:, j])
+
+    return pd.DataFrame(np.clip(r, -1.0, 1.0), index=columns, columns=other)
+
+
+# ===============================
+# Streaming Co-moments
+# ===============================
+# One pass over row chunks accumulates everything Pearson correlation and
+# covariance need. Chunk statistics are combined with Chan's parallel
+# update, so partial results from chunks or worker threads merge exactly.
+#
+# All statistics are kept per pair of columns: mean[i, j] is the mean of
+# column i over the rows where both i and j are observed, var[i, j] the
+# matching sum of squared deviations and co[i, j] the co-moment. With
+# `pairwise=False` rows with any missing value are skipped instead, and
+# every pair shares the same rows.
+
+CHUNK_ROWS = 50_000
+
+
+class CoMoments:
+
+    def __init__(self, columns, pairwise=True):
+        p = len(columns)
+        self.columns = list(columns)
+        self.pairwise = pairwise
+        self.n = np.zeros((p, p))
+        self.mean = np.zeros((p, p))
+        self.var = np.zeros((p, p))
+        self.co = np.zeros((p, p))
+
+    def update(self, X):
+        X = np.asarray(X, dtype=float)
+        if not self.pairwise:
+            X = X[~np.isnan(X).any(axis=1)]
+        if len(X) == 0:
+            return self
+
+        observed = ~np.isnan(X)
+        M = observed.astype(float)
+        count = M.sum(axis=0)
+        shift = np.where(observed, X, 0.0).sum(axis=0) / np.maximum(count, 1.0)
+        Z = np.where(observed, X - shift, 0.0)
+
+        n = M.T @ M
+        s = Z.T @ M
+        with np.errstate(divide="ignore", invalid="ignore"):
+            mean_c = np.where(n > 0, s / n, 0.0)
+        chunk = CoMoments(self.columns, self.pairwise)
+        chunk.n = n
+        chunk.mean = mean_c + shift[:, None]
+        chunk.co = Z.T @ Z - mean_c * s.T
+        chunk.var = (Z * Z).T @ M - mean_c * s
+        return self.merge(chunk)
+
+    def merge(self, other):
+        n = self.n + other.n
+        with np.errstate(divide="ignore", invalid="ignore"):
+            weight = np.where(n > 0, self.n * other.n / n, 0.0)
+            delta = other.mean - self.mean
+            self.mean = self.mean + np.where(n > 0, delta * other.n / n, 0.0)
+        self.co = self.co + other.co + delta * delta.T * weight
+        self.var = self.var + other.var + delta * delta * weight
+        self.n = n
+        return self
+
+    def subset(self, columns):
+        # Pairwise statistics of a column subset are a sub-block; in
+        # complete-case mode the rows stay those of the full column set
+        idx = [self.columns.index(c) for c in columns]
+        sub = CoMoments(columns, self.pairwise)
+        for attr in ("n", "mean", "var", "co"):
+            setattr(sub, attr, getattr(self, attr)[np.ix_(idx, idx)])
+        return sub
+
+    # ---------- Results ----------
+    def correlation(self):
+        with np.errstate(divide="ignore", invalid="ignore"):
+            r = self.co / np.sqrt(self.var * self.var.T)
+        r[self.n < 2] = np.nan
+        return pd.DataFrame(np.clip(r, -1.0, 1.0), index=self.columns, columns=self.columns)
+
+    def covariance(self, ddof=1):
+        with np.errstate(divide="ignore", invalid="ignore"):
+            cov = self.co / (self.n - ddof)
+        return pd.DataFrame(cov, index=self.columns, columns=self.columns)
+
+    def column_stats(self, ddof=0):
+        # Per-column mean / std over the column's own observed rows
+        n = np.diag(self.n)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            std = np.sqrt(np.diag(self.var) / (n - ddof))
+        return pd.DataFrame(
+            {"n": n, "mean": np.diag(self.mean), "std": std},
+            index=self.columns
+        )
+
+    @property
+    def rows(self):
+        # Complete-case row count (pairwise=False) or the largest pair count
+        return int(self.n.max()) if self.n.size else 0
+
+
+def _chunk_values(df, columns, start, stop):
+    return df[columns].iloc[start:stop].to_numpy(dtype=float, na_value=np.nan)
+
+
+def accumulate_comoments(df, columns, pairwise=True, chunk_rows=CHUNK_ROWS, n_jobs=None):
+    from engine.governor import thread_budget
+    from concurrent.futures import ThreadPoolExecutor
+
+    columns = list(columns)
+    bounds = [(s, min(s + chunk_rows, len(df))) for s in range(0, len(df), chunk_rows)]
+    n_jobs = n_jobs or min(4, thread_budget(), max(1, len(bounds)))
+
+    def work(part):
+        acc = CoMoments(columns, pairwise)
+        for start, stop in part:
+            acc.update(_chunk_values(df, columns, start, stop))
+        return acc
+
+    with stage("co-moments", rows=len(df), columns=len(columns)):
+        if n_jobs <= 1:
+            return work(bounds)
+        # NumPy releases the GIL in the products, so threads scale here
+        with ThreadPoolExecutor(n_jobs) as pool:
+            parts = list(pool.map(work, [bounds[i::n_jobs] for i in range(n_jobs)]))
+        total = parts[0]
+        for part in parts[1:]:
+            total.merge(part)
+        return total
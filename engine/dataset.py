@@ -0,0 +1,150 @@
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+
+# ===============================
+# Copy-free Dataset Layer
+# ===============================
+# Pages derive their working frames (column drops, projections, extra
+# label columns) from one base frame. With pandas copy-on-write those
+# derivations share the base frame's column buffers, and data is copied
+# only when a derived frame is actually written to. pandas >= 3 always
+# behaves this way; older versions need the option switched on.
+
+if int(pd.__version__.split(".")[0]) < 3:
+    pd.set_option("mode.copy_on_write", True)
+
+
+def project(df, columns):
+    return df[list(columns)]
+
+
+def without(df, columns):
+    return df.drop(columns=list(columns), errors="ignore")
+
+
+def with_columns(df, **columns):
+    # assign() under copy-on-write adds columns without copying the others
+    return df.assign(**columns)
+
+
+# ===============================
+# Memory Accounting
+# ===============================
+# Sizes are counted per underlying buffer, so a projection that shares
+# its columns with the base frame costs (almost) nothing.
+
+def _series_buffers(series):
+    arr = series.array
+    pa_array = getattr(arr, "_pa_array", None)
+    if pa_array is not None:
+        return {
+            ("arrow", buf.address): buf.size
+            for chunk in pa_array.chunks
+            for buf in chunk.buffers()
+            if buf is not None
+        }
+
+    if isinstance(series.dtype, np.dtype) and series.dtype != object:
+        values = series.to_numpy(copy=False)
+        root = values
+        while isinstance(root.base, np.ndarray):
+            root = root.base
+        return {("numpy", root.__array_interface__["data"][0]): root.nbytes}
+
+    return {("object", id(arr)): int(series.memory_usage(index=False, deep=False))}
+
+
+def buffer_sizes(obj):
+    if isinstance(obj, pd.DataFrame):
+        sizes = {}
+        for _, series in obj.items():
+            sizes.update(_series_buffers(series))
+        return sizes
+    if isinstance(obj, pd.Series):
+        return _series_buffers(obj)
+    if isinstance(obj, np.ndarray):
+        root = obj
+        while isinstance(root.base, np.ndarray):
+            root = root.base
+        return {("numpy", root.__array_interface__["data"][0]): root.nbytes}
+    if isinstance(obj, dict):
+        obj = list(obj.values())
+    if isinstance(obj, (list, tuple)):
+        sizes = {}
+        for item in obj:
+            sizes.update(buffer_sizes(item))
+        return sizes
+    return {}
+
+
+def footprint(*objs):
+    sizes = {}
+    for obj in objs:
+        sizes.update(buffer_sizes(obj))
+    return sum(sizes.values())
+
+
+# ===============================
+# Derived Artifact Store (LRU)
+# ===============================
+class ArtifactStore:
+
+    def __init__(self, budget_bytes):
+        self.budget_bytes = budget_bytes
+        self._items = OrderedDict()
+        self.evicted = []
+
+    def put(self, name, value, pinned=False, base=None):
+        self._items[name] = {"value": value, "pinned": pinned}
+        self._items.move_to_end(name)
+        self.enforce(base)
+        return value
+
+    def get(self, name, default=None):
+        item = self._items.get(name)
+        if item is None:
+            return default
+        self._items.move_to_end(name)
+        return item["value"]
+
+    def __contains__(self, name):
+        return name in self._items
+
+    def pop(self, name):
+        item = self._items.pop(name, None)
+        return None if item is None else item["value"]
+
+    def clear(self):
+        self._items.clear()
+
+    def usage(self, base=None):
+        # Bytes held by artifacts beyond what they share with the base frame
+        base_buffers = buffer_sizes(base) if base is not None else {}
+        rows, seen = [], set(base_buffers)
+        for name, item in self._items.items():
+            own = {
+                k: v for k, v in buffer_sizes(item["value"]).items()
+                if k not in seen
+            }
+            seen.update(own)
+            rows.append({
+                "Artifact": name,
+                "MB": sum(own.values()) / 1e6,
+                "Pinned": item["pinned"]
+            })
+        return rows
+
+    def enforce(self, base=None):
+        usage = self.usage(base)
+        total = sum(r["MB"] for r in usage) * 1e6
+        for row in usage:
+            if total <= self.budget_bytes:
+                break
+            if row["Pinned"]:
+                continue
+            self._items.pop(row["Artifact"], None)
+            self.evicted.append(row["Artifact"])
+            total -= row["MB"] * 1e6
@@ -0,0 +1,51 @@
+import numpy as np
+
+from perf import stage
+
+
+# ===============================
+# Binned 2-D Density
+# ===============================
+# Large scatter plots are drawn as per-cluster 2-D histograms instead of
+# one marker per row. Each point's (cluster, x-bin, y-bin) is folded into
+# one flat index and counted with a single np.bincount.
+
+def density_grid(x, y, labels=None, bins=300, extent=None):
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    labels = np.zeros(len(x), dtype=np.int64) if labels is None else np.asarray(labels)
+
+    if extent is None:
+        extent = (np.nanmin(x), np.nanmax(x), np.nanmin(y), np.nanmax(y))
+    x0, x1, y0, y1 = extent
+    x1 = x1 if x1 > x0 else x0 + 1.0
+    y1 = y1 if y1 > y0 else y0 + 1.0
+
+    with stage("density binning", points=len(x)):
+        classes, codes = np.unique(labels, return_inverse=True)
+        ok = np.isfinite(x) & np.isfinite(y)
+        ix = np.clip(((x[ok] - x0) / (x1 - x0) * bins).astype(np.int64), 0, bins - 1)
+        iy = np.clip(((y[ok] - y0) / (y1 - y0) * bins).astype(np.int64), 0, bins - 1)
+        flat = (codes[ok] * bins + iy) * bins + ix
+        counts = np.bincount(flat, minlength=len(classes) * bins * bins)
+
+    return {
+        "counts": counts.reshape(len(classes), bins, bins),
+        "classes": classes,
+        "extent": (x0, x1, y0, y1)
+    }
+
+
+def blend_rgba(counts, colors, log_scale=True):
+    # Per-pixel colour is the count-weighted mix of the cluster colours;
+    # opacity follows the total density
+    colors = np.asarray(colors, dtype=float)[:, :3]
+    total = counts.sum(axis=0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rgb = np.tensordot(counts, colors, axes=(0, 0)) / total[..., None]
+    rgb = np.nan_to_num(rgb)
+
+    intensity = np.log1p(total) if log_scale else total.astype(float)
+    peak = intensity.max()
+    alpha = intensity / peak if peak > 0 else intensity
+    return np.dstack([rgb, np.where(total > 0, 0.15 + 0.85 * alpha, 0.0)])
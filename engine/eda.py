@@ -0,0 +1,100 @@
+import numpy as np
+import pandas as pd
+
+from perf import stage
+
+
+# ===============================
+# Target Correlations
+# ===============================
+def pearson_with_target(df, target, moments=None):
+    from engine.correlation import accumulate_comoments
+
+    with stage("pearson correlation"):
+        if moments is None:
+            moments = accumulate_comoments(
+                df, df.select_dtypes(include=np.number).columns, pairwise=True
+            )
+
+        # Constant columns have no correlation and are left out
+        varying = moments.column_stats()["std"] > 0
+        corr = moments.correlation().loc[varying, varying]
+
+        return (
+            corr[target]
+            .drop(target, errors="ignore")
+            .sort_values(ascending=False)
+        )
+
+
+def spearman_with_target(df, target):
+    from engine.correlation import spearman_matrix
+
+    cat_cols = df.select_dtypes(exclude=np.number).columns.tolist()
+    cat_cols = [c for c in cat_cols if c != target and df[c].nunique() > 1]
+    if not cat_cols:
+        return pd.Series(dtype=float)
+
+    with stage("spearman correlation"):
+        return (
+            spearman_matrix(df, cat_cols, [target])[target]
+            .dropna()
+            .sort_values(ascending=False)
+        )
+
+
+def categorical_spearman_matrix(df):
+    from engine.correlation import spearman_matrix
+
+    cat_cols = df.select_dtypes(exclude=np.number).columns.tolist()
+    cat_cols = [c for c in cat_cols if df[c].nunique() > 1]
+    return spearman_matrix(df, cat_cols)
+
+
+# ===============================
+# SHAP Feature Importance
+# ===============================
+def shap_importance(X, y, n_estimators=50, max_depth=6, random_state=42, progress=None):
+    import shap
+    from sklearn.ensemble import RandomForestRegressor
+
+    if progress:
+        progress(0.0, "fitting random forest")
+    with stage("shap model fit"):
+        model = RandomForestRegressor(
+            n_estimators=n_estimators,
+            max_depth=max_depth,
+            random_state=random_state
+        )
+        model.fit(X, y)
+
+    if progress:
+        progress(0.5, "computing SHAP values")
+    with stage("shap values"):
+        explainer = shap.TreeExplainer(
+            model,
+            feature_perturbation="interventional",
+            model_output="raw"
+        )
+
+        shap_values = explainer.shap_values(
+            X,
+            check_additivity=False
+        )
+
+    return {
+        "values": shap_values,
+        "base_values": explainer.expected_value,
+        "feature_names": list(X.columns),
+        "mean_abs": pd.Series(
+            np.abs(shap_values).mean(axis=0), index=X.columns
+        ).sort_values(ascending=False)
+    }
+
+
+def shap_inputs(df, target):
+    X = df.select_dtypes(include=np.number).drop(
+        columns=[target],
+        errors="ignore"
+    )
+    return X, df[target]
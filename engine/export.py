@@ -0,0 +1,121 @@
+import gzip
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from engine.governor import thread_budget
+from engine.precision import compute_dtype
+from perf import stage
+
+
+# ===============================
+# Chunked Score Export
+# ===============================
+# PCA projections and factor scores are "standardize, then multiply by a
+# p x k matrix", row block by row block. Blocks are projected on a thread
+# pool (NumPy releases the GIL in the products) and appended in order to a
+# compressed CSV or Parquet file on disk, so neither the full score matrix
+# nor a CSV string of it is ever held in memory. Every output row carries
+# the identifier of the source row it came from.
+
+EXPORT_CHUNK_ROWS = 100_000
+
+FORMATS = {
+    "csv": (".csv.gz", "application/gzip"),
+    "parquet": (".parquet", "application/octet-stream")
+}
+
+
+def _project_chunk(df, features, mean, std, matrix, columns, index_label, bounds):
+    start, stop = bounds
+    chunk = df[features].iloc[start:stop]
+    values = chunk.to_numpy(dtype=matrix.dtype, na_value=np.nan)
+    keep = ~np.isnan(values).any(axis=1)
+    Z = values[keep]
+    Z -= mean
+    Z /= std
+    scores = Z @ matrix
+    out = pd.DataFrame(scores, columns=columns)
+    out.insert(0, index_label, chunk.index[keep])
+    return out
+
+
+def export_scores(df, features, moments, matrix, columns, path, fmt="csv",
+                  chunk_rows=EXPORT_CHUNK_ROWS, n_jobs=None, index_label="row_id"):
+    features = list(features)
+    stats = moments.subset(features).column_stats()
+    mean = stats["mean"].to_numpy()
+    std = stats["std"].to_numpy()
+    # Pool threads do not see the caller's precision, so fix it here
+    dtype = compute_dtype()
+    std = np.where(std > 0, std, 1.0).astype(dtype)
+    mean = mean.astype(dtype)
+    matrix = np.asarray(matrix, dtype=dtype)
+    if df.index.name is not None:
+        index_label = df.index.name
+
+    bounds = [(s, min(s + chunk_rows, len(df))) for s in range(0, len(df), chunk_rows)]
+    n_jobs = n_jobs or min(4, thread_budget())
+
+    def project(b):
+        return _project_chunk(df, features, mean, std, matrix, columns, index_label, b)
+
+    rows = 0
+    with stage("score export", rows=len(df), format=fmt):
+        with ThreadPoolExecutor(n_jobs) as pool:
+            if fmt == "parquet":
+                import pyarrow as pa
+                import pyarrow.parquet as pq
+
+                writer = None
+                try:
+                    # Only n_jobs blocks are in flight at a time
+                    for i in range(0, len(bounds), n_jobs):
+                        for block in pool.map(project, bounds[i:i + n_jobs]):
+                            table = pa.Table.from_pandas(block, preserve_index=False)
+                            if writer is None:
+                                writer = pq.ParquetWriter(path, table.schema, compression="zstd")
+                            writer.write_table(table)
+                            rows += len(block)
+                    if writer is None:
+                        empty = pd.DataFrame(columns=[index_label] + list(columns))
+                        writer = pq.ParquetWriter(path, pa.Table.from_pandas(empty, preserve_index=False).schema)
+                finally:
+                    if writer is not None:
+                        writer.close()
+            else:
+                # Each block is formatted and compressed in its worker as a
+                # separate gzip member; concatenated members are one valid
+                # .gz file, and zlib releases the GIL while compressing
+                def compress(b):
+                    block = project(b)
+                    text = block.to_csv(index=False, header=b[0] == 0)
+                    return len(block), gzip.compress(text.encode(), compresslevel=6)
+
+                with open(path, "wb") as f:
+                    for i in range(0, len(bounds), n_jobs):
+                        for n, payload in pool.map(compress, bounds[i:i + n_jobs]):
+                            f.write(payload)
+                            rows += n
+                    if not bounds:
+                        header = ",".join([index_label] + list(columns)) + "\n"
+                        f.write(gzip.compress(header.encode()))
+    return rows
+
+
+def export_to_tempfile(df, features, moments, matrix, columns, fmt="csv", **kwargs):
+    # Returns the compressed file's bytes: only the compressed output is
+    # held in memory (st.download_button needs bytes), never the score
+    # matrix, and nothing is left behind in the temp dir
+    suffix = FORMATS[fmt][0]
+    fd, path = tempfile.mkstemp(suffix=suffix)
+    os.close(fd)
+    try:
+        export_scores(df, features, moments, matrix, columns, path, fmt=fmt, **kwargs)
+        with open(path, "rb") as f:
+            return f.read()
+    finally:
+        os.unlink(path)
@@ -0,0 +1,242 @@
+import numpy as np
+import pandas as pd
+
+from perf import stage
+
+
+# ===============================
+# Data Preparation
+# ===============================
+def prepare_factor_data(df, features):
+    data = df[features]
+    # Only non-numeric columns are converted; numeric ones stay shared
+    # with the source frame
+    to_convert = [c for c in features if not pd.api.types.is_numeric_dtype(data[c])]
+    if to_convert:
+        data = data.assign(**{
+            c: pd.to_numeric(data[c], errors="coerce") for c in to_convert
+        })
+    if data.isna().to_numpy().any():
+        data = data.dropna()
+    return data.loc[:, data.nunique() > 1]
+
+
+def factor_moments(data):
+    from engine.correlation import accumulate_comoments
+
+    return accumulate_comoments(data, list(data.columns), pairwise=False)
+
+
+# ===============================
+# Suitability Tests
+# ===============================
+# Everything up to the factor scores depends only on the p x p
+# correlation matrix and the number of rows n, so none of it needs
+# another pass over the data.
+
+def _inverse(corr):
+    try:
+        return np.linalg.inv(corr)
+    except np.linalg.LinAlgError:
+        return np.linalg.pinv(corr)
+
+
+def kmo(corr):
+    inv = _inverse(corr)
+    d = np.sqrt(np.outer(np.diag(inv), np.diag(inv)))
+    partial = -inv / d
+
+    r2 = np.asarray(corr, dtype=float) ** 2
+    p2 = partial ** 2
+    np.fill_diagonal(r2, 0.0)
+    np.fill_diagonal(p2, 0.0)
+
+    per_item = r2.sum(axis=0) / (r2.sum(axis=0) + p2.sum(axis=0))
+    return r2.sum() / (r2.sum() + p2.sum()), per_item
+
+
+def bartlett_sphericity(corr, n):
+    from scipy.stats import chi2
+
+    p = corr.shape[0]
+    _, logdet = np.linalg.slogdet(corr)
+    statistic = -logdet * (n - 1 - (2 * p + 5) / 6)
+    dof = p * (p - 1) / 2
+    return statistic, chi2.sf(statistic, dof)
+
+
+def adequacy_tests(corr, n):
+    corr = np.asarray(corr, dtype=float)
+
+    with stage("kmo test"):
+        kmo_model, kmo_per_item = kmo(corr)
+
+    with stage("bartlett test"):
+        chi_square_value, p_value = bartlett_sphericity(corr, n)
+
+    return {
+        "kmo": kmo_model,
+        "kmo_per_item": kmo_per_item,
+        "chi_square": chi_square_value,
+        "p_value": p_value,
+        "suitable": kmo_model >= 0.6 and p_value < 0.05
+    }
+
+
+def _eigen(corr):
+    eigvals, eigvecs = np.linalg.eigh(np.asarray(corr, dtype=float))
+    order = np.argsort(eigvals)[::-1]
+    eigvals = np.clip(eigvals[order], 0.0, None)
+    eigvecs = eigvecs[:, order]
+    # Largest loading of each component positive, as sklearn's PCA does
+    signs = np.sign(eigvecs[np.abs(eigvecs).argmax(axis=0), np.arange(eigvecs.shape[1])])
+    return eigvals, eigvecs * np.where(signs == 0, 1.0, signs)
+
+
+def scree_eigenvalues(corr, n):
+    # Scaled like PCA().explained_variance_ on standardized data
+    with stage("scree eigenvalues"):
+        return _eigen(corr)[0] * n / max(n - 1, 1)
+
+
+# ===============================
+# Factor Extraction
+# ===============================
+def varimax(loadings, normalize=True, max_iter=500, tol=1e-5):
+    X = np.array(loadings, dtype=float)
+    n_rows, n_cols = X.shape
+    if n_cols < 2:
+        return X
+
+    if normalize:
+        norms = np.sqrt((X ** 2).sum(axis=1))
+        norms[norms == 0] = 1.0
+        X = X / norms[:, None]
+
+    rotation = np.eye(n_cols)
+    d = 0.0
+    for _ in range(max_iter):
+        old_d = d
+        basis = X @ rotation
+        transformed = X.T @ (basis ** 3 - basis * (basis ** 2).sum(axis=0) / n_rows)
+        U, S, Vt = np.linalg.svd(transformed)
+        rotation = U @ Vt
+        d = S.sum()
+        if d < old_d * (1 + tol):
+            break
+
+    X = X @ rotation
+    if normalize:
+        X = X * norms[:, None]
+    return X
+
+
+def extract_factors(corr, n_factors, columns):
+    # Principal-factor loadings (eigenvectors scaled by sqrt(eigenvalue)),
+    # varimax-rotated; score weights use the regression method R^-1 L
+    factor_names = [f"Factor {i+1}" for i in range(n_factors)]
+    corr = np.asarray(corr, dtype=float)
+
+    with stage("factor extraction"):
+        eigvals, eigvecs = _eigen(corr)
+        unrotated = eigvecs[:, :n_factors] * np.sqrt(eigvals[:n_factors])
+
+        try:
+            loadings = varimax(unrotated)
+            if not np.isfinite(loadings).all():
+                raise np.linalg.LinAlgError("non-finite rotation")
+            method = "varimax"
+        except np.linalg.LinAlgError:
+            # Unrotated principal components as a stable alternative
+            loadings = unrotated
+            method = "pca_fallback"
+
+        weights = _inverse(corr) @ loadings
+
+    communalities = (loadings ** 2).sum(axis=1)
+    return {
+        "loadings": pd.DataFrame(loadings, index=columns, columns=factor_names),
+        "weights": weights,
+        "communalities": pd.Series(communalities, index=columns),
+        "uniquenesses": pd.Series(1.0 - communalities, index=columns),
+        "factor_names": factor_names,
+        "method": method
+    }
+
+
+def fit_diagnostics(corr, loadings):
+    corr = np.asarray(corr, dtype=float)
+    L = np.asarray(loadings)
+    residual = corr - L @ L.T
+    off_diag = ~np.eye(len(corr), dtype=bool)
+    ss_loadings = (L ** 2).sum(axis=0)
+    return {
+        "rmsr": float(np.sqrt((residual[off_diag] ** 2).mean())),
+        "variance_explained": ss_loadings / len(corr),
+        "cumulative_variance": float(ss_loadings.sum() / len(corr))
+    }
+
+
+# ===============================
+# Factor-count Sweep
+# ===============================
+# Every candidate factor count is fitted once per correlation matrix, so
+# changing the number of factors in the page is a lookup.
+
+def factor_sweep(corr, columns, max_factors=10, n_jobs=None):
+    from engine.governor import thread_budget
+    from concurrent.futures import ThreadPoolExecutor
+
+    counts = list(range(1, min(max_factors, len(columns)) + 1))
+
+    def fit(k):
+        result = extract_factors(corr, k, columns)
+        result.update(fit_diagnostics(corr, result["loadings"].to_numpy()))
+        return k, result
+
+    with stage("factor sweep", fits=len(counts)):
+        with ThreadPoolExecutor(n_jobs or min(len(counts), thread_budget())) as pool:
+            return dict(pool.map(fit, counts))
+
+
+def sweep_table(sweep):
+    return pd.DataFrame([
+        {
+            "Factors": k,
+            "Method": r["method"],
+            "RMSR": r["rmsr"],
+            "Variance Explained": r["cumulative_variance"],
+            "Min Communality": r["communalities"].min(),
+            "Max Uniqueness": r["uniquenesses"].max()
+        }
+        for k, r in sorted(sweep.items())
+    ]).set_index("Factors")
+
+
+# ===============================
+# Factor Scores (one chunked pass)
+# ===============================
+def factor_scores(data, moments, weights, chunk_rows=50_000):
+    from engine.pca import standardized_chunks
+
+    with stage("factor scores"):
+        parts = [
+            Z @ weights.astype(Z.dtype)
+            for _, Z in standardized_chunks(data, list(data.columns), moments, chunk_rows)
+        ]
+    return np.vstack(parts) if parts else np.empty((0, weights.shape[1]))
+
+
+def run_factor_analysis(data, n_factors, moments=None):
+    moments = moments if moments is not None else factor_moments(data)
+    corr = moments.correlation().to_numpy()
+    n = moments.rows
+
+    tests = adequacy_tests(corr, n)
+    result = {
+        "tests": tests,
+        "eigenvalues": scree_eigenvalues(corr, n),
+        **extract_factors(corr, n_factors, data.columns)
+    }
+    result["scores"] = factor_scores(data, moments, result["weights"])
+    return result
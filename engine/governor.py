@@ -0,0 +1,267 @@
+import contextvars
+import itertools
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+
+# ===============================
+# CPU Governor
+# ===============================
+# The host's CPUs are a pool of slots. Each session gets a thread budget
+# that caps BLAS/OpenMP (threadpoolctl), joblib (n_jobs=None resolves to
+# it) and the engine's own thread pools (thread_budget()).
+#
+# Background jobs and the compute-heavy stages of page runs (fits,
+# sweeps, projections) both hold a lease of slots while they run; plain
+# page renders never queue. Requests wait in one FIFO queue, page stages
+# ahead of jobs (they are short); a session already holding its budget is
+# passed over while other sessions are waiting, so one analyst cannot
+# starve the rest. A page stage may overlap its own session's background
+# jobs (a rerun must never wait behind the session's own job), so one
+# session uses at most twice its budget; across sessions, page stages and
+# jobs never take more than the host's slots.
+#
+# threadpoolctl limits are process-wide, so the app process never changes
+# them per session: they are set to the session budget once, when the
+# governor is created. A page stage caps only what is per thread (joblib
+# and thread_budget()). Job workers run one job at a time, so there the
+# process-wide limit is the job's own thread count. Spawned workers also
+# inherit the *_NUM_THREADS defaults set below, so libraries loaded there
+# start capped as well.
+
+HOST_CPU_SLOTS = max(1, int(os.environ.get("HOST_CPU_SLOTS", os.cpu_count() or 1)))
+SESSION_CPU_BUDGET = max(1, min(
+    HOST_CPU_SLOTS,
+    int(os.environ.get("SESSION_CPU_BUDGET", max(1, HOST_CPU_SLOTS // 2)))
+))
+
+for _var in ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS"):
+    os.environ.setdefault(_var, str(SESSION_CPU_BUDGET))
+
+_budget = contextvars.ContextVar("thread_budget", default=SESSION_CPU_BUDGET)
+
+
+def thread_budget():
+    return _budget.get()
+
+
+@contextmanager
+def thread_cap(threads):
+    # Per thread: joblib's parallel_config and the contextvar are local to
+    # the calling thread, so concurrent sessions do not see each other's cap
+    from joblib import parallel_config
+
+    threads = max(1, int(threads))
+    token = _budget.set(threads)
+    try:
+        with parallel_config(n_jobs=threads):
+            yield
+    finally:
+        _budget.reset(token)
+
+
+@contextmanager
+def limit_threads(threads):
+    # Job workers only: a worker process runs one job at a time, so the
+    # process-wide BLAS / OpenMP limit belongs to this job alone
+    from threadpoolctl import threadpool_limits
+
+    with threadpool_limits(limits=max(1, int(threads))), thread_cap(threads):
+        yield
+
+
+INTERACTIVE_POLL_SECONDS = 0.5
+
+
+class CpuGovernor:
+
+    def __init__(self, slots=HOST_CPU_SLOTS, session_budget=SESSION_CPU_BUDGET):
+        self.slots = slots
+        self.session_budget = session_budget
+        self._queue = deque()
+        self._active = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    # ---------- leases ----------
+    def request(self, session, label, start, threads=None, kind="job"):
+        # start(ticket_id, threads) is called once slots are granted,
+        # possibly right away and always outside the governor's lock
+        ticket = {
+            "id": next(self._ids),
+            "session": session or "-",
+            "label": label,
+            "kind": kind,
+            "threads": max(1, min(threads or self.session_budget, self.slots)),
+            "start": start,
+            "requested": time.time(),
+            "granted": None
+        }
+        with self._lock:
+            if kind == "interactive":
+                # Ahead of the waiting jobs, behind other page stages
+                at = next(
+                    (i for i, t in enumerate(self._queue) if t["kind"] != "interactive"),
+                    len(self._queue)
+                )
+                self._queue.insert(at, ticket)
+            else:
+                self._queue.append(ticket)
+            granted = self._dispatch()
+        self._start(granted)
+        return ticket["id"]
+
+    def release(self, ticket_id):
+        with self._lock:
+            self._active.pop(ticket_id, None)
+            granted = self._dispatch()
+        self._start(granted)
+
+    def cancel(self, ticket_id):
+        # True if the request was still waiting and is now withdrawn
+        with self._lock:
+            for ticket in self._queue:
+                if ticket["id"] == ticket_id:
+                    self._queue.remove(ticket)
+                    granted = self._dispatch()
+                    break
+            else:
+                return False
+        self._start(granted)
+        return True
+
+    def position(self, ticket_id):
+        with self._lock:
+            for i, ticket in enumerate(self._queue):
+                if ticket["id"] == ticket_id:
+                    return i + 1
+        return None
+
+    def _held(self, session, kind):
+        return sum(
+            t["threads"] for t in self._active.values()
+            if t["session"] == session and t["kind"] == kind
+        )
+
+    def _dispatch(self):
+        granted = []
+        free = self.slots - sum(t["threads"] for t in self._active.values())
+        waiting = {t["session"] for t in self._queue}
+        for ticket in list(self._queue):
+            over_budget = (
+                len(waiting) > 1
+                and self._held(ticket["session"], ticket["kind"]) + ticket["threads"] > self.session_budget
+            )
+            if over_budget:
+                continue
+            room = free
+            if ticket["kind"] == "interactive":
+                # A page stage may use the slots of its own session's jobs
+                room += self._held(ticket["session"], "job")
+            if ticket["threads"] > room:
+                # First eligible request does not fit: later ones must not
+                # overtake it
+                break
+            self._queue.remove(ticket)
+            ticket["granted"] = time.time()
+            self._active[ticket["id"]] = ticket
+            free -= ticket["threads"]
+            granted.append(ticket)
+        return granted
+
+    def _start(self, granted):
+        for ticket in granted:
+            try:
+                ticket["start"](ticket["id"], ticket["threads"])
+            except Exception:
+                self.release(ticket["id"])
+                raise
+
+    # ---------- interactive stages ----------
+    @contextmanager
+    def interactive(self, session, label="page stage", waiting=None):
+        # Blocks until the stage is granted slots. waiting(position) is
+        # called about twice a second meanwhile; an exception raised there
+        # (a Streamlit rerun stopping the script) withdraws the request.
+        granted = threading.Event()
+        ticket_id = self.request(
+            session, label, lambda _id, _threads: granted.set(), kind="interactive"
+        )
+        try:
+            while not granted.wait(INTERACTIVE_POLL_SECONDS):
+                if waiting is not None:
+                    waiting(self.position(ticket_id))
+            with thread_cap(self.session_budget):
+                yield
+        finally:
+            if not self.cancel(ticket_id):
+                self.release(ticket_id)
+
+    # ---------- admin view ----------
+    def snapshot(self):
+        now = time.time()
+        with self._lock:
+            active = [
+                {
+                    "Session": t["session"][:8],
+                    "Kind": t["kind"],
+                    "Work": t["label"],
+                    "Threads": t["threads"],
+                    "Running (s)": round(now - t["granted"], 1)
+                }
+                for t in self._active.values()
+            ]
+            queued = [
+                {
+                    "Position": i + 1,
+                    "Session": t["session"][:8],
+                    "Kind": t["kind"],
+                    "Work": t["label"],
+                    "Threads": t["threads"],
+                    "Waiting (s)": round(now - t["requested"], 1)
+                }
+                for i, t in enumerate(self._queue)
+            ]
+            interactive = sum(t["kind"] == "interactive" for t in self._active.values())
+        in_use = sum(r["Threads"] for r in active)
+        return {
+            "slots": self.slots,
+            "session_budget": self.session_budget,
+            "in_use": in_use,
+            "queue_depth": len(queued),
+            "interactive_runs": interactive,
+            "active": active,
+            "queued": queued
+        }
+
+
+_governor = None
+_governor_lock = threading.Lock()
+
+
+def get_governor():
+    global _governor
+    with _governor_lock:
+        if _governor is None:
+            from threadpoolctl import threadpool_limits
+
+            # The app process's BLAS / OpenMP pools, for every session
+            threadpool_limits(limits=SESSION_CPU_BUDGET)
+            _governor = CpuGovernor()
+        return _governor
+
+
+def library_threads():
+    from threadpoolctl import threadpool_info
+
+    return [
+        {
+            "Library": info.get("prefix"),
+            "API": info.get("internal_api"),
+            "Threads": info.get("num_threads")
+        }
+        for info in threadpool_info()
+    ]
@@ -0,0 +1,212 @@
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from perf import stage
+
+
+# ===============================
+# Missing-value Imputation
+# ===============================
+# The result of an imputation is the filled cells only: per column, the
+# row positions that were missing and the values put there. apply_fills()
+# rebuilds a frame from the base one, copying just the columns that had
+# gaps, so the imputed frame shares every complete column with the
+# uploaded data.
+#
+# Numeric columns are filled by the chosen method; non-numeric columns
+# always take their most frequent value. Model-based fills (iterative,
+# kNN) are computed only for rows that have gaps, in row chunks on a
+# thread pool.
+
+IMPUTE_CHUNK_ROWS = 20_000
+IMPUTE_BLOCK_ELEMENTS = 4_000_000
+KNN_CANDIDATES = 3
+KNN_SEARCH_ITER = 3
+KNN_SEARCH_SAMPLE = 20_000
+
+METHODS = {
+    "median": "Median / most frequent",
+    "iterative": "Iterative (regression on the other columns)",
+    "knn": "Approximate k-nearest neighbours"
+}
+
+
+def _numeric_columns(df, columns):
+    return [c for c in columns if pd.api.types.is_numeric_dtype(df[c]) and not pd.api.types.is_bool_dtype(df[c])]
+
+
+def _chunked(rows, fill_rows, chunk_rows, n_jobs):
+    # fill_rows(block) -> filled values for those rows, one thread per chunk
+    from concurrent.futures import ThreadPoolExecutor
+    from engine.governor import thread_budget
+
+    starts = range(0, len(rows), chunk_rows)
+    with ThreadPoolExecutor(n_jobs or min(4, thread_budget())) as pool:
+        parts = list(pool.map(lambda s: fill_rows(rows[s:s + chunk_rows]), starts))
+    return np.vstack(parts) if parts else np.empty((0, 0))
+
+
+def _iterative_fill(values, rows, max_iter, sample_rows, chunk_rows, n_jobs, random_state):
+    from sklearn.experimental import enable_iterative_imputer  # noqa: F401
+    from sklearn.impute import IterativeImputer
+
+    # Fitted on a row sample; transform is row-wise, so it runs per chunk
+    rng = np.random.default_rng(random_state)
+    sample = rng.choice(len(values), size=min(sample_rows, len(values)), replace=False)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        lo, hi = np.nanmin(values, axis=0), np.nanmax(values, axis=0)
+    # Constant columns leave the bounds open (sklearn needs lo < hi)
+    flat = ~(lo < hi)
+    lo, hi = np.where(flat, -np.inf, lo), np.where(flat, np.inf, hi)
+    imputer = IterativeImputer(
+        max_iter=max_iter,
+        min_value=lo,
+        max_value=hi,
+        keep_empty_features=True,
+        random_state=random_state
+    )
+    with stage("iterative imputer fit", rows=len(sample)), warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        imputer.fit(values[sample])
+    return _chunked(rows, lambda block: imputer.transform(values[block]), chunk_rows, n_jobs)
+
+
+def _knn_fill(values, rows, n_neighbors, chunk_rows, n_jobs, random_state, progress):
+    from engine.neighbors import approximate_knn
+
+    # Candidates come from an approximate graph on standardized values.
+    # Gaps are placed at a quick regression estimate for the search (at
+    # the column mean, rows missing the same column would all cluster
+    # together and find no donors). Candidates are then re-ranked by
+    # nan-euclidean distance on the coordinates both rows observe, and
+    # each gap takes the mean of its nearest candidates that have that
+    # column, as in sklearn's KNNImputer.
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        mean = np.nanmean(values, axis=0)
+        std = np.nanstd(values, axis=0)
+        median = np.nanmedian(values, axis=0)
+    std = np.where(std > 0, std, 1.0)
+    Z = (values - mean) / std
+    search = Z.copy()
+    search[rows] = _iterative_fill(Z, rows, KNN_SEARCH_ITER, KNN_SEARCH_SAMPLE, chunk_rows, n_jobs, random_state)
+    graph = approximate_knn(
+        search,
+        n_neighbors=KNN_CANDIDATES * n_neighbors,
+        random_state=random_state,
+        progress=progress
+    )
+    del search
+    n_cand = graph["n_neighbors"]
+    p = values.shape[1]
+    chunk_rows = max(1, min(chunk_rows, IMPUTE_BLOCK_ELEMENTS // (n_cand * p)))
+
+    def fill_rows(block):
+        cand = graph["indices"][block]
+        a, b = Z[block][:, None, :], Z[cand]
+        both = ~np.isnan(a) & ~np.isnan(b)
+        shared = both.sum(axis=2)
+        d2 = np.where(both, (a - b) ** 2, 0.0).sum(axis=2) * p / np.maximum(shared, 1)
+        d2[shared == 0] = np.inf
+
+        filled = np.empty((len(block), p))
+        k = min(n_neighbors, n_cand)
+        for j in range(p):
+            donor = values[cand, j]
+            dj = np.where(np.isnan(donor), np.inf, d2)
+            top = np.argpartition(dj, k - 1, axis=1)[:, :k]
+            near = np.where(
+                np.isfinite(np.take_along_axis(dj, top, axis=1)),
+                np.take_along_axis(donor, top, axis=1),
+                np.nan
+            )
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore")
+                filled[:, j] = np.nanmean(near, axis=1)
+        # No donor among the candidates: fall back to the median
+        return np.where(np.isnan(filled), median, filled)
+
+    return _chunked(rows, fill_rows, chunk_rows, n_jobs)
+
+
+def impute_missing(df, method="median", columns=None, n_neighbors=5, max_iter=10,
+                   sample_rows=50_000, chunk_rows=IMPUTE_CHUNK_ROWS, n_jobs=None,
+                   random_state=0, progress=None):
+    if method not in METHODS:
+        raise ValueError(f"Unknown imputation method {method!r}")
+    columns = list(df.columns if columns is None else columns)
+    numeric = _numeric_columns(df, columns)
+    other = [c for c in columns if c not in numeric]
+    fills = {}
+    report = []
+
+    with stage("imputation", method=method, rows=len(df)):
+        if numeric:
+            values = df[numeric].to_numpy(dtype=float, na_value=np.nan)
+            missing = np.isnan(values)
+            rows = np.flatnonzero(missing.any(axis=1))
+            all_missing = missing.all(axis=0)
+
+            if method == "median" or not len(rows):
+                with warnings.catch_warnings():
+                    warnings.simplefilter("ignore")
+                    filled = np.broadcast_to(np.nanmedian(values, axis=0), (len(rows), len(numeric)))
+            else:
+                # Columns with no observed value cannot be modelled; they stay empty
+                usable = ~all_missing
+                filled = np.full((len(rows), len(numeric)), np.nan)
+                if method == "iterative":
+                    if progress:
+                        progress(0.1, "fitting iterative imputer")
+                    filled[:, usable] = _iterative_fill(
+                        values[:, usable], rows, max_iter, sample_rows, chunk_rows, n_jobs, random_state
+                    )
+                else:
+                    filled[:, usable] = _knn_fill(
+                        values[:, usable], rows, n_neighbors, chunk_rows, n_jobs, random_state, progress
+                    )
+
+            if progress:
+                progress(0.9, "collecting filled values")
+            gaps = missing[rows]
+            for j, col in enumerate(numeric):
+                at = np.flatnonzero(gaps[:, j])
+                if len(at) and not all_missing[j]:
+                    fills[col] = (rows[at], filled[at, j])
+                report.append({
+                    "Column": col,
+                    "Missing": int(missing[:, j].sum()),
+                    "Filled": 0 if all_missing[j] else len(at),
+                    "Method": "No observed values" if all_missing[j] else METHODS[method] if len(at) else "-"
+                })
+
+        for col in other:
+            series = df[col]
+            at = np.flatnonzero(series.isna().to_numpy())
+            counts = series.value_counts(dropna=True)
+            if len(at) and len(counts):
+                fills[col] = (at, np.full(len(at), counts.index[0], dtype=object))
+            report.append({
+                "Column": col,
+                "Missing": len(at),
+                "Filled": len(at) if len(counts) else 0,
+                "Method": "Most frequent" if len(at) else "-"
+            })
+
+    return {"fills": fills, "method": method, "report": pd.DataFrame(report)}
+
+
+def apply_fills(df, fills):
+    from engine.dataset import with_columns
+
+    columns = {}
+    for col, (positions, values) in fills.items():
+        series = df[col].copy()
+        if pd.api.types.is_integer_dtype(series.dtype):
+            values = np.round(values.astype(float))
+        series.iloc[positions] = values
+        columns[col] = series
+    return with_columns(df, **columns) if columns else df
@@ -0,0 +1,18 @@
+import os
+
+import pandas as pd
+
+from perf import stage
+
+
+# ===============================
+# Dataset Loading
+# ===============================
+def read_table(source, name=None):
+    name = name or getattr(source, "name", None) or str(source)
+    ext = os.path.splitext(name)[1].lower()
+
+    with stage("read_table", source=os.path.basename(name)):
+        if ext == ".parquet":
+            return pd.read_parquet(source)
+        return pd.read_csv(source)
@@ -0,0 +1,299 @@
+import hashlib
+import multiprocessing
+import os
+import pickle
+import threading
+import time
+import weakref
+from collections import Counter, OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from engine.governor import HOST_CPU_SLOTS, SESSION_CPU_BUDGET, get_governor, limit_threads
+from engine.precision import get_precision, use_precision
+
+
+# ===============================
+# Background Job Runner
+# ===============================
+# Heavy engine calls run in a process pool outside the Streamlit script
+# thread, so a widget interaction (which restarts the script) no longer
+# throws away work in progress. Jobs are keyed by a fingerprint of the
+# function and its inputs: submitting the same call again while it runs
+# (or after it finished) returns the existing job instead of starting a
+# duplicate. A caller that already has a content key for its large inputs
+# (the source dataset's key plus the parameters that derive them) passes
+# it as `source`; the inputs themselves are then described by shape only
+# instead of being hashed on every rerun.
+#
+# Finished results are kept per session (a few jobs each) and within a
+# byte budget for the whole process, oldest first out; the job a page is
+# currently looking at is never dropped.
+#
+# Progress and cancellation go through a Manager-backed dict. A job
+# function opts in by accepting a `progress` keyword; calling
+# `progress(fraction, message)` publishes progress and is also the
+# checkpoint where a cancellation request is honoured.
+#
+# A job is only handed to the pool once engine.governor grants it CPU
+# slots; until then it waits in the governor's queue, and the worker runs
+# it capped to the granted thread count.
+
+MAX_FINISHED_PER_SESSION = 8
+MAX_FINISHED_BYTES = int(os.environ.get("JOB_RESULTS_BUDGET_MB", "1024")) * 1e6
+
+PENDING = "pending"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+
+class JobCancelled(Exception):
+    pass
+
+
+# ===============================
+# Fingerprints
+# ===============================
+_fingerprints = {}
+
+
+def _digest_frame(df):
+    h = hashlib.sha1()
+    h.update(pickle.dumps((list(map(str, df.columns)), list(map(str, df.dtypes)))))
+    h.update(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+    return h.hexdigest()
+
+
+def fingerprint(obj):
+    # Large inputs are hashed once per object identity; frames and arrays
+    # are treated as immutable while a job keyed on them is alive.
+    if isinstance(obj, (pd.DataFrame, pd.Series, np.ndarray)):
+        cached = _fingerprints.get(id(obj))
+        if cached is not None and cached[0]() is obj:
+            return cached[1]
+        if isinstance(obj, np.ndarray):
+            digest = hashlib.sha1(
+                np.ascontiguousarray(obj).tobytes() + str((obj.dtype, obj.shape)).encode()
+            ).hexdigest()
+        else:
+            digest = _digest_frame(obj.to_frame() if isinstance(obj, pd.Series) else obj)
+        if len(_fingerprints) > 256:
+            _fingerprints.clear()
+        _fingerprints[id(obj)] = (weakref.ref(obj), digest)
+        return digest
+    if isinstance(obj, (list, tuple)):
+        return hashlib.sha1(
+            ("|".join(fingerprint(o) for o in obj) + type(obj).__name__).encode()
+        ).hexdigest()
+    if isinstance(obj, dict):
+        return fingerprint(sorted((str(k), fingerprint(v)) for k, v in obj.items()))
+    return hashlib.sha1(repr(obj).encode()).hexdigest()
+
+
+def _describe(obj):
+    if isinstance(obj, pd.DataFrame):
+        return ("frame", obj.shape, tuple(map(str, obj.columns)))
+    if isinstance(obj, (pd.Series, np.ndarray)):
+        return (type(obj).__name__, obj.shape, str(obj.dtype))
+    if isinstance(obj, (list, tuple)):
+        return type(obj)(_describe(o) for o in obj)
+    if isinstance(obj, dict):
+        return {k: _describe(v) for k, v in obj.items()}
+    return obj
+
+
+def job_key(fn, args, kwargs, precision=None, source=None):
+    if source is not None:
+        args, kwargs = _describe(args), _describe(kwargs)
+    return fingerprint((
+        f"{fn.__module__}.{fn.__qualname__}", source, args, kwargs, precision or get_precision()
+    ))[:16]
+
+
+# ===============================
+# Worker Side
+# ===============================
+def _run_job(key, fn, args, kwargs, shared, precision, threads):
+    def progress(fraction, message=""):
+        if shared.get(("cancel", key)):
+            raise JobCancelled()
+        shared[("progress", key)] = (float(fraction), str(message))
+
+    shared[("progress", key)] = (0.0, "started")
+    shared[("started", key)] = time.time()
+    try:
+        # Spawned workers start from the default; run in the submitter's
+        with use_precision(precision), limit_threads(threads):
+            return {"result": fn(*args, progress=progress, **kwargs)}
+    except JobCancelled:
+        return {"cancelled": True}
+
+
+# ===============================
+# Manager (process-wide)
+# ===============================
+class JobManager:
+
+    def __init__(self, max_workers=None):
+        ctx = multiprocessing.get_context("spawn")
+        self._sync = ctx.Manager()
+        self._shared = self._sync.dict()
+        # One worker per job the governor can run at once (each job holds a
+        # session budget of slots), so a granted job never waits for a worker
+        self._pool = ProcessPoolExecutor(
+            max_workers=max_workers or max(1, HOST_CPU_SLOTS // SESSION_CPU_BUDGET),
+            mp_context=ctx
+        )
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+
+    def submit(self, fn, *args, label=None, session=None, source=None, **kwargs):
+        precision = get_precision()
+        key = job_key(fn, args, kwargs, precision, source)
+        with self._lock:
+            # Finished, failed and cancelled jobs stay attached to their key
+            # until forget() or eviction so a rerun shows the outcome
+            # instead of silently starting over
+            if key in self._jobs:
+                self._jobs[key]["session"] = session
+                self._jobs.move_to_end(key)
+                self._evict(keep=key)
+                return key
+
+            self._shared.pop(("cancel", key), None)
+            job = {
+                "label": label or fn.__name__,
+                "session": session,
+                "bytes": 0,
+                "future": None,
+                "ticket": None,
+                "state": PENDING,
+                "submitted": time.time(),
+                "finished": None,
+                "result": None,
+                "error": None
+            }
+            self._jobs[key] = job
+
+        def start(ticket, threads):
+            governor = get_governor()
+            future = self._pool.submit(
+                _run_job, key, fn, args, kwargs, self._shared, precision, threads
+            )
+            future.add_done_callback(lambda _: governor.release(ticket))
+            job["future"] = future
+
+        job["ticket"] = get_governor().request(session, job["label"], start)
+        return key
+
+    def _evict(self, keep=None):
+        finished = [k for k, j in self._jobs.items() if j["state"] in (DONE, FAILED, CANCELLED)]
+        per_session = Counter(self._jobs[k]["session"] for k in finished)
+        total = sum(self._jobs[k]["bytes"] for k in finished)
+        for k in finished:
+            job = self._jobs[k]
+            if k == keep:
+                continue
+            if per_session[job["session"]] > MAX_FINISHED_PER_SESSION or total > MAX_FINISHED_BYTES:
+                per_session[job["session"]] -= 1
+                total -= job["bytes"]
+                self._forget(k)
+
+    def _refresh(self, job, key):
+        from engine.dataset import footprint
+
+        if job["state"] in (DONE, FAILED, CANCELLED):
+            return
+        future = job["future"]
+        if future is None:
+            return
+        if future.cancelled():
+            job["state"] = CANCELLED
+        elif future.done():
+            job["finished"] = time.time()
+            try:
+                outcome = future.result()
+                if outcome.get("cancelled"):
+                    job["state"] = CANCELLED
+                else:
+                    job["state"] = DONE
+                    job["result"] = outcome["result"]
+                    job["bytes"] = footprint(job["result"])
+            except Exception as exc:
+                job["state"] = FAILED
+                job["error"] = f"{type(exc).__name__}: {exc}"
+            self._evict(keep=key)
+        elif future.running() or ("started", key) in self._shared:
+            job["state"] = RUNNING
+
+    def status(self, key):
+        with self._lock:
+            job = self._jobs.get(key)
+            if job is None:
+                return None
+            self._refresh(job, key)
+            fraction, message = self._shared.get(("progress", key), (0.0, "queued"))
+            if job["future"] is None and job["state"] == PENDING:
+                position = get_governor().position(job["ticket"])
+                message = f"waiting for CPU (queue position {position})" if position else "queued"
+            if job["state"] == DONE:
+                fraction, message = 1.0, "done"
+            end = job["finished"] or time.time()
+            return {
+                "key": key,
+                "label": job["label"],
+                "state": job["state"],
+                "progress": fraction,
+                "message": message,
+                "cancelling": bool(self._shared.get(("cancel", key))),
+                "elapsed_s": end - job["submitted"],
+                "result": job["result"],
+                "error": job["error"]
+            }
+
+    def cancel(self, key):
+        with self._lock:
+            job = self._jobs.get(key)
+            if job is None:
+                return
+            if job["future"] is None:
+                if get_governor().cancel(job["ticket"]):
+                    job["state"] = CANCELLED
+                    job["finished"] = time.time()
+                    return
+            if job["future"] is not None and not job["future"].cancel():
+                # Already running: the worker stops at its next checkpoint
+                self._shared[("cancel", key)] = True
+
+    def forget(self, key):
+        with self._lock:
+            self._forget(key)
+
+    def _forget(self, key):
+        job = self._jobs.pop(key, None)
+        if job is not None:
+            if job["future"] is None:
+                get_governor().cancel(job["ticket"])
+            else:
+                job["future"].cancel()
+        for tag in ("progress", "cancel", "started"):
+            self._shared.pop((tag, key), None)
+
+    def jobs(self):
+        return [self.status(k) for k in list(self._jobs)]
+
+
+_manager = None
+_manager_lock = threading.Lock()
+
+
+def get_job_manager():
+    global _manager
+    with _manager_lock:
+        if _manager is None:
+            _manager = JobManager()
+        return _manager
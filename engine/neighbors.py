@@ -0,0 +1,175 @@
+import numpy as np
+
+from perf import stage
+
+
+# ===============================
+# Approximate Nearest Neighbours
+# ===============================
+# A random-projection forest: each tree recursively splits its rows at
+# the median of their projection on a random direction, level by level
+# for all nodes at once, until leaves hold at most leaf_size rows. Exact
+# distances are computed inside each leaf (padded leaves, batched matrix
+# products), the per-tree candidates are merged, and one neighbour-of-
+# neighbour pass (as in NN-descent) refines the result. Cost grows as
+# n log n instead of the n^2 of exact pairwise distances.
+
+LEAF_BATCH = 256
+CANDIDATE_BLOCK_BYTES = 32 << 20
+
+
+def _rp_tree_leaves(X, leaf_size, rng):
+    n = len(X)
+    order = np.arange(n)
+    starts = np.array([0])
+    sizes = np.array([n])
+
+    while (sizes > leaf_size).any():
+        split = sizes > leaf_size
+        node = np.repeat(np.arange(len(sizes)), sizes)
+
+        # Direction per node: difference of two random members
+        a = order[starts + (rng.random(len(sizes)) * sizes).astype(np.int64)]
+        b = order[starts + (rng.random(len(sizes)) * sizes).astype(np.int64)]
+        directions = X[a] - X[b]
+        directions[(directions == 0).all(axis=1)] = rng.normal(size=X.shape[1])
+        proj = np.einsum("ij,ij->i", X[order], directions[node]).astype(float)
+        proj[~split[node]] = 0.0
+
+        # One float sort instead of a lexsort: the projection is rescaled
+        # into [0, 0.5] within each node and added to the node number
+        low = np.minimum.reduceat(proj, starts)
+        span = np.maximum.reduceat(proj, starts) - low
+        span[span == 0] = 1.0
+        key = node + 0.5 * (proj - low[node]) / span[node]
+        order = order[np.argsort(key)]
+        half = sizes // 2
+        starts = np.sort(np.concatenate([starts, (starts + half)[split]]))
+        sizes = np.diff(np.append(starts, n))
+
+    return order, starts, sizes
+
+
+def _leaf_candidates(X, sq_norms, order, starts, sizes, k):
+    # Every row's k nearest rows within its leaf (padding slots are +inf)
+    m = int(sizes.max())
+    slots = np.arange(m)
+    positions = np.minimum(starts[:, None] + slots, len(order) - 1)
+    valid = slots < sizes[:, None]
+    members = order[positions]
+
+    idx = np.empty((len(X), k), dtype=np.int64)
+    dist = np.empty((len(X), k), dtype=X.dtype)
+    kk = min(k, m - 1)
+    for s in range(0, len(starts), LEAF_BATCH):
+        P = members[s:s + LEAF_BATCH]
+        ok = valid[s:s + LEAF_BATCH]
+        V = X[P]
+        d2 = sq_norms[P][:, :, None] + sq_norms[P][:, None, :] - 2 * V @ V.transpose(0, 2, 1)
+        d2 = np.where(ok[:, None, :], d2, np.inf)
+        d2[:, slots, slots] = np.inf
+
+        top = np.argpartition(d2, kk - 1, axis=2)[:, :, :kk]
+        rows = P[ok]
+        idx[rows, :kk] = np.take_along_axis(P[:, None, :], top, axis=2)[ok]
+        dist[rows, :kk] = np.take_along_axis(d2, top, axis=2)[ok]
+        idx[rows, kk:] = rows[:, None]
+        dist[rows, kk:] = np.inf
+    return idx, dist
+
+
+def _merge_candidates(idx, dist, k):
+    # Keep the k closest distinct candidates of each row; copies of one
+    # candidate carry the same distance, so any one of them can stay
+    by_id = np.argsort(idx, axis=1)
+    idx = np.take_along_axis(idx, by_id, axis=1)
+    dist = np.take_along_axis(dist, by_id, axis=1)
+    dist[:, 1:][idx[:, 1:] == idx[:, :-1]] = np.inf
+
+    top = np.argpartition(dist, k - 1, axis=1)[:, :k]
+    top_dist = np.take_along_axis(dist, top, axis=1)
+    order = np.argsort(top_dist, axis=1)
+    return (
+        np.take_along_axis(np.take_along_axis(idx, top, axis=1), order, axis=1),
+        np.take_along_axis(top_dist, order, axis=1)
+    )
+
+
+def _refine(X, sq_norms, idx, k):
+    # Neighbours of neighbours are likely neighbours: score them once, in
+    # row blocks sized so the gathered candidate vectors stay bounded.
+    # Candidate ids are sorted first so copies are dropped before scoring.
+    n = len(X)
+    block = max(256, CANDIDATE_BLOCK_BYTES // (X.itemsize * (k + 1) * k * X.shape[1]))
+    out_idx = np.empty_like(idx)
+    out_dist = np.empty((n, k), dtype=X.dtype)
+
+    for s in range(0, n, block):
+        rows = np.arange(s, min(s + block, n))
+        cand = np.sort(np.hstack([idx[rows], idx[idx[rows]].reshape(len(rows), -1)]), axis=1)
+        drop = cand == rows[:, None]
+        drop[:, 1:] |= cand[:, 1:] == cand[:, :-1]
+
+        d2 = sq_norms[rows][:, None] + sq_norms[cand] - 2 * np.matmul(X[cand], X[rows][:, :, None])[..., 0]
+        d2[drop] = np.inf
+
+        top = np.argpartition(d2, k - 1, axis=1)[:, :k]
+        top_d2 = np.take_along_axis(d2, top, axis=1)
+        order = np.argsort(top_d2, axis=1)
+        out_idx[rows] = np.take_along_axis(np.take_along_axis(cand, top, axis=1), order, axis=1)
+        out_dist[rows] = np.take_along_axis(top_d2, order, axis=1)
+    return out_idx, out_dist
+
+
+def approximate_knn(X, n_neighbors=15, n_trees=8, leaf_size=None, refine=True,
+                    random_state=42, progress=None):
+    # Distances are computed in float32: neighbour ranks barely change and
+    # the random row gathers, which dominate, move half the bytes
+    X = np.ascontiguousarray(X, dtype=np.float32)
+    n = len(X)
+    k = min(n_neighbors, n - 1)
+    leaf_size = max(leaf_size or 4 * k, k + 1)
+    rng = np.random.default_rng(random_state)
+    sq_norms = (X ** 2).sum(axis=1)
+
+    idx = np.empty((n, 0), dtype=np.int64)
+    dist = np.empty((n, 0), dtype=X.dtype)
+    with stage("rp forest", rows=n, trees=n_trees):
+        for t in range(n_trees):
+            if progress:
+                progress(t / (n_trees + refine), f"tree {t + 1}/{n_trees}")
+            order, starts, sizes = _rp_tree_leaves(X, leaf_size, rng)
+            tree_idx, tree_dist = _leaf_candidates(X, sq_norms, order, starts, sizes, k)
+            idx, dist = _merge_candidates(
+                np.hstack([idx, tree_idx]), np.hstack([dist, tree_dist]), k
+            )
+
+    if refine:
+        if progress:
+            progress(n_trees / (n_trees + 1), "refining neighbours")
+        with stage("knn refinement", rows=n):
+            idx, dist = _refine(X, sq_norms, idx, k)
+
+    return {
+        "indices": idx,
+        "distances": np.sqrt(np.maximum(dist, 0.0)).astype(float),
+        "n_neighbors": k
+    }
+
+
+def knn_recall(X, graph, sample_size=500, batch_rows=16, random_state=0):
+    # Share of the exact k nearest neighbours found, on a row sample
+    X = np.asarray(X, dtype=float)
+    rng = np.random.default_rng(random_state)
+    rows = rng.choice(len(X), size=min(sample_size, len(X)), replace=False)
+    k = graph["n_neighbors"]
+    sq_norms = (X ** 2).sum(axis=1)
+
+    hits = 0
+    for s in range(0, len(rows), batch_rows):
+        r = rows[s:s + batch_rows]
+        d2 = sq_norms[None, :] - 2 * X[r] @ X.T
+        d2[np.arange(len(r)), r] = np.inf
+        exact = np.argpartition(d2, k - 1, axis=1)[:, :k]
+        hits += sum(len(np.intersect1d(e, f)) for e, f in zip(exact, graph["indices"][r]))
+    return hits / (len(rows) * k)
@@ -0,0 +1,175 @@
+import numpy as np
+import pandas as pd
+
+from perf import stage
+
+
+# ===============================
+# Multivariate Outlier Scores
+# ===============================
+# Two per-row scores over the selected numeric columns, computed once and
+# kept; flags for any threshold or rule are then a cheap comparison.
+#
+# Robust Mahalanobis distance: mean and covariance come from streaming
+# co-moments (engine.correlation.CoMoments) accumulated over row chunks
+# in parallel. The estimate is reweighted a few times on the rows inside
+# the chi-square cut-off, with the usual consistency correction, so the
+# outliers themselves do not inflate the covariance.
+#
+# Isolation Forest: every tree is grown on a small subsample (256 rows),
+# fitted on a bounded row sample and scored in row chunks in parallel.
+#
+# Rows with a missing value in the selected columns get no score and are
+# never flagged.
+
+OUTLIER_CHUNK_ROWS = 50_000
+REWEIGHT_STEPS = 3
+REWEIGHT_QUANTILE = 0.975
+ISOLATION_FIT_ROWS = 100_000
+
+RULES = {
+    "either": "Flagged by either method",
+    "both": "Flagged by both methods",
+    "isolation": "Isolation Forest only",
+    "mahalanobis": "Robust Mahalanobis only"
+}
+
+
+def _chunk_map(fn, n, chunk_rows, n_jobs):
+    from concurrent.futures import ThreadPoolExecutor
+    from engine.governor import thread_budget
+
+    bounds = [(s, min(s + chunk_rows, n)) for s in range(0, n, chunk_rows)]
+    with ThreadPoolExecutor(n_jobs or min(4, thread_budget())) as pool:
+        return list(pool.map(lambda b: fn(*b), bounds))
+
+
+def _moments(X, keep, columns, chunk_rows, n_jobs):
+    from engine.correlation import CoMoments
+
+    parts = _chunk_map(
+        lambda s, e: CoMoments(columns, pairwise=False).update(X[s:e][keep[s:e]]),
+        len(X), chunk_rows, n_jobs
+    )
+    total = parts[0]
+    for part in parts[1:]:
+        total.merge(part)
+    return total
+
+
+def _squared_distances(X, mean, precision, chunk_rows, n_jobs):
+    def block(s, e):
+        D = X[s:e] - mean
+        return (D @ precision * D).sum(axis=1)
+
+    return np.concatenate(_chunk_map(block, len(X), chunk_rows, n_jobs))
+
+
+def robust_mahalanobis(X, columns, steps=REWEIGHT_STEPS, quantile=REWEIGHT_QUANTILE,
+                       chunk_rows=OUTLIER_CHUNK_ROWS, n_jobs=None):
+    from scipy.stats import chi2
+
+    p = X.shape[1]
+    cutoff = chi2.ppf(quantile, p)
+    # A covariance from the rows inside the cut-off is too small by this factor
+    consistency = quantile / chi2.cdf(cutoff, p + 2)
+
+    keep = np.ones(len(X), dtype=bool)
+    for _ in range(steps + 1):
+        moments = _moments(X, keep, columns, chunk_rows, n_jobs)
+        mean = moments.column_stats()["mean"].to_numpy()
+        cov = moments.covariance().to_numpy()
+        if not keep.all():
+            cov = cov * consistency
+        # pinv: constant or collinear columns add no distance
+        d2 = _squared_distances(X, mean, np.linalg.pinv(cov), chunk_rows, n_jobs)
+        inside = d2 <= cutoff
+        if (inside == keep).all() or inside.sum() <= p:
+            break
+        keep = inside
+    return d2
+
+
+def isolation_scores(X, n_estimators=100, max_samples=256, random_state=0,
+                     chunk_rows=OUTLIER_CHUNK_ROWS, n_jobs=None):
+    from sklearn.ensemble import IsolationForest
+
+    rng = np.random.default_rng(random_state)
+    fit_rows = rng.choice(len(X), size=min(ISOLATION_FIT_ROWS, len(X)), replace=False)
+    forest = IsolationForest(
+        n_estimators=n_estimators,
+        max_samples=min(max_samples, len(fit_rows)),
+        random_state=random_state
+    )
+    with stage("isolation forest fit", rows=len(fit_rows)):
+        forest.fit(X[fit_rows])
+    # Anomaly score in (0, 1]; about 0.5 is ordinary, close to 1 isolated
+    parts = _chunk_map(lambda s, e: -forest.score_samples(X[s:e]), len(X), chunk_rows, n_jobs)
+    return np.concatenate(parts)
+
+
+def outlier_scores(df, features, n_estimators=100, random_state=0,
+                   chunk_rows=OUTLIER_CHUNK_ROWS, n_jobs=None, progress=None):
+    features = list(features)
+    values = df[features].to_numpy(dtype=float, na_value=np.nan)
+    rows = np.flatnonzero(~np.isnan(values).any(axis=1))
+    X = values[rows]
+    del values
+
+    if len(X) <= len(features):
+        # Too few complete rows for a covariance: nothing is scored
+        return {
+            "features": features,
+            "n_rows": len(df),
+            "rows": rows[:0],
+            "mahalanobis": np.empty(0),
+            "isolation": np.empty(0)
+        }
+
+    with stage("outlier scores", rows=len(X), columns=len(features)):
+        if progress:
+            progress(0.05, "robust Mahalanobis distance")
+        d2 = robust_mahalanobis(X, features, chunk_rows=chunk_rows, n_jobs=n_jobs)
+        if progress:
+            progress(0.5, "isolation forest")
+        iso = isolation_scores(X, n_estimators, random_state=random_state,
+                               chunk_rows=chunk_rows, n_jobs=n_jobs)
+
+    return {
+        "features": features,
+        "n_rows": len(df),
+        "rows": rows,
+        "mahalanobis": d2,
+        "isolation": iso
+    }
+
+
+def flag_outliers(scores, alpha=0.01, rule="either"):
+    # Boolean mask over all rows of the scored frame. Mahalanobis flags
+    # rows beyond the chi-square (1 - alpha) quantile; Isolation Forest
+    # flags the alpha share of rows with the highest anomaly score.
+    from scipy.stats import chi2
+
+    if rule not in RULES:
+        raise ValueError(f"Unknown rule {rule!r}")
+    maha = scores["mahalanobis"] > chi2.ppf(1 - alpha, len(scores["features"]))
+    iso = scores["isolation"] > np.quantile(scores["isolation"], 1 - alpha) if len(scores["isolation"]) else maha
+    flagged = {
+        "either": maha | iso,
+        "both": maha & iso,
+        "isolation": iso,
+        "mahalanobis": maha
+    }[rule]
+
+    mask = np.zeros(scores["n_rows"], dtype=bool)
+    mask[scores["rows"][flagged]] = True
+    return mask
+
+
+def score_table(df, scores, mask):
+    # Flagged rows, most anomalous first
+    flagged = mask[scores["rows"]]
+    table = df.iloc[scores["rows"][flagged]][scores["features"]].copy()
+    table.insert(0, "Isolation Score", scores["isolation"][flagged])
+    table.insert(1, "Mahalanobis D²", scores["mahalanobis"][flagged])
+    return table.sort_values("Isolation Score", ascending=False)
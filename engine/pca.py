@@ -0,0 +1,138 @@
+import numpy as np
+import pandas as pd
+
+from engine.precision import as_compute_array, compute_dtype
+from perf import stage
+
+
+# ===============================
+# Standardization
+# ===============================
+def standardize(X):
+    from sklearn.preprocessing import StandardScaler
+
+    # One owned copy in the compute precision, then scaled in place
+    values = as_compute_array(X)
+    with stage("standard scaler", dtype=values.dtype.name):
+        scaler = StandardScaler(copy=False)
+        return scaler.fit_transform(values), scaler
+
+
+# ===============================
+# PCA
+# ===============================
+def pca_spectrum(X_scaled):
+    from sklearn.decomposition import PCA
+
+    with stage("pca fit"):
+        pca = PCA()
+        pca.fit(X_scaled)
+
+    return {
+        "explained_variance": pca.explained_variance_,
+        "explained_variance_ratio": pca.explained_variance_ratio_,
+        "cumulative_variance": np.cumsum(pca.explained_variance_ratio_)
+    }
+
+
+def pca_project(X_scaled, n_components, features):
+    from sklearn.decomposition import PCA
+
+    with stage("pca projection"):
+        pca_final = PCA(n_components=n_components)
+        scores = pca_final.fit_transform(X_scaled)
+
+    columns = [f"PC{i+1}" for i in range(n_components)]
+    loadings = pd.DataFrame(
+        pca_final.components_.T,
+        index=features,
+        columns=columns
+    )
+    return scores, loadings
+
+
+# ===============================
+# PCA from Co-moments
+# ===============================
+# PCA of standardized data is the eigen-decomposition of the correlation
+# matrix, so the spectrum comes straight from complete-case co-moments
+# (engine.correlation) and only the final projection touches the rows,
+# one chunk at a time.
+
+def _correlation_for_pca(moments):
+    corr = moments.correlation().to_numpy().copy()
+    # StandardScaler maps constant columns to zeros: no variance at all
+    constant = ~(moments.column_stats()["std"].to_numpy() > 0)
+    corr[constant, :] = 0.0
+    corr[:, constant] = 0.0
+    return corr
+
+
+def pca_spectrum_from_moments(moments):
+    with stage("pca eigen-decomposition"):
+        eigvals, eigvecs = np.linalg.eigh(_correlation_for_pca(moments))
+    order = np.argsort(eigvals)[::-1]
+    eigvals = np.clip(eigvals[order], 0.0, None)
+    components = eigvecs[:, order].T
+
+    # Same sign convention as sklearn: largest loading of each component positive
+    signs = np.sign(components[np.arange(len(components)), np.abs(components).argmax(axis=1)])
+    components *= np.where(signs == 0, 1.0, signs)[:, None]
+
+    n = moments.rows
+    ratio = eigvals / eigvals.sum()
+    return {
+        "explained_variance": eigvals * n / max(n - 1, 1),
+        "explained_variance_ratio": ratio,
+        "cumulative_variance": np.cumsum(ratio),
+        "components": components
+    }
+
+
+def standardized_chunks(df, features, moments, chunk_rows=50_000):
+    # Complete-case rows of df[features], standardized one chunk at a time
+    stats = moments.column_stats()
+    mean = stats["mean"].to_numpy()
+    std = stats["std"].to_numpy()
+    std = np.where(std > 0, std, 1.0)
+    dtype = compute_dtype()
+    mean, std = mean.astype(dtype), std.astype(dtype)
+
+    for start in range(0, len(df), chunk_rows):
+        chunk = df[features].iloc[start:start + chunk_rows]
+        values = chunk.to_numpy(dtype=dtype, na_value=np.nan)
+        keep = ~np.isnan(values).any(axis=1)
+        Z = values[keep]
+        Z -= mean
+        Z /= std
+        yield chunk.index[keep], Z
+
+
+def pca_project_chunked(df, features, moments, spectrum, n_components):
+    components = spectrum["components"][:n_components]
+
+    with stage("pca projection"):
+        parts = [
+            (index, Z @ components.T.astype(Z.dtype))
+            for index, Z in standardized_chunks(df, features, moments)
+        ]
+
+    columns = [f"PC{i+1}" for i in range(n_components)]
+    scores = np.vstack([p[1] for p in parts]) if parts else np.empty((0, n_components))
+    index = parts[0][0].append([p[0] for p in parts[1:]]) if parts else pd.Index([])
+    loadings = pd.DataFrame(components.T, index=features, columns=columns)
+    return scores, loadings, index
+
+
+def run_pca(df, features, n_components=2, moments=None):
+    from engine.correlation import accumulate_comoments
+
+    if moments is None:
+        moments = accumulate_comoments(df, features, pairwise=False)
+    spectrum = pca_spectrum_from_moments(moments)
+    scores, loadings, index = pca_project_chunked(df, features, moments, spectrum, n_components)
+    return {
+        **{k: v for k, v in spectrum.items() if k != "components"},
+        "scores": pd.DataFrame(scores, columns=loadings.columns, index=index),
+        "loadings": loadings
+    }
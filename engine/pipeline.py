@@ -0,0 +1,198 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from perf import stage
+from engine import arm, clustering, eda, factor, pca, profiling, supervised
+from engine.precision import DEFAULT_PRECISION, use_precision
+
+
+STEPS = ["profile", "eda", "pca", "factor", "kmeans", "arm", "supervised"]
+
+
+# ===============================
+# Full Analysis Pipeline
+# ===============================
+# Runs the same computations as the Streamlit pages, with the pages'
+# default choices, and returns plain DataFrames keyed by output name.
+# A failing step is recorded in the summary and does not stop the others.
+
+def _numeric_features(df, target):
+    cols = df.select_dtypes(include=["int64", "float64"]).columns.tolist()
+    return [c for c in cols if c != target]
+
+
+def _step_profile(df, cfg, out, summary):
+    out["profile"] = profiling.column_quality_summary(df)
+    summary["duplicate_rows"] = int(len(profiling.duplicate_rows(df)))
+
+
+def _step_eda(df, cfg, out, summary):
+    target = cfg["target"]
+    if not target or not pd.api.types.is_numeric_dtype(df[target]):
+        summary["eda"] = "skipped: needs a numerical target"
+        return
+    out["pearson"] = eda.pearson_with_target(df, target).rename("pearson").to_frame()
+    out["spearman"] = eda.spearman_with_target(df, target).rename("spearman").to_frame()
+
+    X, y = eda.shap_inputs(df, target)
+    if X.shape[1] >= 2:
+        shap_result = eda.shap_importance(X, y)
+        out["shap_importance"] = shap_result["mean_abs"].rename("mean_abs_shap").to_frame()
+
+
+def _step_pca(df, cfg, out, summary):
+    features = _numeric_features(df, cfg["target"])
+    if len(features) < 2:
+        summary["pca"] = "skipped: fewer than 2 numeric features"
+        return
+    n_components = min(cfg["components"], len(features))
+    result = pca.run_pca(df, features, n_components)
+    out["pca_variance"] = pd.DataFrame({
+        "explained_variance": result["explained_variance"],
+        "explained_variance_ratio": result["explained_variance_ratio"],
+        "cumulative_variance": result["cumulative_variance"]
+    })
+    out["pca_loadings"] = result["loadings"]
+    out["pca_scores"] = result["scores"]
+
+
+def _step_factor(df, cfg, out, summary):
+    data = factor.prepare_factor_data(df, _numeric_features(df, cfg["target"]))
+    if data.shape[1] < 3 or data.shape[0] < 10:
+        summary["factor"] = "skipped: not enough valid variables / observations"
+        return
+    moments = factor.factor_moments(data)
+    corr, n = moments.correlation().to_numpy(), moments.rows
+    tests = factor.adequacy_tests(corr, n)
+    summary["factor_adequacy"] = {
+        k: bool(tests[k]) if k == "suitable" else float(tests[k])
+        for k in ("kmo", "chi_square", "p_value", "suitable")
+    }
+    if not tests["suitable"]:
+        summary["factor"] = "skipped: KMO < 0.6 or Bartlett p-value >= 0.05"
+        return
+    n_factors = min(cfg["factors"], data.shape[1])
+    result = factor.extract_factors(corr, n_factors, data.columns)
+    summary["factor_method"] = result["method"]
+    out["factor_loadings"] = result["loadings"]
+    out["factor_scores"] = pd.DataFrame(
+        factor.factor_scores(data, moments, result["weights"]),
+        columns=result["factor_names"],
+        index=data.index
+    )
+
+
+def _step_kmeans(df, cfg, out, summary):
+    features = _numeric_features(df, cfg["target"])
+    if len(features) < 2:
+        summary["kmeans"] = "skipped: fewer than 2 numeric features"
+        return
+    data = df[features].dropna()
+    X_scaled, _ = pca.standardize(data)
+    out["elbow"] = pd.DataFrame({
+        "k": list(range(1, 11)),
+        "inertia": clustering.elbow_inertia(X_scaled)
+    })
+    fit = clustering.fit_kmeans(X_scaled, cfg["k"])
+    summary["kmeans_inertia"] = float(fit["inertia"])
+    out["cluster_labels"] = pd.DataFrame({"Cluster": fit["labels"]}, index=data.index)
+    out["cluster_profile"] = clustering.cluster_profile(data, fit["labels"], features)
+
+
+def _step_arm(df, cfg, out, summary):
+    cols = cfg["arm_columns"] or df.select_dtypes(exclude=np.number).columns.tolist()
+    if len(cols) < 2:
+        summary["arm"] = "skipped: fewer than 2 columns"
+        return
+    encoded = arm.encode_transactions(df, cols)
+    itemsets = arm.frequent_itemsets(encoded, cfg["min_support"])
+    if itemsets.empty:
+        summary["arm"] = "no frequent itemsets"
+        return
+    rules = arm.mine_rules(itemsets, cfg["min_confidence"], cfg["min_lift"])
+    out["association_rules"] = rules[
+        ["antecedents_str", "consequents_str", "support", "confidence", "lift"]
+    ].sort_values("lift", ascending=False)
+
+
+def _step_supervised(df, cfg, out, summary):
+    target = cfg["target"]
+    if not target:
+        summary["supervised"] = "skipped: no target"
+        return
+    data = df.dropna()
+    problem_type = supervised.detect_problem_type(data[target])
+    X, y = supervised.prepare_features(data, target)
+    results = supervised.train_and_evaluate(X, y, problem_type)
+    best_row, metric = supervised.best_model(results, problem_type)
+    summary["problem_type"] = problem_type
+    summary["best_model"] = {"name": best_row["Model"], metric: float(best_row[metric])}
+    out["model_comparison"] = results
+
+
+_STEP_FUNCS = {
+    "profile": _step_profile,
+    "eda": _step_eda,
+    "pca": _step_pca,
+    "factor": _step_factor,
+    "kmeans": _step_kmeans,
+    "arm": _step_arm,
+    "supervised": _step_supervised,
+}
+
+
+def default_config(**overrides):
+    cfg = {
+        "target": None,
+        "drop_columns": [],
+        "steps": list(STEPS),
+        "components": 2,
+        "factors": 3,
+        "k": 3,
+        "arm_columns": None,
+        "min_support": 0.05,
+        "min_confidence": 0.6,
+        "min_lift": 1.2,
+        "precision": DEFAULT_PRECISION
+    }
+    cfg.update({k: v for k, v in overrides.items() if v is not None})
+    return cfg
+
+
+def run_analysis(df, config=None):
+    cfg = config or default_config()
+    df = df.drop(columns=cfg["drop_columns"], errors="ignore")
+
+    if cfg["target"] and cfg["target"] not in df.columns:
+        raise ValueError(f"Target column '{cfg['target']}' not found.")
+
+    outputs = {}
+    precision = cfg.get("precision", DEFAULT_PRECISION)
+    summary = {
+        "rows": int(df.shape[0]),
+        "columns": int(df.shape[1]),
+        "precision": precision,
+        "errors": {}
+    }
+
+    with use_precision(precision):
+        for step in cfg["steps"]:
+            with stage(f"pipeline: {step}"):
+                try:
+                    _STEP_FUNCS[step](df, cfg, outputs, summary)
+                except Exception as exc:
+                    summary["errors"][step] = f"{type(exc).__name__}: {exc}"
+
+    return outputs, summary
+
+
+def write_outputs(outputs, summary, out_dir):
+    os.makedirs(out_dir, exist_ok=True)
+    for name, frame in outputs.items():
+        keep_index = not isinstance(frame.index, pd.RangeIndex)
+        frame.to_csv(os.path.join(out_dir, f"{name}.csv"), index=keep_index)
+    with open(os.path.join(out_dir, "summary.json"), "w") as f:
+        json.dump(summary, f, indent=2, default=str)
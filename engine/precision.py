@@ -0,0 +1,136 @@
+import contextvars
+import os
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+
+
+# ===============================
+# Compute Precision
+# ===============================
+# Row-sized numeric matrices (scaled features, PCA and factor scores,
+# K-Means inputs, model inputs) are built in the precision chosen here.
+# float32 halves their memory and roughly halves BLAS time. Small p x p
+# reductions that set the accuracy of results (co-moments, eigen
+# decompositions, rotations) always stay float64.
+#
+# The setting is a context variable: each Streamlit script run sets it
+# from its session, and background jobs carry the submitting run's value
+# into their worker process. Thread pools inside the engine do not
+# inherit it, so callers resolve compute_dtype() before fanning out.
+
+PRECISIONS = {"float64": np.float64, "float32": np.float32}
+DEFAULT_PRECISION = os.environ.get("COMPUTE_PRECISION", "float64")
+
+_precision = contextvars.ContextVar("compute_precision", default=DEFAULT_PRECISION)
+
+
+def get_precision():
+    return _precision.get()
+
+
+def set_precision(name):
+    if name not in PRECISIONS:
+        raise ValueError(f"Unknown precision {name!r}; expected one of {', '.join(PRECISIONS)}")
+    _precision.set(name)
+
+
+@contextmanager
+def use_precision(name):
+    if name not in PRECISIONS:
+        raise ValueError(f"Unknown precision {name!r}; expected one of {', '.join(PRECISIONS)}")
+    token = _precision.set(name)
+    try:
+        yield
+    finally:
+        _precision.reset(token)
+
+
+def compute_dtype():
+    return PRECISIONS[_precision.get()]
+
+
+def as_compute_array(X, dtype=None):
+    # Always a fresh array owned by the caller, so it can be scaled in place
+    dtype = dtype or compute_dtype()
+    if isinstance(X, (pd.DataFrame, pd.Series)):
+        return X.to_numpy(dtype=dtype, na_value=np.nan, copy=True)
+    return np.array(X, dtype=dtype, copy=True)
+
+
+# ===============================
+# float32 Validation Report
+# ===============================
+def _compare(metric, reference, candidate):
+    reference = np.atleast_1d(np.asarray(reference, dtype=float))
+    candidate = np.atleast_1d(np.asarray(candidate, dtype=float))
+    diff = float(np.abs(reference - candidate).max())
+    scale = float(np.abs(reference).max()) or 1.0
+    # Scalars are shown side by side; arrays only by their largest difference
+    return {
+        "Metric": metric,
+        "Values": reference.size,
+        "float64": float(reference[0]) if reference.size == 1 else np.nan,
+        "float32": float(candidate[0]) if candidate.size == 1 else np.nan,
+        "Max Abs Diff": diff,
+        "Rel Diff": diff / scale
+    }
+
+
+def _align_signs(reference, candidate):
+    # Eigenvector signs are arbitrary; match each column to the reference
+    signs = np.sign((reference * candidate).sum(axis=0))
+    return candidate * np.where(signs == 0, 1.0, signs)
+
+
+def precision_report(df, features, sample_rows=20_000, k=4, n_components=3,
+                     n_factors=2, tolerance=1e-3, random_state=0):
+    from sklearn.cluster import KMeans
+    from engine.factor import extract_factors
+    from engine.pca import standardize
+
+    data = df[list(features)].dropna()
+    if len(data) > sample_rows:
+        data = data.sample(sample_rows, random_state=random_state)
+    k = min(k, len(data))
+    n_components = min(n_components, len(features))
+    n_factors = min(n_factors, len(features))
+    seeds = np.random.default_rng(random_state).choice(len(data), size=k, replace=False)
+
+    out = {}
+    for name in ("float64", "float32"):
+        with use_precision(name):
+            X, _ = standardize(data)
+        # Same starting centers in both precisions, so differences come
+        # from arithmetic only
+        km = KMeans(n_clusters=k, init=X[seeds], n_init=1).fit(X)
+        corr = (X.T @ X).astype(float) / len(X)
+        eigvals, eigvecs = np.linalg.eigh(corr)
+        order = np.argsort(eigvals)[::-1]
+        components = eigvecs[:, order[:n_components]]
+        out[name] = {
+            "inertia": km.inertia_,
+            "labels": km.labels_,
+            "explained": eigvals[order] / eigvals.sum(),
+            "scores": X @ components.astype(X.dtype),
+            "components": components,
+            "loadings": extract_factors(corr, n_factors, list(features))["loadings"].to_numpy()
+        }
+
+    a, b = out["float64"], out["float32"]
+    rows = [
+        _compare("K-Means inertia", a["inertia"], b["inertia"]),
+        _compare("Explained variance ratio", a["explained"], b["explained"]),
+        _compare("PCA loadings", a["components"], _align_signs(a["components"], b["components"])),
+        _compare("PCA scores", a["scores"], b["scores"] * np.sign((a["components"] * b["components"]).sum(axis=0))),
+        _compare("Factor loadings", a["loadings"], _align_signs(a["loadings"], b["loadings"]))
+    ]
+    report = pd.DataFrame(rows)
+    report["Within Tolerance"] = report["Rel Diff"] <= tolerance
+    return {
+        "table": report,
+        "label_agreement": float((a["labels"] == b["labels"]).mean()),
+        "rows": len(data),
+        "tolerance": tolerance
+    }
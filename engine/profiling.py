@@ -0,0 +1,57 @@
+import numpy as np
+import pandas as pd
+
+from perf import stage
+
+
+# ===============================
+# Column Quality Profiling
+# ===============================
+def column_quality_summary(df):
+    with stage("data quality summary"):
+        summary = []
+
+        for col in df.columns:
+            col_data = df[col]
+            missing_count = col_data.isnull().sum()
+
+            outliers = 0
+            if pd.api.types.is_numeric_dtype(col_data):
+                Q1 = col_data.quantile(0.25)
+                Q3 = col_data.quantile(0.75)
+                IQR = Q3 - Q1
+                lower = Q1 - 1.5 * IQR
+                upper = Q3 + 1.5 * IQR
+                outliers = col_data[(col_data < lower) | (col_data > upper)].count()
+
+            summary.append({
+                "Column Name": col,
+                "Data Type": col_data.dtype,
+                "Missing Values": missing_count,
+                "Outliers (IQR)": outliers,
+                "Unique Values": col_data.nunique()
+            })
+
+        return pd.DataFrame(summary)
+
+
+def duplicate_rows(df):
+    with stage("duplicate detection"):
+        return df[df.duplicated()]
+
+
+def dataset_overview(df):
+    return pd.DataFrame({
+        "Metric": [
+            "Total Rows",
+            "Total Columns",
+            "Numerical Columns",
+            "Categorical Columns"
+        ],
+        "Value": [
+            df.shape[0],
+            df.shape[1],
+            df.select_dtypes(include=np.number).shape[1],
+            df.select_dtypes(exclude=np.number).shape[1]
+        ]
+    })
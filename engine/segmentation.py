@@ -0,0 +1,188 @@
+import io
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from perf import stage
+
+
+# ===============================
+# Segmentation Artifacts
+# ===============================
+# A fitted K-Means segmentation is saved as one .npz file: the scaler
+# (mean, scale), the centroids and cluster sizes as arrays, and the
+# feature list and version as a JSON string. Nothing in it needs pickle,
+# so files from other sessions are safe to load.
+
+SEGMENTATION_FORMAT = 1
+ASSIGN_BATCH_BYTES = 16 << 20
+
+
+def segmentation_bytes(state):
+    meta = {
+        "format": SEGMENTATION_FORMAT,
+        "features": state["features"],
+        "version": int(state["version"]),
+        "k": int(len(state["centers"]))
+    }
+    buffer = io.BytesIO()
+    np.savez_compressed(
+        buffer,
+        mean=state["mean"],
+        scale=state["scale"],
+        centers=state["centers"],
+        counts=state["counts"],
+        meta=np.array(json.dumps(meta))
+    )
+    return buffer.getvalue()
+
+
+def save_segmentation(state, path):
+    with open(path, "wb") as f:
+        f.write(segmentation_bytes(state))
+
+
+def load_segmentation(source):
+    with np.load(source, allow_pickle=False) as npz:
+        missing = {"mean", "scale", "centers", "counts", "meta"} - set(npz.files)
+        if missing:
+            raise ValueError(f"Not a segmentation file: missing {', '.join(sorted(missing))}")
+        meta = json.loads(str(npz["meta"]))
+        segmentation = {
+            "features": meta["features"],
+            "version": meta["version"],
+            "mean": npz["mean"],
+            "scale": npz["scale"],
+            "centers": npz["centers"],
+            "counts": npz["counts"]
+        }
+
+    if meta.get("format", 1) > SEGMENTATION_FORMAT:
+        raise ValueError("Segmentation file was written by a newer version")
+    if segmentation["centers"].shape[1] != len(segmentation["features"]):
+        raise ValueError("Segmentation centroids do not match its feature list")
+    return segmentation
+
+
+# ===============================
+# Assignment of New Records
+# ===============================
+# New rows are standardized with the saved scaler and labelled with the
+# chunked nearest-centroid kernel from engine.clustering. Rows missing any
+# feature get label -1.
+
+def _assign_block(values, segmentation):
+    from engine.clustering import assign_nearest
+
+    labels = np.full(len(values), -1, dtype=np.int32)
+    keep = ~np.isnan(values).any(axis=1)
+    scaled = (values[keep] - segmentation["mean"]) / segmentation["scale"]
+    labels[keep] = assign_nearest(scaled, segmentation["centers"])
+    return labels
+
+
+def assign_frame(df, segmentation, chunk_rows=None):
+    from engine.clustering import ASSIGN_CHUNK_ROWS
+
+    features = segmentation["features"]
+    missing = [f for f in features if f not in df.columns]
+    if missing:
+        raise ValueError(f"Missing segmentation features: {', '.join(missing)}")
+
+    chunk_rows = chunk_rows or ASSIGN_CHUNK_ROWS
+    labels = np.empty(len(df), dtype=np.int32)
+    with stage("segment assignment", rows=len(df)):
+        for start in range(0, len(df), chunk_rows):
+            block = df[features].iloc[start:start + chunk_rows]
+            labels[start:start + len(block)] = _assign_block(
+                block.to_numpy(dtype=float, na_value=np.nan), segmentation
+            )
+    return labels
+
+
+def _record_batches(path, columns, batch_bytes, float_columns=()):
+    # Only the needed columns are parsed, one bounded batch at a time.
+    # CSV files are cut into line-aligned byte windows here because
+    # pyarrow's streaming CSV reader reads ahead without a bound. The cuts
+    # fall on newlines, so a CSV with newlines inside quoted fields is not
+    # supported. Every batch must share one schema, and a type guessed
+    # from one window can fail on a later one (integers, then 3.5; an
+    # empty column, then values), so no types are inferred: float_columns
+    # are parsed as float64 and the others as strings.
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    from pyarrow import csv
+
+    if path.lower().endswith(".parquet"):
+        reader = pq.ParquetFile(path)
+        yield from reader.iter_batches(columns=columns, batch_size=max(batch_bytes // 64, 1024))
+        return
+
+    convert = csv.ConvertOptions(
+        include_columns=columns,
+        column_types={c: pa.float64() if c in float_columns else pa.string() for c in columns}
+    )
+    with open(path, "rb") as f:
+        header = f.readline()
+        tail = b""
+        while True:
+            block = f.read(batch_bytes)
+            data = tail + block
+            if block:
+                cut = data.rfind(b"\n") + 1
+                data, tail = data[:cut], data[cut:]
+            else:
+                tail = b""
+            if data:
+                table = csv.read_csv(pa.py_buffer(header + data), convert_options=convert)
+                yield from table.to_batches()
+            if not block:
+                break
+
+
+def assign_file(path, segmentation, out_path, id_column=None, batch_bytes=ASSIGN_BATCH_BYTES):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    from pyarrow import csv
+
+    features = segmentation["features"]
+    columns = features + ([id_column] if id_column else [])
+    parquet_out = out_path.lower().endswith(".parquet")
+    counts = np.zeros(len(segmentation["centers"]) + 1, dtype=np.int64)
+    writer = None
+    rows = 0
+
+    with stage("segment assignment", source=os.path.basename(path)):
+        try:
+            for batch in _record_batches(path, columns, batch_bytes, float_columns=features):
+                # Nulls become NaN in the float cast
+                values = np.column_stack([
+                    batch.column(f).cast(pa.float64()).to_numpy(zero_copy_only=False)
+                    for f in features
+                ])
+                labels = _assign_block(values, segmentation)
+                counts += np.bincount(labels + 1, minlength=len(counts))
+
+                key = (
+                    {id_column: batch.column(id_column)} if id_column
+                    else {"row": np.arange(rows, rows + len(labels))}
+                )
+                table = pa.table({**key, "Cluster": labels})
+                if writer is None:
+                    writer = (
+                        pq.ParquetWriter(out_path, table.schema, compression="zstd")
+                        if parquet_out else csv.CSVWriter(out_path, table.schema)
+                    )
+                writer.write_table(table)
+                rows += len(labels)
+        finally:
+            if writer is not None:
+                writer.close()
+
+    return {
+        "rows": rows,
+        "unassigned": int(counts[0]),
+        "sizes": pd.Series(counts[1:], index=pd.RangeIndex(len(counts) - 1, name="Cluster"))
+    }
@@ -0,0 +1,176 @@
+import atexit
+import hashlib
+import os
+import shutil
+import tempfile
+import threading
+import uuid
+import weakref
+
+import numpy as np
+import pandas as pd
+
+from perf import stage
+
+
+# ===============================
+# Shared Read-only Dataset Store
+# ===============================
+# Sessions that open the same file get the same DataFrame object instead
+# of parsing and holding a copy each. A dataset is parsed once, written
+# to disk (numeric columns as .npy, everything else as one Arrow IPC
+# file) and mapped back read-only, so its columns live in the OS page
+# cache rather than in each session's heap.
+#
+# Entries are keyed by a hash of the file content. The store only keeps
+# a weak reference to each frame: once no session holds it any more, a
+# weakref.finalize callback removes the entry and its files. Frames are
+# read-only; pages derive new frames (copy-on-write) instead of writing
+# into them.
+
+_ROOT = os.path.join(tempfile.gettempdir(), "cluster_analysis_store", str(os.getpid()))
+
+
+def content_key(data, name=""):
+    h = hashlib.sha1(data if isinstance(data, (bytes, memoryview)) else bytes(data))
+    h.update(os.path.splitext(name)[1].lower().encode())
+    return h.hexdigest()
+
+
+def _is_mappable(series):
+    return isinstance(series.dtype, np.dtype) and series.dtype.kind in "biuf"
+
+
+# ===============================
+# Materialization
+# ===============================
+def _write(df, path):
+    import pyarrow as pa
+
+    os.makedirs(path)
+    columns = list(df.columns)
+    numeric = [c for c in columns if _is_mappable(df[c])]
+    other = [c for c in columns if c not in numeric]
+
+    for i, c in enumerate(columns):
+        if c in numeric:
+            np.save(os.path.join(path, f"{i}.npy"), np.ascontiguousarray(df[c].to_numpy()))
+
+    # Non-numeric columns and any non-default index go into one Arrow file
+    table = pa.Table.from_pandas(
+        df[other].set_axis([str(i) for i, c in enumerate(columns) if c in other], axis=1),
+        preserve_index=None
+    )
+    with pa.OSFile(os.path.join(path, "other.arrow"), "wb") as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+
+    return columns, numeric
+
+
+def _map(path, columns, numeric):
+    import pyarrow as pa
+
+    table = pa.ipc.open_file(pa.memory_map(os.path.join(path, "other.arrow"))).read_all()
+    other = table.to_pandas()
+
+    data = {}
+    for i, c in enumerate(columns):
+        if c in numeric:
+            data[c] = np.load(os.path.join(path, f"{i}.npy"), mmap_mode="r")
+        else:
+            data[c] = other[str(i)]
+    frame = pd.DataFrame(data, index=other.index, copy=False)
+    frame.columns = pd.Index(columns)
+    return frame
+
+
+class DatasetStore:
+
+    def __init__(self, root=_ROOT):
+        self.root = root
+        self._entries = {}
+        self._key_locks = {}
+        self._lock = threading.Lock()
+        atexit.register(shutil.rmtree, self.root, True)
+
+    def _key_lock(self, key):
+        with self._lock:
+            return self._key_locks.setdefault(key, threading.Lock())
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry["ref"]() if entry else None
+
+    def get_or_load(self, key, loader, name=None):
+        df = self.get(key)
+        if df is not None:
+            return df
+
+        # One parse per key even when several sessions ask at once
+        with self._key_lock(key):
+            df = self.get(key)
+            if df is not None:
+                return df
+
+            parsed = loader()
+            path = os.path.join(self.root, f"{key[:16]}-{uuid.uuid4().hex[:8]}")
+            try:
+                with stage("store dataset"):
+                    columns, numeric = _write(parsed, path)
+                    df = _map(path, columns, numeric)
+                mapped = True
+            except Exception:
+                # Columns Arrow cannot represent (mixed objects): share the
+                # parsed frame in memory instead
+                shutil.rmtree(path, ignore_errors=True)
+                df, mapped = parsed, False
+            del parsed
+
+            with self._lock:
+                self._entries[key] = {
+                    "ref": weakref.ref(df),
+                    "name": name or key[:16],
+                    "path": path if mapped else None,
+                    "shape": df.shape,
+                    "bytes": sum(
+                        os.path.getsize(os.path.join(path, f)) for f in os.listdir(path)
+                    ) if mapped else int(df.memory_usage(deep=True).sum())
+                }
+            weakref.finalize(df, self._release, key, path)
+            return df
+
+    def _release(self, key, path):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry["ref"]() is None:
+                del self._entries[key]
+                self._key_locks.pop(key, None)
+        shutil.rmtree(path, ignore_errors=True)
+
+    def entries(self):
+        with self._lock:
+            return [
+                {
+                    "Dataset": e["name"],
+                    "Rows": e["shape"][0],
+                    "Columns": e["shape"][1],
+                    "MB": e["bytes"] / 1e6,
+                    "Memory-mapped": e["path"] is not None
+                }
+                for e in self._entries.values()
+                if e["ref"]() is not None
+            ]
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_dataset_store():
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = DatasetStore()
+        return _store
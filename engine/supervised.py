@@ -0,0 +1,134 @@
+import numpy as np
+import pandas as pd
+
+from engine.precision import as_compute_array, compute_dtype
+from perf import stage
+
+
+# Models that require scaling
+SCALED_MODELS = [
+    "Linear Regression",
+    "Ridge Regression",
+    "Logistic Regression",
+    "KNN Classifier"
+]
+
+
+# ===============================
+# Problem Setup
+# ===============================
+def detect_problem_type(y):
+    # Binary 0/1 targets are classification even when numeric
+    if y.nunique() == 2:
+        return "Classification"
+    elif pd.api.types.is_numeric_dtype(y):
+        return "Regression"
+    return "Classification"
+
+
+def model_catalog(problem_type):
+    from sklearn.linear_model import LinearRegression, Ridge, LogisticRegression
+    from sklearn.ensemble import RandomForestRegressor, RandomForestClassifier
+    from sklearn.neighbors import KNeighborsClassifier
+
+    if problem_type == "Regression":
+        return {
+            "Linear Regression": lambda: LinearRegression(),
+            "Ridge Regression": lambda: Ridge(alpha=1.0),
+            "Random Forest Regressor": lambda: RandomForestRegressor(
+                n_estimators=100,
+                random_state=42
+            )
+        }
+    return {
+        "Logistic Regression": lambda: LogisticRegression(max_iter=1000),
+        "KNN Classifier": lambda: KNeighborsClassifier(n_neighbors=5),
+        "Random Forest Classifier": lambda: RandomForestClassifier(
+            n_estimators=100,
+            random_state=42
+        )
+    }
+
+
+def prepare_features(df, target):
+    with stage("one-hot encoding"):
+        X = pd.get_dummies(df.drop(columns=[target]), drop_first=True)
+    return X, df[target]
+
+
+# ===============================
+# Training & Evaluation
+# ===============================
+def _score(problem_type, model_name, y_test, y_pred):
+    from sklearn.metrics import (
+        r2_score, mean_squared_error, mean_absolute_error,
+        accuracy_score, precision_score, recall_score, f1_score
+    )
+
+    if problem_type == "Regression":
+        return {
+            "Model": model_name,
+            "R²": r2_score(y_test, y_pred),
+            "RMSE": np.sqrt(mean_squared_error(y_test, y_pred)),
+            "MAE": mean_absolute_error(y_test, y_pred)
+        }
+    return {
+        "Model": model_name,
+        "Accuracy": accuracy_score(y_test, y_pred),
+        "Precision": precision_score(
+            y_test, y_pred, average="weighted", zero_division=0
+        ),
+        "Recall": recall_score(
+            y_test, y_pred, average="weighted", zero_division=0
+        ),
+        "F1 Score": f1_score(
+            y_test, y_pred, average="weighted", zero_division=0
+        )
+    }
+
+
+def train_and_evaluate(X, y, problem_type, model_names=None, test_size=0.3, progress=None):
+    from sklearn.model_selection import train_test_split
+    from sklearn.preprocessing import StandardScaler
+
+    catalog = model_catalog(problem_type)
+    model_names = model_names or list(catalog)
+
+    with stage("train test split"):
+        X_train, X_test, y_train, y_test = train_test_split(
+            X,
+            y,
+            test_size=test_size,
+            random_state=42,
+            stratify=y if problem_type == "Classification" else None
+        )
+
+    dtype = compute_dtype()
+    with stage("standard scaler", dtype=np.dtype(dtype).name):
+        scaler = StandardScaler(copy=False)
+        X_train_scaled = scaler.fit_transform(as_compute_array(X_train, dtype))
+        X_test_scaled = scaler.transform(as_compute_array(X_test, dtype))
+
+    results = []
+    for i, model_name in enumerate(model_names):
+        if progress:
+            progress(i / len(model_names), f"training {model_name}")
+        model = catalog[model_name]()
+
+        with stage(f"train: {model_name}"):
+            if model_name in SCALED_MODELS:
+                model.fit(X_train_scaled, y_train)
+                y_pred = model.predict(X_test_scaled)
+            else:
+                model.fit(X_train, y_train)
+                y_pred = model.predict(X_test)
+
+        results.append(_score(problem_type, model_name, y_test, y_pred))
+
+    return pd.DataFrame(results)
+
+
+def best_model(results_df, problem_type):
+    primary_metric = "R²" if problem_type == "Regression" else "F1 Score"
+    best_row = results_df.sort_values(by=primary_metric, ascending=False).iloc[0]
+    return best_row, primary_metric
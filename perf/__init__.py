@@ -0,0 +1,3 @@
+from perf.stages import StageRecorder, current_recorder, recording, stage
+
+__all__ = ["StageRecorder", "current_recorder", "recording", "stage"]
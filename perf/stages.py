@@ -0,0 +1,178 @@
+import contextvars
+import json
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+
+# ===============================
+# Stage Recorder
+# ===============================
+# A recorder is activated for the duration of one Streamlit rerun (or one
+# benchmark case). Code anywhere below it wraps hot paths in `stage(name)`;
+# when no recorder is active the context manager is a no-op.
+#
+# CPU time is process CPU time, so BLAS / OpenMP worker threads count.
+# Peak memory comes from tracemalloc (NumPy and pandas report their
+# buffers to it) and is relative to the allocation level at stage entry.
+# tracemalloc is process-wide: it runs only while some recorder that
+# tracks memory is active, slows every allocation in the process while it
+# does, and its peaks include whatever other threads (other sessions)
+# allocate at the same time.
+
+_current = contextvars.ContextVar("perf_recorder", default=None)
+
+_tracing_lock = threading.Lock()
+_tracing_users = 0
+_tracing_owned = False
+
+
+def _acquire_tracing():
+    global _tracing_users, _tracing_owned
+    with _tracing_lock:
+        if not _tracing_users and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _tracing_owned = True
+        _tracing_users += 1
+
+
+def _release_tracing():
+    global _tracing_users, _tracing_owned
+    with _tracing_lock:
+        _tracing_users -= 1
+        # Stopped only if started here (PYTHONTRACEMALLOC keeps it on)
+        if not _tracing_users and _tracing_owned:
+            tracemalloc.stop()
+            _tracing_owned = False
+
+
+class StageRecorder:
+
+    def __init__(self, label="run", track_memory=False):
+        self.label = label
+        self.track_memory = track_memory
+        self.records = []
+        self._stack = []
+        self._origin = time.perf_counter()
+
+    # ---------- recording ----------
+    def _enter(self, name, meta):
+        frame = {
+            "name": name,
+            "meta": meta,
+            "depth": len(self._stack),
+            "wall": time.perf_counter(),
+            "cpu": time.process_time(),
+            "carried_peak": 0
+        }
+        if self.track_memory and tracemalloc.is_tracing():
+            current, peak = tracemalloc.get_traced_memory()
+            frame["mem_start"] = current
+            frame["saved_peak"] = peak
+            tracemalloc.reset_peak()
+        self._stack.append(frame)
+
+    def _exit(self, frame):
+        self._stack.pop()
+        wall_end = time.perf_counter()
+        record = {
+            "name": frame["name"],
+            "depth": frame["depth"],
+            "start_ms": (frame["wall"] - self._origin) * 1000,
+            "wall_ms": (wall_end - frame["wall"]) * 1000,
+            "cpu_ms": (time.process_time() - frame["cpu"]) * 1000,
+            "peak_mb": None,
+            **frame["meta"]
+        }
+        if "mem_start" in frame and tracemalloc.is_tracing():
+            _, peak = tracemalloc.get_traced_memory()
+            peak = max(peak, frame["carried_peak"])
+            record["peak_mb"] = max(0, peak - frame["mem_start"]) / 1e6
+            # The reset above hid the parent's peak; hand it back up
+            if self._stack:
+                parent = self._stack[-1]
+                parent["carried_peak"] = max(
+                    parent["carried_peak"], peak, frame["saved_peak"]
+                )
+        self.records.append(record)
+
+    # ---------- reporting ----------
+    def summary(self):
+        totals = {}
+        for r in self.records:
+            agg = totals.setdefault(r["name"], {
+                "Stage": r["name"],
+                "Calls": 0,
+                "Wall (ms)": 0.0,
+                "CPU (ms)": 0.0,
+                "Peak (MB)": None
+            })
+            agg["Calls"] += 1
+            agg["Wall (ms)"] += r["wall_ms"]
+            agg["CPU (ms)"] += r["cpu_ms"]
+            if r["peak_mb"] is not None:
+                agg["Peak (MB)"] = max(agg["Peak (MB)"] or 0.0, r["peak_mb"])
+        return sorted(totals.values(), key=lambda a: a["Wall (ms)"], reverse=True)
+
+    def to_json(self):
+        return json.dumps(
+            {"label": self.label, "stages": sorted(self.records, key=lambda r: r["start_ms"])},
+            indent=2,
+            default=str
+        )
+
+    def to_chrome_trace(self):
+        # Complete ("X") events nest by time containment on one track,
+        # which is how chrome://tracing and Perfetto draw them.
+        events = []
+        for r in self.records:
+            events.append({
+                "name": r["name"],
+                "cat": "stage",
+                "ph": "X",
+                "ts": r["start_ms"] * 1000,
+                "dur": r["wall_ms"] * 1000,
+                "pid": 1,
+                "tid": 1,
+                "args": {
+                    k: v for k, v in r.items()
+                    if k not in ("name", "start_ms", "wall_ms", "depth")
+                }
+            })
+        return json.dumps({"traceEvents": events, "displayTimeUnit": "ms"}, default=str)
+
+
+# ===============================
+# Context Managers
+# ===============================
+@contextmanager
+def recording(recorder):
+    if recorder.track_memory:
+        _acquire_tracing()
+    token = _current.set(recorder)
+    try:
+        yield recorder
+    finally:
+        _current.reset(token)
+        if recorder.track_memory:
+            _release_tracing()
+
+
+@contextmanager
+def stage(name, **meta):
+    recorder = _current.get()
+    if recorder is None:
+        yield
+        return
+
+    recorder._enter(name, meta)
+    frame = recorder._stack[-1]
+    try:
+        yield
+    finally:
+        recorder._exit(frame)
+
+
+def current_recorder():
+    return _current.get()
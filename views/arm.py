@@ -5,8 +5,9 @@ def arm_page():
     import matplotlib.pyplot as plt
     import seaborn as sns
 
-    from mlxtend.frequent_patterns import apriori, association_rules
-    from mlxtend.preprocessing import TransactionEncoder
+    from engine.arm import encode_transactions, mine_association_rules
+    from views.jobs_ui import background_result
+    from views.session import load_shared_dataset, analysis_data, frame_key
 
     # --------------------------------------------------
     # HEADER & CONTEXT
@@ -26,7 +27,7 @@ def arm_page():
         st.warning("No dataset found. Please upload a dataset first.")
         return
 
-    df = st.session_state["data"]
+    df = analysis_data()
 
     # --------------------------------------------------
     # DECISION GATE
@@ -55,16 +56,10 @@ def arm_page():
             st.warning("Please select at least two columns.")
             return
 
-        arm_df = df[cols].astype(str)
-
         # --------------------------------------------------
         # TRANSACTIONS & ENCODING
         # --------------------------------------------------
-        transactions = arm_df.values.tolist()
-
-        te = TransactionEncoder()
-        te_array = te.fit(transactions).transform(transactions)
-        df_encoded = pd.DataFrame(te_array, columns=te.columns_)
+        df_encoded = encode_transactions(df, cols)
 
         st.subheader("📦 Encoded Transactions (Preview)")
         st.dataframe(
@@ -85,19 +80,27 @@ def arm_page():
         # --------------------------------------------------
         # FREQUENT ITEMSETS
         # --------------------------------------------------
-        frequent_itemsets = apriori(
+        mined = background_result(
+            "Association rule mining",
+            mine_association_rules,
             df_encoded,
-            min_support=min_support,
-            use_colnames=True
+            min_support,
+            min_confidence,
+            min_lift,
+            source=(frame_key(df), tuple(cols))
         )
+        if mined is None:
+            return
+
+        itemsets, rules = mined
 
-        if frequent_itemsets.empty:
+        if itemsets.empty:
             st.warning("No frequent itemsets found. Try lowering support.")
             return
 
         st.subheader("📊 Frequent Itemsets")
         st.dataframe(
-            frequent_itemsets
+            itemsets
             .sort_values("support", ascending=False)
             .style
             .background_gradient(cmap="Purples", subset=["support"])
@@ -107,22 +110,10 @@ def arm_page():
         # --------------------------------------------------
         # ASSOCIATION RULES
         # --------------------------------------------------
-        rules = association_rules(
-            frequent_itemsets,
-            metric="confidence",
-            min_threshold=min_confidence
-        )
-
-        rules = rules[rules["lift"] >= min_lift]
-
         if rules.empty:
             st.warning("No association rules found. Adjust thresholds.")
             return
 
-        rules["antecedents_str"] = rules["antecedents"].apply(lambda x: ", ".join(list(x)))
-        rules["consequents_str"] = rules["consequents"].apply(lambda x: ", ".join(list(x)))
-        rules["antecedent_len"] = rules["antecedents"].apply(len)
-
         # --------------------------------------------------
         # ALL RULES TABLE (STYLED)
         # --------------------------------------------------
@@ -266,7 +257,7 @@ def arm_page():
         uploaded_file = st.file_uploader("Upload CSV file", type=["csv"])
 
         if uploaded_file is not None:
-            new_df = pd.read_csv(uploaded_file)
+            new_df = load_shared_dataset(uploaded_file)
             st.session_state["data"] = new_df
             st.success("New dataset uploaded successfully!")
             st.dataframe(new_df.head())
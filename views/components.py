@@ -0,0 +1,158 @@
+import streamlit as st
+import pandas as pd
+import numpy as np
+
+from views.session import get_artifact, put_artifact, frame_key
+
+
+# ===============================
+# Paginated Table (Server-side)
+# ===============================
+# Only the visible page of rows is serialized to HTML. Sort orders and
+# filter masks are computed once per (table, dataset) and kept in the
+# session's artifact store, so later reruns slice cached index arrays
+# instead of re-sorting / re-filtering / re-rendering the whole frame.
+
+PAGE_SIZE_OPTIONS = [10, 25, 50, 100]
+
+
+def _table_cache(key, df):
+    cache_key = f"_ptable_{key}"
+    token = frame_key(df)
+    cache = get_artifact(cache_key)
+    if cache is None or cache["token"] != token:
+        cache = {"token": token, "orders": {}, "masks": {}}
+        put_artifact(cache_key, cache)
+    return cache
+
+
+def _sort_order(cache, df, column, ascending):
+    key = (column, ascending)
+    if key not in cache["orders"]:
+        values = df[column]
+        order = np.argsort(
+            values.to_numpy() if pd.api.types.is_numeric_dtype(values) else values.astype(str).to_numpy(),
+            kind="stable"
+        )
+        if not ascending:
+            order = order[::-1]
+        cache["orders"][key] = np.ascontiguousarray(order)
+    return cache["orders"][key]
+
+
+def _filter_mask(cache, df, column, text):
+    key = (column, text)
+    if key not in cache["masks"]:
+        cache["masks"][key] = (
+            df[column].astype(str).str.contains(text, case=False, regex=False).to_numpy()
+        )
+    return cache["masks"][key]
+
+
+def _render_html(df, index=False):
+    html = df.to_html(index=index, classes="custom-table", border=0)
+    st.markdown(f"<div class='table-wrapper'>{html}</div>", unsafe_allow_html=True)
+
+
+def render_paginated_table(df, key, page_size=25, index=False):
+    # Small tables render exactly as before, without controls
+    if len(df) <= page_size:
+        _render_html(df, index=index)
+        return
+
+    cache = _table_cache(key, df)
+    columns = df.columns.tolist()
+
+    c1, c2, c3, c4 = st.columns([2, 1, 2, 1])
+    with c1:
+        sort_col = st.selectbox(
+            "Sort by", ["-- None --"] + columns, key=f"{key}_sort"
+        )
+    with c2:
+        ascending = st.radio(
+            "Order", ["Asc", "Desc"], horizontal=True, key=f"{key}_order"
+        ) == "Asc"
+    with c3:
+        filter_col = st.selectbox(
+            "Filter column", columns, key=f"{key}_filter_col"
+        )
+        filter_text = st.text_input(
+            "Contains", key=f"{key}_filter_text"
+        ).strip()
+    with c4:
+        page_size = st.selectbox(
+            "Rows / page",
+            PAGE_SIZE_OPTIONS,
+            index=PAGE_SIZE_OPTIONS.index(page_size) if page_size in PAGE_SIZE_OPTIONS else 1,
+            key=f"{key}_page_size"
+        )
+
+    # ---------- Row positions (cached) ----------
+    if sort_col != "-- None --":
+        positions = _sort_order(cache, df, sort_col, ascending)
+    else:
+        positions = None
+
+    if filter_text:
+        mask = _filter_mask(cache, df, filter_col, filter_text)
+        positions = (
+            np.flatnonzero(mask) if positions is None else positions[mask[positions]]
+        )
+
+    total = len(df) if positions is None else len(positions)
+    n_pages = max(1, -(-total // page_size))
+
+    # Filter / page-size changes can shrink the page count
+    page_key = f"{key}_page"
+    st.session_state[page_key] = min(st.session_state.get(page_key, 1), n_pages)
+
+    page = st.number_input(
+        "Page",
+        min_value=1,
+        max_value=n_pages,
+        step=1,
+        key=page_key
+    )
+
+    start = (int(page) - 1) * page_size
+    stop = min(start + page_size, total)
+
+    if positions is None:
+        page_df = df.iloc[start:stop]
+    else:
+        page_df = df.iloc[positions[start:stop]]
+
+    _render_html(page_df, index=index)
+    st.caption(
+        f"Showing rows {start + 1 if total else 0}–{stop} of {total:,} "
+        f"(page {int(page)} of {n_pages})"
+    )
+
+
+# ===============================
+# Streamed Score Download
+# ===============================
+# The file is only produced when the button is clicked: scores are
+# projected chunk by chunk straight into a compressed file on disk, with
+# the source row ids in the first column.
+
+def render_score_download(label, df, features, moments, matrix, columns, file_stem, key):
+    from engine.export import FORMATS, export_to_tempfile
+
+    fmt = st.radio(
+        "Export format",
+        ["csv", "parquet"],
+        format_func=lambda f: "CSV (gzip)" if f == "csv" else "Parquet",
+        horizontal=True,
+        key=f"{key}_format"
+    )
+    suffix, mime = FORMATS[fmt]
+
+    st.download_button(
+        label,
+        lambda: export_to_tempfile(df, features, moments, matrix, columns, fmt=fmt),
+        file_name=f"{file_stem}{suffix}",
+        mime=mime,
+        on_click="ignore",
+        key=key
+    )
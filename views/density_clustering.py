@@ -0,0 +1,209 @@
+import streamlit as st
+
+def density_clustering_page():
+    import numpy as np
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    from engine.pca import standardize
+    from engine.dataset import with_columns
+    from engine.neighbors import approximate_knn
+    from engine.clustering import (
+        knn_distance_matrix,
+        k_distances,
+        suggest_eps,
+        density_clusters,
+        pca_2d,
+        profile_clusters
+    )
+    from views.jobs_ui import background_result
+    from views.plots import render_scatter_controls, density_scatter
+    from views.session import cached_artifact, analysis_data, identity, frame_key
+    from perf import stage
+
+    st.header("🌀 Density Clustering")
+
+    # --------------------------------------------------
+    # WHY & WHAT
+    # --------------------------------------------------
+    st.markdown("""
+    **Why Density Clustering?**
+    K-Means assumes round, similarly sized segments. Density-based clustering (DBSCAN)
+    finds segments of any shape as dense regions separated by sparse ones, and marks
+    records in sparse regions as noise instead of forcing them into a segment.
+    """)
+
+    # --------------------------------------------------
+    # CHECK IF DATA EXISTS
+    # --------------------------------------------------
+    if "data" not in st.session_state:
+        st.warning("No dataset found. Please upload a dataset first.")
+        return
+
+    df = analysis_data()
+
+    st.subheader("🔧 Select Features for Clustering")
+
+    numeric_cols = df.select_dtypes(include=["int64", "float64"]).columns.tolist()
+
+    if len(numeric_cols) < 2:
+        st.error("At least two numeric features are required for clustering.")
+        return
+
+    features = st.multiselect(
+        "Choose numeric features:",
+        numeric_cols,
+        default=numeric_cols,
+        key="density_features"
+    )
+
+    if len(features) < 2:
+        st.warning("Please select at least two features.")
+        return
+
+    data = df[features]
+    if data.isna().to_numpy().any():
+        data = data.dropna()
+        st.info(f"{len(df) - len(data):,} rows with missing values are left out.")
+
+    if len(data) < 3:
+        st.error("Not enough complete rows for clustering.")
+        return
+
+    X_scaled, _ = standardize(data)
+
+    # --------------------------------------------------
+    # NEIGHBOUR GRAPH
+    # --------------------------------------------------
+    st.subheader("🕸️ Nearest-Neighbour Graph")
+
+    with st.expander("Index settings"):
+        n_neighbors = st.slider("Neighbours per record", 5, 50, 15, key="density_neighbors")
+        n_trees = st.slider("Random-projection trees", 2, 16, 8, key="density_trees")
+
+    # Keyed by the data and features, so re-tuning eps or min_samples
+    # below reuses the finished graph
+    graph = background_result(
+        "Approximate kNN graph",
+        approximate_knn,
+        X_scaled,
+        source=(frame_key(df), tuple(features)),
+        n_neighbors=n_neighbors,
+        n_trees=n_trees
+    )
+    if graph is None:
+        return
+
+    distance_matrix = cached_artifact(
+        "density_knn_matrix",
+        identity(graph),
+        lambda: knn_distance_matrix(graph)
+    )
+
+    # --------------------------------------------------
+    # DBSCAN PARAMETERS
+    # --------------------------------------------------
+    st.subheader("🎛️ Density Parameters")
+
+    min_samples = st.slider(
+        "Minimum samples in a neighbourhood (min_samples)",
+        2,
+        graph["n_neighbors"] + 1,
+        min(5, graph["n_neighbors"] + 1),
+        key="density_min_samples"
+    )
+
+    k_dist = k_distances(graph, min_samples)
+    suggested = suggest_eps(k_dist)
+
+    eps = st.number_input(
+        "Neighbourhood radius (eps, in standard deviations)",
+        min_value=0.001,
+        value=float(round(suggested, 3)) or 0.5,
+        step=0.05,
+        format="%.3f",
+        key=f"density_eps_{min_samples}"
+    )
+
+    # The sorted curve is smooth, so 2,000 evenly spaced points draw it
+    shown = np.linspace(0, len(k_dist) - 1, min(len(k_dist), 2000)).astype(int)
+    fig, ax = plt.subplots(figsize=(7, 3))
+    ax.plot(shown, k_dist[shown], color="#5b5fe8")
+    ax.axhline(eps, linestyle="--", color="red", label=f"eps = {eps:.3f}")
+    ax.set_xlabel("Records (sorted)")
+    ax.set_ylabel(f"Distance to neighbour {min_samples - 1}")
+    ax.set_title("k-distance curve (knee ≈ good eps)")
+    ax.legend()
+    st.pyplot(fig)
+    plt.close(fig)
+
+    labels = cached_artifact(
+        "density_labels",
+        (identity(distance_matrix), eps, min_samples),
+        lambda: density_clusters(distance_matrix, eps, min_samples),
+        heavy=True
+    )
+
+    n_clusters = len(set(labels)) - (1 if -1 in labels else 0)
+    noise_share = float((labels == -1).mean())
+
+    col1, col2 = st.columns(2)
+    col1.metric("Clusters found", n_clusters)
+    col2.metric("Noise records", f"{noise_share:.1%}")
+
+    if n_clusters == 0:
+        st.warning("No dense regions at this radius. Increase eps or lower min_samples.")
+        return
+
+    # --------------------------------------------------
+    # CLUSTER VISUALIZATION
+    # --------------------------------------------------
+    st.subheader("🧭 Cluster Visualization (PCA Reduced)")
+
+    pca_components = pca_2d(X_scaled)
+    aggregated, overlay = render_scatter_controls(len(labels), key="density_scatter")
+
+    fig, ax = plt.subplots()
+    with stage("cluster scatter plot", aggregated=aggregated):
+        if aggregated:
+            density_scatter(
+                ax, pca_components[:, 0], pca_components[:, 1],
+                labels=labels, overlay=overlay
+            )
+        else:
+            sns.scatterplot(
+                x=pca_components[:, 0],
+                y=pca_components[:, 1],
+                hue=labels,
+                palette="tab10",
+                ax=ax
+            )
+    ax.set_xlabel("PCA1")
+    ax.set_ylabel("PCA2")
+    ax.set_title("Density Segments (-1 = noise)")
+    st.pyplot(fig)
+    plt.close(fig)
+
+    # --------------------------------------------------
+    # CLUSTER PROFILES
+    # --------------------------------------------------
+    st.subheader("📋 Cluster Profiles (Average Values)")
+
+    profile = cached_artifact(
+        "density_profile",
+        (frame_key(df), tuple(features), identity(labels)),
+        lambda: profile_clusters(data, labels, features, categorical=[])
+    )
+    st.dataframe(profile["sizes"].style.format({"Share": "{:.1%}"}))
+    st.dataframe(profile["mean"].style.background_gradient(cmap="coolwarm"))
+
+    # --------------------------------------------------
+    # DOWNLOAD DATA
+    # --------------------------------------------------
+    st.download_button(
+        "⬇️ Download Clustered Dataset",
+        lambda: with_columns(df.loc[data.index], Cluster=labels).to_csv(index=False),
+        file_name="density_clustered_data.csv",
+        mime="text/csv",
+        on_click="ignore"
+    )
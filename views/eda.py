@@ -3,10 +3,20 @@ import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
 import seaborn as sns
-from sklearn.preprocessing import OrdinalEncoder
-from sklearn.ensemble import RandomForestRegressor
 import shap
 
+from engine.eda import (
+    pearson_with_target,
+    spearman_with_target,
+    categorical_spearman_matrix,
+    shap_importance,
+    shap_inputs
+)
+from engine.dataset import without
+from views.jobs_ui import background_result
+from views.session import cached_comoments, analysis_data, frame_key
+from perf import stage
+
 
 def eda_page():
 
@@ -17,9 +27,10 @@ def eda_page():
         return
 
     # ==================================================
-    # WORKING COPY
+    # WORKING VIEW (no copy; columns are shared with the upload)
     # ==================================================
-    df = st.session_state["data"].copy()
+    source = analysis_data()
+    df = source
 
     # ==================================================
     # 0. GLOBAL DROP COLUMNS
@@ -32,7 +43,7 @@ def eda_page():
     )
 
     if global_drop_cols:
-        df.drop(columns=global_drop_cols, inplace=True)
+        df = without(df, global_drop_cols)
 
     st.divider()
 
@@ -72,11 +83,12 @@ def eda_page():
         cols = st.columns(3)
         for j, col in enumerate(num_cols[i:i + 3]):
             with cols[j]:
-                fig, ax = plt.subplots(figsize=(3.4, 2.3))
-                ax.hist(df[col].dropna(), bins=20)
-                ax.set_title(col, fontsize=9)
-                plt.tight_layout()
-                st.pyplot(fig)
+                with stage("histogram"):
+                    fig, ax = plt.subplots(figsize=(3.4, 2.3))
+                    ax.hist(df[col].dropna(), bins=20)
+                    ax.set_title(col, fontsize=9)
+                    plt.tight_layout()
+                    st.pyplot(fig)
                 plt.close(fig)
 
     st.divider()
@@ -88,12 +100,13 @@ def eda_page():
         cols = st.columns(3)
         for j, col in enumerate(cat_cols[i:i + 3]):
             with cols[j]:
-                counts = df[col].value_counts().head(6)
-                fig, ax = plt.subplots(figsize=(3.4, 2.3))
-                ax.barh(counts.index, counts.values)
-                ax.set_title(col, fontsize=9)
-                plt.tight_layout()
-                st.pyplot(fig)
+                with stage("category bars"):
+                    counts = df[col].value_counts().head(6)
+                    fig, ax = plt.subplots(figsize=(3.4, 2.3))
+                    ax.barh(counts.index, counts.values)
+                    ax.set_title(col, fontsize=9)
+                    plt.tight_layout()
+                    st.pyplot(fig)
                 plt.close(fig)
 
     st.divider()
@@ -111,7 +124,7 @@ def eda_page():
     else:
         corr_drop_cols = []
 
-    corr_df = df.drop(columns=corr_drop_cols, errors="ignore")
+    corr_df = without(df, corr_drop_cols)
 
     st.divider()
 
@@ -126,15 +139,16 @@ def eda_page():
         and pd.api.types.is_numeric_dtype(corr_df[st.session_state.target_var])
     ):
 
-        num_df = corr_df.select_dtypes(include=np.number)
-        num_df = num_df.loc[:, num_df.nunique() > 1]
-
-        corr_vals = (
-            num_df.corr()[st.session_state.target_var]
-            .drop(st.session_state.target_var, errors="ignore")
-            .sort_values(ascending=False)
-            .to_frame(name=st.session_state.target_var)
-        )
+        # Pairwise moments are cached for the whole analysis frame (the
+        # dropped-column views are rebuilt every rerun); the columns kept
+        # here are a sub-block of them
+        base = source
+        moments = cached_comoments(
+            base, base.select_dtypes(include=np.number).columns.tolist()
+        ).subset(corr_df.select_dtypes(include=np.number).columns.tolist())
+        corr_vals = pearson_with_target(
+            corr_df, st.session_state.target_var, moments=moments
+        ).to_frame(name=st.session_state.target_var)
 
         fig_h = max(4, len(corr_vals) * 0.3)
         fig, ax = plt.subplots(figsize=(3.2, fig_h))
@@ -174,25 +188,9 @@ def eda_page():
         cat_corr_cols = corr_df.select_dtypes(exclude=np.number).columns.tolist()
 
         if cat_corr_cols:
-            enc = OrdinalEncoder()
-            encoded = pd.DataFrame(
-                enc.fit_transform(corr_df[cat_corr_cols]),
-                columns=cat_corr_cols
-            )
-
-            encoded = encoded.loc[:, encoded.nunique() > 1]
-
-            spearman_vals = (
-                encoded.apply(
-                    lambda x: x.corr(
-                        corr_df[st.session_state.target_var],
-                        method="spearman"
-                    )
-                )
-                .dropna()
-                .sort_values(ascending=False)
-                .to_frame(name=st.session_state.target_var)
-            )
+            spearman_vals = spearman_with_target(
+                corr_df, st.session_state.target_var
+            ).to_frame(name=st.session_state.target_var)
 
             fig_h = max(3, len(spearman_vals) * 0.35)
             fig, ax = plt.subplots(figsize=(3.2, fig_h))
@@ -218,6 +216,28 @@ def eda_page():
     else:
         st.info("Spearman correlation requires a numerical target.")
 
+    cat_matrix_cols = corr_df.select_dtypes(exclude=np.number).columns
+    if len(cat_matrix_cols) >= 2 and st.checkbox(
+        "Show full categorical-vs-categorical Spearman matrix"
+    ):
+        cat_matrix = categorical_spearman_matrix(corr_df)
+
+        size = max(4, len(cat_matrix) * 0.5)
+        fig, ax = plt.subplots(figsize=(size, size * 0.8))
+        with stage("categorical spearman heatmap"):
+            sns.heatmap(
+                cat_matrix,
+                annot=len(cat_matrix) <= 15,
+                cmap="coolwarm",
+                center=0,
+                fmt=".2f",
+                annot_kws={"size": 7},
+                ax=ax
+            )
+        plt.tight_layout()
+        st.pyplot(fig)
+        plt.close(fig)
+
     st.divider()
 
     # ==================================================
@@ -231,51 +251,38 @@ def eda_page():
         and pd.api.types.is_numeric_dtype(df[st.session_state.target_var])
     ):
 
-        shap_df = df.drop(columns=corr_drop_cols, errors="ignore")
+        shap_df = without(df, corr_drop_cols)
 
-        X = shap_df.select_dtypes(include=np.number).drop(
-            columns=[st.session_state.target_var],
-            errors="ignore"
-        )
-        y = shap_df[st.session_state.target_var]
+        X, y = shap_inputs(shap_df, st.session_state.target_var)
 
+        # Runs in the background so other widgets on the page don't restart it
+        shap_result = None
         if X.shape[1] >= 2:
-            model = RandomForestRegressor(
-                n_estimators=50,
-                max_depth=6,
-                random_state=42
-            )
-            model.fit(X, y)
-
-            explainer = shap.TreeExplainer(
-                model,
-                feature_perturbation="interventional",
-                model_output="raw"
-            )
-
-            shap_values = explainer.shap_values(
-                X,
-                check_additivity=False
+            shap_result = background_result(
+                "SHAP feature importance", shap_importance, X, y,
+                source=(frame_key(source), tuple(X.columns), st.session_state.target_var)
             )
 
+        if shap_result is not None:
             shap_exp = shap.Explanation(
-                values=shap_values,
-                base_values=explainer.expected_value,
+                values=shap_result["values"],
+                base_values=shap_result["base_values"],
                 data=X,
                 feature_names=X.columns
             )
 
             max_feats = min(10, X.shape[1])
 
-            fig = plt.figure(figsize=(4, 3))
-            shap.plots.bar(shap_exp, max_display=max_feats, show=False)
+            with stage("shap plot"):
+                fig = plt.figure(figsize=(4, 3))
+                shap.plots.bar(shap_exp, max_display=max_feats, show=False)
 
-            _, c, _ = st.columns([1, 2, 1])
-            with c:
-                st.pyplot(fig)
+                _, c, _ = st.columns([1, 2, 1])
+                with c:
+                    st.pyplot(fig)
 
             plt.close(fig)
-        else:
+        elif X.shape[1] < 2:
             st.info("Not enough numerical features for SHAP.")
     else:
         st.info("SHAP available only for numerical target.")
@@ -287,9 +294,11 @@ def eda_page():
     # ==================================================
     st.subheader("📄 Final Dataset After Preprocessing")
 
-    df_temp = df.drop(columns=corr_drop_cols, errors="ignore")
+    df_temp = without(df, corr_drop_cols)
 
-    st.session_state["df_temp"] = df_temp
+    # The choices are kept, not the frame: later pages rebuild it from the
+    # current analysis data (views.session.modeling_data)
+    st.session_state["eda_drop_cols"] = list(global_drop_cols) + list(corr_drop_cols)
 
     st.write("This dataframe will be used for modeling and further analysis.")
     st.dataframe(df_temp.head(), use_container_width=True)
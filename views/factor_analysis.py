@@ -5,13 +5,17 @@ def factor_analysis_page():
     import matplotlib.pyplot as plt
     import seaborn as sns
 
-    from sklearn.preprocessing import StandardScaler
-    from sklearn.decomposition import PCA
-    from factor_analyzer import FactorAnalyzer
-    from factor_analyzer.factor_analyzer import (
-        calculate_kmo,
-        calculate_bartlett_sphericity
+    from engine.factor import (
+        prepare_factor_data,
+        adequacy_tests,
+        scree_eigenvalues,
+        factor_sweep,
+        sweep_table,
+        factor_scores
     )
+    from perf import stage
+    from views.components import render_score_download
+    from views.session import load_shared_dataset, cached_comoments, cached_artifact, analysis_data, frame_key
 
     # --------------------------------------------------
     # HEADER & CONTEXT
@@ -32,7 +36,7 @@ def factor_analysis_page():
         st.warning("No dataset found. Please upload a dataset first.")
         return
 
-    df = st.session_state["data"]
+    df = analysis_data()
 
     # --------------------------------------------------
     # DECISION GATE
@@ -71,10 +75,7 @@ def factor_analysis_page():
         # --------------------------------------------------
         # DATA CLEANING (CRITICAL)
         # --------------------------------------------------
-        data = df[features].copy()
-        data = data.apply(pd.to_numeric, errors="coerce")
-        data = data.dropna()
-        data = data.loc[:, data.nunique() > 1]
+        data = prepare_factor_data(df, features)
 
         if data.shape[1] < 3:
             st.error("After cleaning, fewer than 3 valid variables remain.")
@@ -85,20 +86,23 @@ def factor_analysis_page():
             return
 
         # --------------------------------------------------
-        # STANDARDIZATION
+        # CORRELATION MATRIX (ONE STREAMING PASS)
         # --------------------------------------------------
-        scaler = StandardScaler()
-        X = scaler.fit_transform(data)
-        X = np.asarray(X)  # pure NumPy array
+        # KMO, Bartlett, eigenvalues and the factor solution only need the
+        # correlation matrix and n; the rows are read again only for scores
+        # (same complete-case moments as the PCA page for this feature set)
+        moments = cached_comoments(df, features, pairwise=False).subset(list(data.columns))
+        corr = moments.correlation()
+        n_obs = moments.rows
 
         # --------------------------------------------------
         # CORRELATION HEATMAP
         # --------------------------------------------------
         st.subheader("📊 Correlation Heatmap")
 
-        corr = pd.DataFrame(X, columns=data.columns).corr()
-        fig, ax = plt.subplots(figsize=(8, 5))
-        sns.heatmap(corr, cmap="coolwarm", ax=ax)
+        with stage("correlation heatmap"):
+            fig, ax = plt.subplots(figsize=(8, 5))
+            sns.heatmap(corr, cmap="coolwarm", ax=ax)
         st.pyplot(fig)
 
         # --------------------------------------------------
@@ -106,7 +110,8 @@ def factor_analysis_page():
         # --------------------------------------------------
         st.subheader("📐 KMO Test")
 
-        kmo_all, kmo_model = calculate_kmo(X)
+        tests = adequacy_tests(corr, n_obs)
+        kmo_model = tests["kmo"]
         st.metric("KMO Value", round(kmo_model, 3))
 
         # --------------------------------------------------
@@ -114,12 +119,12 @@ def factor_analysis_page():
         # --------------------------------------------------
         st.subheader("📐 Bartlett’s Test of Sphericity")
 
-        chi_square_value, p_value = calculate_bartlett_sphericity(X)
+        chi_square_value, p_value = tests["chi_square"], tests["p_value"]
 
         st.write(f"Chi-Square Value: **{round(chi_square_value, 2)}**")
         st.write(f"P-Value: **{round(p_value, 6)}**")
 
-        if kmo_model < 0.6 or p_value >= 0.05:
+        if not tests["suitable"]:
             st.error(
                 "Data is not suitable for Factor Analysis "
                 "(KMO < 0.6 or Bartlett p-value ≥ 0.05)."
@@ -133,9 +138,7 @@ def factor_analysis_page():
         # --------------------------------------------------
         st.subheader("📈 Scree Plot & Eigenvalues")
 
-        pca_for_scree = PCA()
-        pca_for_scree.fit(X)
-        eigen_values = pca_for_scree.explained_variance_
+        eigen_values = scree_eigenvalues(corr, n_obs)
 
         fig, ax = plt.subplots()
         ax.plot(range(1, len(eigen_values) + 1), eigen_values, marker="o")
@@ -145,6 +148,27 @@ def factor_analysis_page():
         ax.set_title("Scree Plot (PCA-based)")
         st.pyplot(fig)
 
+        # --------------------------------------------------
+        # FACTOR-COUNT SWEEP (ALL CANDIDATES, FITTED ONCE)
+        # --------------------------------------------------
+        sweep_token = (frame_key(df), tuple(features))
+        sweep = cached_artifact(
+            "factor_sweep",
+            sweep_token,
+            lambda: factor_sweep(corr, data.columns, max_factors=10),
+            heavy=True
+        )
+
+        st.subheader("📋 Factor-count Comparison")
+        st.dataframe(
+            sweep_table(sweep)
+            .style
+            .format({"RMSR": "{:.3f}", "Variance Explained": "{:.1%}",
+                     "Min Communality": "{:.3f}", "Max Uniqueness": "{:.3f}"})
+            .background_gradient(cmap="Greens", subset=["Variance Explained"])
+            .background_gradient(cmap="Reds", subset=["RMSR"])
+        )
+
         # --------------------------------------------------
         # SELECT NUMBER OF FACTORS
         # --------------------------------------------------
@@ -160,42 +184,15 @@ def factor_analysis_page():
         # --------------------------------------------------
         st.subheader("🔄 Factor Extraction (Varimax Rotation)")
 
-        loadings = None
-        factor_scores = None
-
-        try:
-            # Primary attempt: Proper Factor Analysis
-            fa = FactorAnalyzer(
-                n_factors=n_factors,
-                rotation="varimax",
-                method="principal"
-            )
-            fa.fit(X)
-
-            loadings = pd.DataFrame(
-                fa.loadings_,
-                index=data.columns,
-                columns=[f"Factor {i+1}" for i in range(n_factors)]
-            )
-
-            factor_scores = fa.transform(X)
+        result = sweep[n_factors]
+        loadings = result["loadings"]
 
+        if result["method"] == "varimax":
             st.success("Factor Analysis completed successfully using Varimax rotation.")
-
-        except Exception:
-            # Fallback: PCA-based factor loadings
+        elif result["method"] == "pca_fallback":
             st.warning(
-                "Numerical instability detected in Factor Analyzer. "
-                "Using PCA-based factor loadings as a stable alternative."
-            )
-
-            pca_fallback = PCA(n_components=n_factors)
-            factor_scores = pca_fallback.fit_transform(X)
-
-            loadings = pd.DataFrame(
-                pca_fallback.components_.T,
-                index=data.columns,
-                columns=[f"Factor {i+1}" for i in range(n_factors)]
+                "The Varimax rotation did not converge to finite loadings. "
+                "Showing the unrotated principal-factor loadings instead."
             )
 
         # --------------------------------------------------
@@ -204,23 +201,41 @@ def factor_analysis_page():
         st.subheader("📋 Factor Loadings")
         st.dataframe(loadings.style.background_gradient(cmap="coolwarm"))
 
+        st.caption(
+            f"RMSR {result['rmsr']:.3f} · "
+            f"variance explained {result['cumulative_variance']:.1%}"
+        )
+        st.dataframe(
+            pd.DataFrame({
+                "Communality": result["communalities"],
+                "Uniqueness": result["uniquenesses"]
+            }).style.format("{:.3f}")
+        )
+
         # --------------------------------------------------
         # FACTOR SCORES
         # --------------------------------------------------
         st.subheader("📌 Factor Scores")
 
+        # Preview only; the full score matrix is produced by the export
+        preview = data.head()
         factor_scores_df = pd.DataFrame(
-            factor_scores,
-            columns=[f"Factor {i+1}" for i in range(n_factors)]
+            factor_scores(preview, moments, result["weights"]),
+            columns=[f"Factor {i+1}" for i in range(n_factors)],
+            index=preview.index
         )
 
-        st.dataframe(factor_scores_df.head())
+        st.dataframe(factor_scores_df)
 
-        st.download_button(
+        render_score_download(
             "⬇️ Download Factor Scores",
-            factor_scores_df.to_csv(index=False),
-            file_name="factor_scores.csv",
-            mime="text/csv"
+            data,
+            list(data.columns),
+            moments,
+            result["weights"],
+            result["factor_names"],
+            "factor_scores",
+            key="fa_export"
         )
 
     # ==================================================
@@ -232,7 +247,7 @@ def factor_analysis_page():
         uploaded_file = st.file_uploader("Upload CSV file", type=["csv"])
 
         if uploaded_file is not None:
-            new_df = pd.read_csv(uploaded_file)
+            new_df = load_shared_dataset(uploaded_file)
             st.session_state["data"] = new_df
             st.success("New dataset uploaded successfully!")
             st.dataframe(new_df.head())
@@ -0,0 +1,180 @@
+import streamlit as st
+
+def hierarchical_clustering_page():
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+    from scipy.cluster.hierarchy import dendrogram
+
+    from engine.pca import standardize
+    from engine.dataset import with_columns
+    from engine.clustering import cf_summary, ward_linkage, cut_hierarchy, pca_2d, profile_clusters
+    from views.jobs_ui import background_result
+    from views.plots import render_scatter_controls, density_scatter
+    from views.session import cached_artifact, analysis_data, identity, frame_key
+    from perf import stage
+
+    st.header("🌳 Hierarchical Clustering")
+
+    # --------------------------------------------------
+    # WHY & WHAT
+    # --------------------------------------------------
+    st.markdown("""
+    **Why Hierarchical Clustering?**
+    Instead of one fixed number of segments, hierarchical clustering builds a tree of
+    nested segments (a dendrogram). Cutting the tree higher gives a few broad segments,
+    cutting it lower gives many fine ones. Rows are first summarized into small
+    subclusters (BIRCH), so the tree stays fast on large datasets.
+    """)
+
+    # --------------------------------------------------
+    # CHECK IF DATA EXISTS
+    # --------------------------------------------------
+    if "data" not in st.session_state:
+        st.warning("No dataset found. Please upload a dataset first.")
+        return
+
+    df = analysis_data()
+
+    st.subheader("🔧 Select Features for Clustering")
+
+    numeric_cols = df.select_dtypes(include=["int64", "float64"]).columns.tolist()
+
+    if len(numeric_cols) < 2:
+        st.error("At least two numeric features are required for clustering.")
+        return
+
+    features = st.multiselect(
+        "Choose numeric features:",
+        numeric_cols,
+        default=numeric_cols,
+        key="hier_features"
+    )
+
+    if len(features) < 2:
+        st.warning("Please select at least two features.")
+        return
+
+    data = df[features]
+    if data.isna().to_numpy().any():
+        data = data.dropna()
+        st.info(f"{len(df) - len(data):,} rows with missing values are left out.")
+
+    X_scaled, _ = standardize(data)
+
+    # --------------------------------------------------
+    # CF-TREE SUMMARY
+    # --------------------------------------------------
+    with st.expander("Summary settings"):
+        # Distances between standardized rows grow with sqrt(#features)
+        threshold = st.number_input(
+            "Subcluster radius (threshold, in standard deviations)",
+            min_value=0.05,
+            value=round(0.5 * len(features) ** 0.5, 2),
+            step=0.05,
+            help="Smaller values keep more detail but take longer to summarize."
+        )
+        max_subclusters = st.slider(
+            "Maximum subclusters in the dendrogram", 100, 5000, 2000, step=100,
+            key="hier_max_subclusters"
+        )
+
+    summary = background_result(
+        "CF-tree summary",
+        cf_summary,
+        X_scaled,
+        source=(frame_key(df), tuple(features)),
+        threshold=float(threshold),
+        max_subclusters=max_subclusters
+    )
+    if summary is None:
+        return
+
+    n_sub = len(summary["centers"])
+    st.caption(f"{len(X_scaled):,} rows summarized into {n_sub:,} subclusters.")
+
+    if n_sub < 2:
+        st.warning("All rows fall into one subcluster. Lower the threshold.")
+        return
+
+    Z = cached_artifact(
+        "hier_linkage",
+        identity(summary),
+        lambda: ward_linkage(summary["centers"], summary["counts"])
+    )
+
+    # --------------------------------------------------
+    # DENDROGRAM & CUT
+    # --------------------------------------------------
+    st.subheader("🌳 Dendrogram")
+
+    n_clusters = st.slider(
+        "Number of clusters (cut level)", 2, min(20, n_sub), min(3, n_sub), key="hier_k"
+    )
+    # Any height between the merges that leave n and n-1 clusters cuts here
+    below = Z[-n_clusters, 2] if n_clusters <= len(Z) else 0.0
+    cut_height = (below + Z[-n_clusters + 1, 2]) / 2
+
+    fig, ax = plt.subplots(figsize=(10, 4))
+    with stage("dendrogram plot"):
+        dendrogram(
+            Z,
+            truncate_mode="lastp",
+            p=min(30, n_sub),
+            color_threshold=cut_height,
+            no_labels=True,
+            ax=ax
+        )
+    ax.axhline(cut_height, linestyle="--", color="red")
+    ax.set_ylabel("Ward distance")
+    st.pyplot(fig)
+    plt.close(fig)
+
+    labels = cut_hierarchy(Z, summary["assignment"], n_clusters)
+
+    # --------------------------------------------------
+    # CLUSTER VISUALIZATION
+    # --------------------------------------------------
+    st.subheader("🧭 Cluster Visualization (PCA Reduced)")
+
+    pca_components = pca_2d(X_scaled)
+    aggregated, overlay = render_scatter_controls(len(labels), key="hier_scatter")
+
+    fig, ax = plt.subplots()
+    with stage("cluster scatter plot", aggregated=aggregated):
+        if aggregated:
+            density_scatter(
+                ax, pca_components[:, 0], pca_components[:, 1],
+                labels=labels, overlay=overlay
+            )
+        else:
+            sns.scatterplot(
+                x=pca_components[:, 0],
+                y=pca_components[:, 1],
+                hue=labels,
+                palette="tab10",
+                ax=ax
+            )
+    ax.set_xlabel("PCA1")
+    ax.set_ylabel("PCA2")
+    st.pyplot(fig)
+    plt.close(fig)
+
+    # --------------------------------------------------
+    # CLUSTER PROFILES
+    # --------------------------------------------------
+    st.subheader("📋 Cluster Profiles (Average Values)")
+
+    profile = profile_clusters(data, labels, features, categorical=[])
+    st.dataframe(profile["sizes"].style.format({"Share": "{:.1%}"}))
+    st.dataframe(profile["mean"].style.background_gradient(cmap="coolwarm"))
+
+    # --------------------------------------------------
+    # DOWNLOAD DATA
+    # --------------------------------------------------
+    st.download_button(
+        "⬇️ Download Clustered Dataset",
+        lambda: with_columns(df.loc[data.index], Cluster=labels).to_csv(index=False),
+        file_name="hierarchical_clustered_data.csv",
+        mime="text/csv",
+        on_click="ignore"
+    )
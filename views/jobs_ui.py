@@ -0,0 +1,64 @@
+import streamlit as st
+
+from engine.jobs import get_job_manager, DONE, FAILED, CANCELLED
+from views.session import session_id
+
+
+# ===============================
+# Background Results in Pages
+# ===============================
+# `background_result` submits (or re-attaches to) a job and returns its
+# result once finished. While it runs, a fragment polls the job once a
+# second and shows progress with a cancel button; the full page reruns
+# only when the job reaches a final state.
+#
+# `source` is a content key for the large inputs (see engine.jobs); pages
+# pass the analysis frame's key and the choices that derive the inputs
+# from it, so a rerun finds its job without hashing a scaled matrix.
+
+POLL_SECONDS = 1.0
+
+
+@st.fragment(run_every=POLL_SECONDS)
+def _job_progress(key):
+    manager = get_job_manager()
+    status = manager.status(key)
+
+    if status is None or status["state"] in (DONE, FAILED, CANCELLED):
+        st.rerun()
+
+    text = f"⏳ {status['label']}: {status['message']} ({status['elapsed_s']:.0f}s)"
+    if status["cancelling"]:
+        text += " — cancelling…"
+    st.progress(min(max(status["progress"], 0.0), 1.0), text=text)
+
+    if st.button("✖ Cancel", key=f"cancel_job_{key}"):
+        manager.cancel(key)
+        st.rerun()
+
+
+def background_result(label, fn, *args, source=None, **kwargs):
+    manager = get_job_manager()
+    key = manager.submit(fn, *args, label=label, session=session_id(), source=source, **kwargs)
+    status = manager.status(key)
+
+    if status["state"] == DONE:
+        st.caption(f"✅ {label} finished in {status['elapsed_s']:.1f}s")
+        return status["result"]
+
+    if status["state"] == FAILED:
+        st.error(f"❌ {label} failed: {status['error']}")
+        if st.button("🔁 Retry", key=f"retry_job_{key}"):
+            manager.forget(key)
+            st.rerun()
+        return None
+
+    if status["state"] == CANCELLED:
+        st.warning(f"{label} was cancelled.")
+        if st.button("▶️ Run again", key=f"restart_job_{key}"):
+            manager.forget(key)
+            st.rerun()
+        return None
+
+    _job_progress(key)
+    return None
@@ -6,9 +6,26 @@ def kmeans_clustering_page():
     import matplotlib.pyplot as plt
     import seaborn as sns
 
-    from sklearn.preprocessing import StandardScaler
-    from sklearn.cluster import KMeans
-    from sklearn.decomposition import PCA
+    from engine.pca import standardize
+    from engine.precision import compute_dtype
+    from engine.dataset import with_columns
+    from engine.clustering import (
+        k_selection_diagnostics,
+        fit_kmeans,
+        kmeans_state,
+        row_hash,
+        warm_start_compatible,
+        warm_start_centers,
+        update_kmeans,
+        cluster_drift,
+        pca_2d,
+        profile_clusters
+    )
+    from views.jobs_ui import background_result
+    from engine.segmentation import segmentation_bytes, load_segmentation, assign_frame
+    from views.plots import render_scatter_controls, density_scatter
+    from views.session import load_shared_dataset, get_artifact, put_artifact, cached_artifact, analysis_data, identity, frame_key, cpu_lease
+    from perf import stage
 
     st.header("📊 K-Means Clustering")
 
@@ -28,14 +45,18 @@ def kmeans_clustering_page():
         st.warning("No dataset found. Please upload a dataset first.")
         return
 
-    df = st.session_state["data"]
+    df = analysis_data()
 
     # --------------------------------------------------
     # DECISION GATE
     # --------------------------------------------------
     decision = st.radio(
         "Do you want to run cluster analysis on this dataset?",
-        ["Yes, run clustering", "No, I want to use another dataset"]
+        [
+            "Yes, run clustering",
+            "Assign records to a saved segmentation",
+            "No, I want to use another dataset"
+        ]
     )
 
     # ==================================================
@@ -47,6 +68,13 @@ def kmeans_clustering_page():
 
         numeric_cols = df.select_dtypes(include=["int64", "float64"]).columns.tolist()
 
+        excluded = df.select_dtypes(exclude="number").columns.tolist()
+        if excluded:
+            st.caption(
+                f"K-Means uses numeric columns only; {len(excluded)} categorical column(s) "
+                "are not used here. Use 🧩 Mixed-Type Clustering to include them."
+            )
+
         if len(numeric_cols) < 2:
             st.error("At least two numeric features are required for clustering.")
             return
@@ -64,28 +92,73 @@ def kmeans_clustering_page():
         # --------------------------------------------------
         # SCALING
         # --------------------------------------------------
-        scaler = StandardScaler()
-        X_scaled = scaler.fit_transform(df[features])
+        X_scaled, scaler = standardize(df[features])
 
         # --------------------------------------------------
-        # ELBOW METHOD
+        # K SELECTION (CORESET DIAGNOSTICS)
         # --------------------------------------------------
-        st.subheader("📈 Elbow Method (Optimal Number of Clusters)")
-
-        inertia = []
+        st.subheader("📈 Choosing the Number of Clusters")
+
+        with st.expander("Diagnostic settings"):
+            coreset_size = st.number_input(
+                "Coreset size", min_value=500, max_value=100_000, value=5000, step=500
+            )
+            sample_size = st.number_input(
+                "Scoring sample size", min_value=200, max_value=20_000, value=2000, step=200
+            )
+
+        # Runs in the background on a weighted coreset so moving the K
+        # slider does not restart it; only the chosen K is fitted on all rows
         K_range = range(1, 11)
+        diagnostics = background_result(
+            "K selection diagnostics",
+            k_selection_diagnostics,
+            X_scaled,
+            K_range,
+            source=(frame_key(df), tuple(features)),
+            coreset_size=int(coreset_size),
+            sample_size=int(sample_size)
+        )
 
-        for k in K_range:
-            km = KMeans(n_clusters=k, random_state=42, n_init=10)
-            km.fit(X_scaled)
-            inertia.append(km.inertia_)
-
-        fig, ax = plt.subplots()
-        ax.plot(K_range, inertia, marker="o")
-        ax.set_xlabel("Number of Clusters (K)")
-        ax.set_ylabel("Inertia")
-        ax.set_title("Elbow Plot")
-        st.pyplot(fig)
+        if diagnostics is not None:
+            table = diagnostics["table"]
+            st.caption(
+                f"Estimated from a {diagnostics['coreset_size']:,}-point weighted coreset; "
+                f"scores on a {diagnostics['sample_size']:,}-row sample. "
+                "Shaded band: 95% interval of the full-data inertia."
+            )
+
+            fig, axes = plt.subplots(1, 3, figsize=(13, 3.5))
+            axes[0].plot(table.index, table["inertia"], marker="o")
+            axes[0].fill_between(
+                table.index, table["inertia_low"], table["inertia_high"], alpha=0.25
+            )
+            axes[0].set_title("Elbow (Inertia)")
+            axes[1].plot(table.index, table["silhouette"], marker="o", label="Silhouette")
+            axes[1].plot(table.index, table["davies_bouldin"], marker="s", label="Davies-Bouldin")
+            axes[1].set_title("Silhouette ↑ / Davies-Bouldin ↓")
+            axes[1].legend()
+            axes[2].errorbar(table.index, table["gap"], yerr=table["gap_se"], marker="o", capsize=3)
+            axes[2].set_title("Gap Statistic")
+            for ax in axes:
+                ax.set_xlabel("Number of Clusters (K)")
+            plt.tight_layout()
+            st.pyplot(fig)
+            plt.close(fig)
+
+            st.dataframe(
+                table.style.format("{:.3f}", subset=[
+                    "silhouette", "davies_bouldin", "gap", "gap_se"
+                ]).format("{:,.0f}", subset=[
+                    "inertia", "inertia_low", "inertia_high", "calinski_harabasz"
+                ])
+            )
+
+            suggested = diagnostics["suggested"]
+            st.info(
+                "Suggested K — "
+                + " · ".join(f"{name.replace('_', '-').title()}: **{k}**" for name, k in suggested.items())
+            )
 
         # --------------------------------------------------
         # SELECT K
@@ -98,37 +171,128 @@ def kmeans_clustering_page():
         )
 
         # --------------------------------------------------
-        # RUN K-MEANS
+        # RUN K-MEANS (WARM-STARTED / INCREMENTAL)
         # --------------------------------------------------
-        kmeans = KMeans(n_clusters=k, random_state=42, n_init=10)
-        clusters = kmeans.fit_predict(X_scaled)
+        prev = get_artifact("kmeans_state")
+
+        # The previous segmentation is reusable when its rows are still the
+        # leading rows of the current dataset
+        n_prev = len(prev["labels"]) if prev else 0
+        same_prefix = bool(prev) and len(df) >= n_prev and cached_artifact(
+            "kmeans_prefix_check",
+            (frame_key(df), prev["version"]),
+            lambda: set(prev["features"]) <= set(df.columns)
+            and row_hash(df, prev["features"], n_prev) == prev["row_hash"]
+        )
+        unchanged = same_prefix and prev["features"] == features and len(prev["centers"]) == k
+
+        # The choice stays available while the current segmentation is the
+        # result of an incremental update, so it can still be refitted
+        update_only = False
+        if unchanged and (len(df) > n_prev or prev.get("mode") == "incremental update"):
+            if len(df) > n_prev:
+                st.info(f"{len(df) - n_prev:,} new rows since the last clustering.")
+            update_only = st.radio(
+                "Appended rows:",
+                ["Assign new rows and update centroids", "Refit on all rows (warm start)"],
+                key="kmeans_append_mode"
+            ) == "Assign new rows and update centroids"
+
+        warm = False
+        if unchanged and len(df) == n_prev and (
+            update_only or prev.get("mode") != "incremental update"
+        ):
+            state = prev
+        elif update_only:
+            dtype = compute_dtype()
+            X_new = df[features].iloc[n_prev:].to_numpy(dtype=dtype, copy=True)
+            X_new -= prev["mean"].astype(dtype)
+            X_new /= prev["scale"].astype(dtype)
+            with cpu_lease("kmeans update"):
+                state = update_kmeans(prev, X_new)
+        else:
+            warm = same_prefix and warm_start_compatible(prev, features, k)
+            with cpu_lease("kmeans fit"):
+                init = warm_start_centers(prev, X_scaled[:n_prev], k) if warm else None
+                fit = fit_kmeans(X_scaled, k, init=init)
+            state = kmeans_state(
+                features, scaler.mean_, scaler.scale_, fit["centers"], fit["labels"],
+                None, version=prev["version"] + 1 if prev else 1
+            )
+
+        if state is not prev:
+            state["drift"] = cluster_drift(prev, state) if same_prefix else (None, None)
+            state["mode"] = (
+                "incremental update" if update_only
+                else "warm start" if warm else "fresh fit"
+            )
+            state["row_hash"] = row_hash(df, state["features"])
+            put_artifact("kmeans_state", state, pinned=True)
+
+        clusters = state["labels"]
+
+        st.caption(
+            f"Segmentation v{state['version']} · {state.get('mode', 'fresh fit')}"
+        )
+        st.download_button(
+            "💾 Save Segmentation (scaler + centroids)",
+            lambda: segmentation_bytes(state),
+            file_name=f"segmentation_v{state['version']}.npz",
+            mime="application/octet-stream",
+            on_click="ignore",
+            key="kmeans_save_segmentation"
+        )
 
-        df_clustered = df.copy()
-        df_clustered["Cluster"] = clusters
+        drift, agreement = state.get("drift", (None, None))
+        if drift is not None:
+            with st.expander("🔀 Cluster drift vs previous version", expanded=True):
+                if agreement is not None:
+                    st.write(f"Label agreement on shared rows (ARI): **{agreement:.3f}**")
+                st.dataframe(
+                    drift.style.format({
+                        "Centroid Shift (SD)": "{:.3f}",
+                        "Share Change": "{:+.1%}"
+                    })
+                )
 
         # --------------------------------------------------
         # PCA FOR VISUALIZATION
         # --------------------------------------------------
-        pca = PCA(n_components=2)
-        pca_components = pca.fit_transform(X_scaled)
-
-        df_clustered["PCA1"] = pca_components[:, 0]
-        df_clustered["PCA2"] = pca_components[:, 1]
+        pca_components = pca_2d(X_scaled)
+
+        # Shares the uploaded columns; only the three new ones are allocated
+        df_clustered = with_columns(
+            df,
+            Cluster=clusters,
+            PCA1=pca_components[:, 0],
+            PCA2=pca_components[:, 1]
+        )
 
         # --------------------------------------------------
         # CLUSTER VISUALIZATION
         # --------------------------------------------------
         st.subheader("🧭 Cluster Visualization (PCA Reduced)")
 
+        aggregated, overlay = render_scatter_controls(len(df_clustered), key="kmeans_scatter")
+
         fig, ax = plt.subplots()
-        sns.scatterplot(
-            data=df_clustered,
-            x="PCA1",
-            y="PCA2",
-            hue="Cluster",
-            palette="tab10",
-            ax=ax
-        )
+        with stage("cluster scatter plot", aggregated=aggregated):
+            if aggregated:
+                density_scatter(
+                    ax, pca_components[:, 0], pca_components[:, 1],
+                    labels=clusters, overlay=overlay
+                )
+                ax.set_xlabel("PCA1")
+                ax.set_ylabel("PCA2")
+            else:
+                sns.scatterplot(
+                    data=df_clustered,
+                    x="PCA1",
+                    y="PCA2",
+                    hue="Cluster",
+                    palette="tab10",
+                    ax=ax
+                )
         ax.set_title("Customer Segments")
         st.pyplot(fig)
 
@@ -137,7 +301,12 @@ def kmeans_clustering_page():
         # --------------------------------------------------
         st.subheader("📊 Cluster Size Distribution")
 
-        cluster_counts = df_clustered["Cluster"].value_counts().sort_index()
+        profile = cached_artifact(
+            "cluster_profile",
+            (frame_key(df), tuple(features), identity(clusters)),
+            lambda: profile_clusters(df, clusters, features)
+        )
+        cluster_counts = profile["sizes"]["Count"]
 
         fig, ax = plt.subplots()
         cluster_counts.plot(kind="bar", ax=ax)
@@ -148,21 +317,105 @@ def kmeans_clustering_page():
         # --------------------------------------------------
         # CLUSTER PROFILES
         # --------------------------------------------------
-        st.subheader("📋 Cluster Profiles (Average Values)")
+        st.subheader("📋 Cluster Profiles")
 
-        profile = df_clustered.groupby("Cluster")[features].mean()
-        st.dataframe(profile.style.background_gradient(cmap="coolwarm"))
+        statistic = st.radio(
+            "Statistic:",
+            ["Mean", "Median", "Std", "25th Percentile", "75th Percentile"],
+            horizontal=True,
+            key="profile_statistic"
+        )
+        table = profile[{
+            "Mean": "mean",
+            "Median": "median",
+            "Std": "std",
+            "25th Percentile": "q25",
+            "75th Percentile": "q75"
+        }[statistic]]
+        st.dataframe(
+            table.style.background_gradient(cmap="coolwarm")
+            if table.size <= 50_000 else table
+        )
+
+        if not profile["categorical"].empty:
+            st.markdown("**Most Common Category per Cluster (with share)**")
+            st.dataframe(profile["categorical"])
 
         # --------------------------------------------------
         # DOWNLOAD DATA
         # --------------------------------------------------
+        with stage("csv export"):
+            clustered_csv = df_clustered.to_csv(index=False)
+
         st.download_button(
             "⬇️ Download Clustered Dataset",
-            df_clustered.to_csv(index=False),
+            clustered_csv,
             file_name="clustered_data.csv",
             mime="text/csv"
         )
 
+    # ==================================================
+    # ASSIGN → SAVED SEGMENTATION
+    # ==================================================
+    elif decision == "Assign records to a saved segmentation":
+        st.info(
+            "Upload a segmentation saved from this page. Records are scaled with its "
+            "scaler and assigned to the nearest saved centroid, without re-clustering."
+        )
+
+        seg_file = st.file_uploader("Upload segmentation (.npz)", type=["npz"])
+        records_file = st.file_uploader(
+            "Upload records (leave empty to use the current dataset)",
+            type=["csv", "parquet"]
+        )
+
+        if seg_file is None:
+            return
+
+        try:
+            segmentation = load_segmentation(seg_file)
+        except (ValueError, OSError, KeyError) as e:
+            st.error(f"Could not read segmentation: {e}")
+            return
+
+        records = load_shared_dataset(records_file) if records_file is not None else df
+        missing = [f for f in segmentation["features"] if f not in records.columns]
+        if missing:
+            st.error(f"Records are missing segmentation features: {', '.join(missing)}")
+            return
+
+        labels = cached_artifact(
+            "segment_assignment",
+            (frame_key(records), seg_file.file_id),
+            lambda: assign_frame(records, segmentation)
+        )
+
+        st.caption(
+            f"Segmentation v{segmentation['version']} · "
+            f"{len(segmentation['centers'])} clusters · {len(segmentation['features'])} features"
+        )
+        unassigned = int((labels < 0).sum())
+        if unassigned:
+            st.warning(f"{unassigned:,} records have missing feature values and were not assigned (Cluster = -1).")
+
+        sizes = pd.DataFrame({
+            "Saved Share": segmentation["counts"] / max(segmentation["counts"].sum(), 1),
+            "New Records": np.bincount(labels[labels >= 0], minlength=len(segmentation["centers"]))
+        }).rename_axis("Cluster")
+        sizes["New Share"] = sizes["New Records"] / max(sizes["New Records"].sum(), 1)
+        st.dataframe(sizes.style.format({"Saved Share": "{:.1%}", "New Share": "{:.1%}"}))
+
+        assigned = with_columns(records, Cluster=labels)
+        st.dataframe(assigned.head())
+
+        st.download_button(
+            "⬇️ Download Assigned Records",
+            lambda: assigned.to_csv(index=False),
+            file_name="assigned_records.csv",
+            mime="text/csv",
+            on_click="ignore"
+        )
+
     # ==================================================
     # NO → UPLOAD NEW DATASET
     # ==================================================
@@ -172,7 +425,7 @@ def kmeans_clustering_page():
         uploaded_file = st.file_uploader("Upload CSV file", type=["csv"])
 
         if uploaded_file is not None:
-            new_df = pd.read_csv(uploaded_file)
+            new_df = load_shared_dataset(uploaded_file)
             st.session_state["data"] = new_df
             st.success("New dataset uploaded successfully!")
             st.dataframe(new_df.head())
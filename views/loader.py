@@ -0,0 +1,101 @@
+import builtins
+import importlib
+import sys
+import threading
+import time
+
+
+# ===============================
+# Lazy Page Loading
+# ===============================
+# Page modules are imported on their first visit only. While a page is
+# loaded for the first time (module import + first render, since some
+# pages import their dependencies inside the page function) every new
+# module import is timed, so the sidebar can show where startup cost goes.
+# State lives at module level and is therefore shared by all sessions of
+# the Streamlit process.
+
+_lock = threading.Lock()
+_local = threading.local()
+_loaded = set()
+_active = 0
+
+# module name -> {"self_ms": float, "total_ms": float, "page": str}
+_module_times = {}
+# page module -> total first-visit ms
+_page_times = {}
+
+_original_import = builtins.__import__
+
+
+def _timed_import(name, globals=None, locals=None, fromlist=(), level=0):
+    if level or name in sys.modules:
+        return _original_import(name, globals, locals, fromlist, level)
+
+    stack = getattr(_local, "stack", None)
+    if stack is None:
+        return _original_import(name, globals, locals, fromlist, level)
+
+    stack.append(0.0)
+    start = time.perf_counter()
+    try:
+        return _original_import(name, globals, locals, fromlist, level)
+    finally:
+        total = (time.perf_counter() - start) * 1000
+        children = stack.pop()
+        if stack:
+            stack[-1] += total
+        if name not in _module_times:
+            _module_times[name] = {
+                "self_ms": total - children,
+                "total_ms": total,
+                "page": _local.page
+            }
+
+
+def _first_visit(module_name, func_name):
+    global _active
+
+    with _lock:
+        _active += 1
+        builtins.__import__ = _timed_import
+    _local.stack = []
+    _local.page = module_name
+
+    start = time.perf_counter()
+    try:
+        module = importlib.import_module(module_name)
+        getattr(module, func_name)()
+    finally:
+        _page_times[module_name] = (time.perf_counter() - start) * 1000
+        _loaded.add(module_name)
+        _local.stack = None
+        with _lock:
+            # Uninstall once no other session is mid first-visit
+            _active -= 1
+            if _active == 0:
+                builtins.__import__ = _original_import
+
+
+def run_page(module_name, func_name):
+    if module_name in _loaded:
+        getattr(sys.modules[module_name], func_name)()
+    else:
+        _first_visit(module_name, func_name)
+
+
+def import_report():
+    rows = []
+    for name, info in _module_times.items():
+        rows.append({
+            "Module": name,
+            "Package": name.split(".")[0],
+            "Self (ms)": round(info["self_ms"], 1),
+            "Cumulative (ms)": round(info["total_ms"], 1),
+            "First Loaded By": info["page"]
+        })
+    return rows
+
+
+def page_load_times():
+    return {name: round(ms, 1) for name, ms in _page_times.items()}
@@ -0,0 +1,138 @@
+import streamlit as st
+
+def mixed_clustering_page():
+    import numpy as np
+    import matplotlib.pyplot as plt
+
+    from engine.dataset import with_columns
+    from engine.clustering import encode_mixed, fit_kprototypes, prototype_table, profile_clusters
+    from views.jobs_ui import background_result
+    from views.session import cached_artifact, analysis_data, identity, frame_key
+
+    st.header("🧩 Mixed-Type Clustering")
+
+    # --------------------------------------------------
+    # WHY & WHAT
+    # --------------------------------------------------
+    st.markdown("""
+    **Why k-Prototypes?**
+    K-Means only understands numbers, so categorical survey answers are left out.
+    k-Prototypes clusters numeric and categorical columns together: numeric columns
+    by distance to the segment average, categorical columns by whether they match
+    the segment's most common answer.
+    """)
+
+    # --------------------------------------------------
+    # CHECK IF DATA EXISTS
+    # --------------------------------------------------
+    if "data" not in st.session_state:
+        st.warning("No dataset found. Please upload a dataset first.")
+        return
+
+    df = analysis_data()
+
+    st.subheader("🔧 Select Features for Clustering")
+
+    numeric_cols = df.select_dtypes(include=np.number).columns.tolist()
+    categorical_cols = [c for c in df.columns if c not in numeric_cols]
+
+    numeric = st.multiselect(
+        "Numeric features:", numeric_cols, default=numeric_cols, key="mixed_numeric"
+    )
+    categorical = st.multiselect(
+        "Categorical features:", categorical_cols, default=categorical_cols, key="mixed_categorical"
+    )
+
+    if len(numeric) + len(categorical) < 2:
+        st.warning("Please select at least two features.")
+        return
+
+    encoded = cached_artifact(
+        "mixed_encoding",
+        (frame_key(df), tuple(numeric), tuple(categorical)),
+        lambda: encode_mixed(df, numeric, categorical)
+    )
+
+    dropped = len(df) - len(encoded["index"])
+    if dropped:
+        st.info(f"{dropped:,} rows with missing numeric values are left out.")
+
+    # --------------------------------------------------
+    # PARAMETERS
+    # --------------------------------------------------
+    k = st.slider("Select number of clusters (K)", 2, 10, 3, key="mixed_k")
+
+    with st.expander("Advanced settings"):
+        gamma = st.number_input(
+            "Categorical weight (gamma)",
+            min_value=0.0,
+            value=0.5,
+            step=0.1,
+            help="Cost of one categorical mismatch, in squared standard deviations "
+                 "of the numeric features."
+        )
+        n_init = st.slider("Random restarts", 1, 10, 3, key="mixed_n_init")
+
+    fit = background_result(
+        "k-prototypes",
+        fit_kprototypes,
+        encoded,
+        k,
+        source=(frame_key(df), tuple(numeric), tuple(categorical)),
+        gamma=float(gamma),
+        n_init=n_init
+    )
+    if fit is None:
+        return
+
+    labels = fit["labels"]
+    st.caption(f"Converged in {fit['n_iter']} iterations · total cost {fit['cost']:,.1f}")
+
+    # --------------------------------------------------
+    # PROTOTYPES
+    # --------------------------------------------------
+    st.subheader("🧬 Cluster Prototypes")
+    st.dataframe(prototype_table(encoded, fit))
+
+    # --------------------------------------------------
+    # CLUSTER SIZE DISTRIBUTION
+    # --------------------------------------------------
+    st.subheader("📊 Cluster Size Distribution")
+
+    rows = df.loc[encoded["index"]] if dropped else df
+    profile = cached_artifact(
+        "mixed_profile",
+        (identity(encoded), identity(labels)),
+        lambda: profile_clusters(rows, labels, numeric, categorical=categorical)
+    )
+
+    fig, ax = plt.subplots()
+    profile["sizes"]["Count"].plot(kind="bar", ax=ax)
+    ax.set_xlabel("Cluster")
+    ax.set_ylabel("Number of Records")
+    st.pyplot(fig)
+    plt.close(fig)
+
+    # --------------------------------------------------
+    # CLUSTER PROFILES
+    # --------------------------------------------------
+    st.subheader("📋 Cluster Profiles")
+
+    if numeric:
+        st.markdown("**Average Values**")
+        st.dataframe(profile["mean"].style.background_gradient(cmap="coolwarm"))
+
+    if not profile["categorical"].empty:
+        st.markdown("**Most Common Category per Cluster (with share)**")
+        st.dataframe(profile["categorical"])
+
+    # --------------------------------------------------
+    # DOWNLOAD DATA
+    # --------------------------------------------------
+    st.download_button(
+        "⬇️ Download Clustered Dataset",
+        lambda: with_columns(rows, Cluster=labels).to_csv(index=False),
+        file_name="mixed_clustered_data.csv",
+        mime="text/csv",
+        on_click="ignore"
+    )
@@ -4,8 +4,12 @@ def pca_page():
     import numpy as np
     import matplotlib.pyplot as plt
 
-    from sklearn.preprocessing import StandardScaler
-    from sklearn.decomposition import PCA
+    from engine.pca import pca_spectrum_from_moments, pca_project_chunked
+    from views.session import cached_comoments, cpu_lease
+    from views.components import render_score_download
+    from views.plots import render_scatter_controls, density_scatter
+    from perf import stage
+    from views.session import load_shared_dataset, analysis_data
 
     # --------------------------------------------------
     # HEADER & CONTEXT
@@ -26,7 +30,7 @@ def pca_page():
         st.warning("No dataset found. Please upload a dataset first.")
         return
 
-    df = st.session_state["data"]
+    df = analysis_data()
 
     # --------------------------------------------------
     # DECISION GATE
@@ -62,26 +66,24 @@ def pca_page():
             st.warning("Please select at least two variables.")
             return
 
-        X = df[features].dropna()
-
         # --------------------------------------------------
         # STANDARDIZATION
         # --------------------------------------------------
         st.subheader("⚖️ Data Standardization")
 
-        scaler = StandardScaler()
-        X_scaled = scaler.fit_transform(X)
+        # Means, standard deviations and correlations from one streaming
+        # pass; rows are standardized chunk by chunk only when projected
+        moments = cached_comoments(df, features, pairwise=False)
 
         st.success("Data has been standardized successfully.")
 
         # --------------------------------------------------
         # PCA FIT (ALL COMPONENTS)
         # --------------------------------------------------
-        pca = PCA()
-        X_pca = pca.fit_transform(X_scaled)
+        spectrum = pca_spectrum_from_moments(moments)
 
-        explained_variance = pca.explained_variance_ratio_
-        cumulative_variance = np.cumsum(explained_variance)
+        explained_variance = spectrum["explained_variance_ratio"]
+        cumulative_variance = spectrum["cumulative_variance"]
 
         # --------------------------------------------------
         # EXPLAINED VARIANCE (BAR CHART)
@@ -125,8 +127,8 @@ def pca_page():
 
         fig, ax = plt.subplots(figsize=(7, 4))
         ax.plot(
-            range(1, len(pca.explained_variance_) + 1),
-            pca.explained_variance_,
+            range(1, len(spectrum["explained_variance"]) + 1),
+            spectrum["explained_variance"],
             marker="o"
         )
         ax.set_xlabel("Component Number")
@@ -144,8 +146,10 @@ def pca_page():
             value=2
         )
 
-        pca_final = PCA(n_components=n_components)
-        X_pca_final = pca_final.fit_transform(X_scaled)
+        with cpu_lease("pca projection"):
+            X_pca_final, loadings, _ = pca_project_chunked(
+                df, features, moments, spectrum, n_components
+            )
 
         # --------------------------------------------------
         # PCA 2D SCATTER PLOT
@@ -153,29 +157,32 @@ def pca_page():
         if n_components >= 2:
             st.subheader("🧭 PCA 2D Projection (PC1 vs PC2)")
 
-            fig, ax = plt.subplots(figsize=(6, 5))
-            ax.scatter(
-                X_pca_final[:, 0],
-                X_pca_final[:, 1],
-                alpha=0.7,
-                color="#6d71ff"
-            )
-            ax.set_xlabel("Principal Component 1")
-            ax.set_ylabel("Principal Component 2")
-            st.pyplot(fig)
-            plt.close(fig)
+            aggregated, overlay = render_scatter_controls(len(X_pca_final), key="pca_scatter")
+
+            with stage("pca scatter plot", aggregated=aggregated):
+                fig, ax = plt.subplots(figsize=(6, 5))
+                if aggregated:
+                    density_scatter(
+                        ax, X_pca_final[:, 0], X_pca_final[:, 1],
+                        overlay=overlay, color="#6d71ff"
+                    )
+                else:
+                    ax.scatter(
+                        X_pca_final[:, 0],
+                        X_pca_final[:, 1],
+                        alpha=0.7,
+                        color="#6d71ff"
+                    )
+                ax.set_xlabel("Principal Component 1")
+                ax.set_ylabel("Principal Component 2")
+                st.pyplot(fig)
+                plt.close(fig)
 
         # --------------------------------------------------
         # PCA LOADINGS
         # --------------------------------------------------
         st.subheader("📋 PCA Loadings")
 
-        loadings = pd.DataFrame(
-            pca_final.components_.T,
-            index=features,
-            columns=[f"PC{i+1}" for i in range(n_components)]
-        )
-
         st.markdown(
             loadings.to_html(classes="data-table", index=True),
             unsafe_allow_html=True
@@ -184,16 +191,15 @@ def pca_page():
         # --------------------------------------------------
         # DOWNLOAD PCA OUTPUT
         # --------------------------------------------------
-        pca_df = pd.DataFrame(
-            X_pca_final,
-            columns=[f"PC{i+1}" for i in range(n_components)]
-        )
-
-        st.download_button(
+        render_score_download(
             "⬇️ Download PCA Transformed Data",
-            pca_df.to_csv(index=False),
-            file_name="pca_transformed_data.csv",
-            mime="text/csv"
+            df,
+            features,
+            moments,
+            spectrum["components"][:n_components].T,
+            [f"PC{i+1}" for i in range(n_components)],
+            "pca_transformed_data",
+            key="pca_export"
         )
 
     # ==================================================
@@ -204,7 +210,7 @@ def pca_page():
 
         uploaded_file = st.file_uploader("Upload CSV file", type=["csv"])
         if uploaded_file is not None:
-            new_df = pd.read_csv(uploaded_file)
+            new_df = load_shared_dataset(uploaded_file)
             st.session_state["data"] = new_df
             st.success("New dataset uploaded successfully!")
             st.dataframe(new_df.head())
@@ -0,0 +1,51 @@
+import streamlit as st
+
+
+# ===============================
+# Sidebar Performance Panel
+# ===============================
+def render_perf_panel(recorder):
+    with st.sidebar.expander("⏱️ Performance (last rerun)"):
+        st.toggle(
+            "Track peak memory",
+            value=False,
+            key="perf_track_memory",
+            help="Uses tracemalloc while this session's reruns are recorded; "
+                 "it slows every allocation on the server meanwhile."
+        )
+        if st.session_state.get("perf_track_memory"):
+            st.caption(
+                "Peak memory is measured per process: allocations by other "
+                "sessions running at the same time are included."
+            )
+
+        if not recorder.records:
+            st.caption("No stages recorded in this rerun.")
+            return
+
+        rows = [
+            {
+                **r,
+                "Wall (ms)": round(r["Wall (ms)"], 1),
+                "CPU (ms)": round(r["CPU (ms)"], 1),
+                "Peak (MB)": None if r["Peak (MB)"] is None else round(r["Peak (MB)"], 2)
+            }
+            for r in recorder.summary()
+        ]
+        st.dataframe(rows, hide_index=True)
+
+        c1, c2 = st.columns(2)
+        with c1:
+            st.download_button(
+                "⬇️ JSON",
+                recorder.to_json(),
+                file_name="stages.json",
+                mime="application/json"
+            )
+        with c2:
+            st.download_button(
+                "⬇️ Chrome trace",
+                recorder.to_chrome_trace(),
+                file_name="stages.trace.json",
+                mime="application/json"
+            )
@@ -0,0 +1,69 @@
+import numpy as np
+import matplotlib.pyplot as plt
+from matplotlib.colors import to_rgba
+import streamlit as st
+
+from engine.density import density_grid, blend_rgba
+from perf import stage
+
+
+# ===============================
+# Scatter Rendering (auto-aggregated)
+# ===============================
+# Below the threshold every point is drawn as before. Above it the plot
+# becomes a rasterized per-cluster density image, optionally with a
+# random sample of individual points on top.
+
+DENSITY_THRESHOLD = 50_000
+DENSITY_BINS = 300
+
+
+def render_scatter_controls(n_points, key):
+    aggregated = n_points > DENSITY_THRESHOLD
+    overlay = 0
+    if aggregated:
+        st.caption(
+            f"{n_points:,} points: showing binned density "
+            f"(individual points above {DENSITY_THRESHOLD:,} are aggregated)."
+        )
+        if st.checkbox("Overlay a sample of individual points", key=f"{key}_overlay"):
+            overlay = st.slider(
+                "Sampled points", 1_000, 20_000, 5_000, 1_000, key=f"{key}_overlay_n"
+            )
+    return aggregated, overlay
+
+
+def density_scatter(ax, x, y, labels=None, bins=DENSITY_BINS, overlay=0,
+                    palette="tab10", color=None, random_state=0):
+    grid = density_grid(x, y, labels, bins=bins)
+    classes = grid["classes"]
+    if color is not None:
+        colors = [to_rgba(color)] * len(classes)
+    else:
+        cmap = plt.get_cmap(palette)
+        colors = [cmap(i % cmap.N) for i in range(len(classes))]
+
+    with stage("density render"):
+        ax.imshow(
+            blend_rgba(grid["counts"], colors),
+            extent=grid["extent"],
+            origin="lower",
+            aspect="auto",
+            interpolation="nearest"
+        )
+
+        if overlay:
+            rng = np.random.default_rng(random_state)
+            idx = rng.choice(len(x), size=min(overlay, len(x)), replace=False)
+            codes = np.searchsorted(classes, np.asarray(labels)[idx]) if labels is not None \
+                else np.zeros(len(idx), dtype=int)
+            ax.scatter(
+                np.asarray(x)[idx], np.asarray(y)[idx],
+                c=[colors[c] for c in codes], s=4, linewidths=0, alpha=0.8,
+                rasterized=True
+            )
+
+    if labels is not None and len(classes) > 1:
+        for c, color in zip(classes, colors):
+            ax.scatter([], [], color=color, label=str(c))
+        ax.legend(title="Cluster", markerscale=1.5, fontsize=8)
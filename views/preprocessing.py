@@ -3,6 +3,25 @@ import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
 
+from views.components import render_paginated_table
+from views.jobs_ui import background_result
+from views.session import (
+    get_artifact,
+    put_artifact,
+    cached_artifact,
+    session_artifacts,
+    active_imputation,
+    active_outlier_filter,
+    cleaned_data,
+    derived_frame,
+    frame_key,
+    identity
+)
+from engine.profiling import column_quality_summary, duplicate_rows
+from engine.imputation import METHODS, impute_missing, apply_fills
+from engine.outliers import RULES, outlier_scores, flag_outliers, score_table
+from perf import stage
+
 
 # ===============================
 # Purple + White Table Styling
@@ -69,9 +88,192 @@ def inject_table_css():
 # ===============================
 # Render Styled Table
 # ===============================
-def render_table(df):
-    html = df.to_html(index=False, classes="custom-table", border=0)
-    st.markdown(f"<div class='table-wrapper'>{html}</div>", unsafe_allow_html=True)
+def render_table(df, key="preprocessing_table"):
+    render_paginated_table(df, key=key)
+
+
+# ===============================
+# Imputation Stage
+# ===============================
+# Runs as a background job; the filled frame is built once, pinned, and
+# read by every analysis page through views.session.analysis_data().
+
+def missing_summary(df):
+    # Missing cells and affected rows from one mask
+    mask = df.isna().to_numpy()
+    return int(mask.sum()), int(mask.any(axis=1).sum())
+
+
+def render_imputation(df):
+    missing, rows_affected = cached_artifact(
+        "missing_summary", frame_key(df), lambda: missing_summary(df)
+    )
+    if missing == 0:
+        render_table(pd.DataFrame({"Status": ["No missing values found"]}), key="prep_impute_status")
+        return
+
+    st.caption(
+        f"{missing:,} missing cells in {rows_affected:,} rows "
+        f"({rows_affected / len(df):.1%} of rows would be dropped by complete-case analysis)."
+    )
+
+    method = st.radio(
+        "Imputation method (numeric columns; other columns take their most frequent value)",
+        list(METHODS),
+        format_func=METHODS.get,
+        key="impute_method"
+    )
+    n_neighbors = 5
+    if method == "knn":
+        n_neighbors = st.slider("Neighbours averaged per gap", 2, 20, 5, key="impute_neighbors")
+
+    c1, c2 = st.columns(2)
+    if c1.button("🩹 Apply imputation", key="impute_apply"):
+        st.session_state["impute_request"] = {
+            "token": frame_key(df), "method": method, "n_neighbors": n_neighbors
+        }
+    if c2.button("↩️ Use original data", key="impute_reset"):
+        st.session_state.pop("impute_request", None)
+        session_artifacts().pop("imputed_data")
+
+    request = st.session_state.get("impute_request")
+    if request is not None and request["token"] == frame_key(df):
+        result = background_result(
+            f"Imputation ({METHODS[request['method']]})",
+            impute_missing,
+            df,
+            request["method"],
+            source=request["token"],
+            n_neighbors=request["n_neighbors"]
+        )
+        if result is not None:
+            cached_artifact(
+                "imputed_data",
+                (frame_key(df), request["method"], request["n_neighbors"]),
+                lambda: {
+                    "frame": derived_frame(
+                        df,
+                        f"impute:{request['method']}:{request['n_neighbors']}",
+                        apply_fills(df, result["fills"])
+                    ),
+                    "label": METHODS[request["method"]],
+                    "report": result["report"]
+                },
+                pinned=True
+            )
+
+    imputed = active_imputation()
+    if imputed is not None:
+        st.success(f"Analysis pages now use the imputed data ({imputed['label']}).")
+        report = imputed["report"]
+        render_table(report[report["Missing"] > 0], key="prep_impute_report")
+
+
+# ===============================
+# Multivariate Outlier Stage
+# ===============================
+# Scores are computed once per (frame, feature set) as a background job;
+# changing the threshold or rule only re-compares the cached scores. The
+# exclusion is applied after imputation, on the same shared frame.
+
+def iqr_row_flags(df, features):
+    values = df[features].to_numpy(dtype=float, na_value=np.nan)
+    q1, q3 = np.nanquantile(values, [0.25, 0.75], axis=0)
+    spread = 1.5 * (q3 - q1)
+    return ((values < q1 - spread) | (values > q3 + spread)).any(axis=1)
+
+
+def render_outliers(df):
+    num_cols = df.select_dtypes(include=np.number).columns.tolist()
+    if len(num_cols) < 2:
+        st.info("At least two numerical columns are needed for multivariate outlier detection.")
+        return
+
+    features = st.multiselect(
+        "Columns to score", num_cols, default=num_cols, key="outlier_features"
+    )
+    if len(features) < 2:
+        st.warning("Please select at least two columns.")
+        return
+
+    if st.button("🎯 Detect outliers", key="outlier_detect"):
+        st.session_state["outlier_request"] = {"token": frame_key(df), "features": tuple(features)}
+
+    request = st.session_state.get("outlier_request")
+    if request is None or request["token"] != frame_key(df):
+        st.caption("Scores rows with Isolation Forest and a robust Mahalanobis distance.")
+        return
+
+    scores = background_result(
+        "Outlier scores", outlier_scores, df, list(request["features"]),
+        source=request["token"]
+    )
+    if scores is None:
+        return
+    if not len(scores["rows"]):
+        st.warning(
+            "Too few rows have a value in every selected column to score outliers. "
+            "Select fewer columns or impute the missing values first."
+        )
+        return
+
+    c1, c2 = st.columns(2)
+    alpha = c1.select_slider(
+        "Expected outlier share / significance",
+        options=[0.001, 0.005, 0.01, 0.02, 0.05, 0.1],
+        value=0.01,
+        key="outlier_alpha"
+    )
+    rule = c2.radio("Flag rows", list(RULES), format_func=RULES.get, key="outlier_rule")
+
+    mask = cached_artifact(
+        "outlier_mask",
+        (identity(scores), alpha, rule),
+        lambda: flag_outliers(scores, alpha, rule)
+    )
+    iqr_rows = cached_artifact(
+        "outlier_iqr_rows",
+        (frame_key(df), request["features"]),
+        lambda: int(iqr_row_flags(df, list(request["features"])).sum())
+    )
+
+    render_table(pd.DataFrame({
+        "Metric": [
+            "Rows flagged (multivariate)",
+            "Rows with any per-column IQR outlier",
+            "Rows not scored (missing values)"
+        ],
+        "Value": [
+            f"{int(mask.sum()):,} ({mask.mean():.1%})",
+            f"{iqr_rows:,} ({iqr_rows / len(df):.1%})",
+            f"{len(df) - len(scores['rows']):,}"
+        ]
+    }), key="prep_outlier_summary")
+
+    if mask.any():
+        render_table(score_table(df, scores, mask), key="prep_outlier_rows")
+
+    c1, c2 = st.columns(2)
+    if c1.button("🚫 Exclude flagged rows from the analysis pages", key="outlier_apply"):
+        put_artifact(
+            "outlier_filter",
+            ((frame_key(df), request["features"], alpha, rule), {
+                "frame": derived_frame(
+                    df, f"outliers:{request['features']}:{alpha}:{rule}", df[~mask]
+                ),
+                "excluded": int(mask.sum()),
+                "label": f"{RULES[rule]}, {alpha:g}"
+            }),
+            pinned=True
+        )
+    if c2.button("↩️ Keep all rows", key="outlier_reset"):
+        session_artifacts().pop("outlier_filter")
+
+    excluded = active_outlier_filter()
+    if excluded is not None:
+        st.success(
+            f"Analysis pages now leave out {excluded['excluded']:,} flagged rows ({excluded['label']})."
+        )
 
 
 # ===============================
@@ -93,30 +295,7 @@ def preprocessing_page():
     # =========================
     st.subheader("📌 Column-wise Data Quality Summary")
 
-    summary = []
-
-    for col in df.columns:
-        col_data = df[col]
-        missing_count = col_data.isnull().sum()
-
-        outliers = 0
-        if pd.api.types.is_numeric_dtype(col_data):
-            Q1 = col_data.quantile(0.25)
-            Q3 = col_data.quantile(0.75)
-            IQR = Q3 - Q1
-            lower = Q1 - 1.5 * IQR
-            upper = Q3 + 1.5 * IQR
-            outliers = col_data[(col_data < lower) | (col_data > upper)].count()
-
-        summary.append({
-            "Column Name": col,
-            "Data Type": col_data.dtype,
-            "Missing Values": missing_count,
-            "Outliers (IQR)": outliers,
-            "Unique Values": col_data.nunique()
-        })
-
-    render_table(pd.DataFrame(summary))
+    render_table(column_quality_summary(df), key="prep_summary")
 
     st.divider()
 
@@ -125,16 +304,38 @@ def preprocessing_page():
     # =========================
     st.subheader("🧬 Duplicate Records")
 
-    dup_count = df.duplicated().sum()
+    # Duplicate frame is built once per dataset, not on every rerun
+    dup_cache = get_artifact("duplicate_rows")
+    if dup_cache is None or dup_cache[0] != frame_key(df):
+        dup_cache = (frame_key(df), duplicate_rows(df))
+        put_artifact("duplicate_rows", dup_cache)
+    dup_df = dup_cache[1]
+    dup_count = len(dup_df)
 
     if dup_count > 0:
         render_table(pd.DataFrame({
             "Metric": ["Duplicate Rows Found"],
             "Value": [dup_count]
-        }))
-        render_table(df[df.duplicated()])
+        }), key="prep_dup_count")
+        render_table(dup_df, key="prep_duplicates")
     else:
-        render_table(pd.DataFrame({"Status": ["No duplicate rows found"]}))
+        render_table(pd.DataFrame({"Status": ["No duplicate rows found"]}), key="prep_dup_count")
+
+    st.divider()
+
+    # =========================
+    # Missing-Value Imputation
+    # =========================
+    st.subheader("🩹 Missing-Value Imputation")
+    render_imputation(df)
+
+    st.divider()
+
+    # =========================
+    # Multivariate Outliers
+    # =========================
+    st.subheader("🎯 Multivariate Outliers")
+    render_outliers(cleaned_data())
 
     st.divider()
 
@@ -172,7 +373,8 @@ def preprocessing_page():
                             f"<p style='text-align:center; font-weight:600; font-size:13px;'>{col_name}</p>",
                             unsafe_allow_html=True
                         )
-                        fig, ax = plt.subplots(figsize=(2.2, 2.2))
-                        ax.boxplot(df[col_name].dropna(), vert=True)
-                        ax.set_xticks([])
-                        st.pyplot(fig)
+                        with stage("boxplot"):
+                            fig, ax = plt.subplots(figsize=(2.2, 2.2))
+                            ax.boxplot(df[col_name].dropna(), vert=True)
+                            ax.set_xticks([])
+                            st.pyplot(fig)
@@ -0,0 +1,43 @@
+import os
+import threading
+
+import streamlit as st
+
+from engine.governor import get_governor, library_threads
+
+
+# ===============================
+# Admin: CPU Governor Panel
+# ===============================
+# Shown with ?admin=1 in the URL, or for everyone when SHOW_ADMIN_PANEL=1.
+
+def admin_enabled():
+    return os.environ.get("SHOW_ADMIN_PANEL") == "1" or st.query_params.get("admin") == "1"
+
+
+def render_resource_panel():
+    if not admin_enabled():
+        return
+
+    snap = get_governor().snapshot()
+    with st.sidebar.expander(f"🖥️ CPU Governor ({snap['in_use']}/{snap['slots']} slots)"):
+        c1, c2, c3 = st.columns(3)
+        c1.metric("Queue depth", snap["queue_depth"])
+        c2.metric("Jobs running", sum(r["Kind"] == "job" for r in snap["active"]))
+        c3.metric("Page stages", snap["interactive_runs"])
+        st.caption(
+            f"Per-session budget {snap['session_budget']} threads · "
+            f"{threading.active_count()} Python threads in the app process"
+        )
+
+        if snap["active"]:
+            st.markdown("**Running**")
+            st.dataframe(snap["active"], hide_index=True)
+        if snap["queued"]:
+            st.markdown("**Waiting (FIFO)**")
+            st.dataframe(snap["queued"], hide_index=True)
+
+        libraries = library_threads()
+        if libraries:
+            st.markdown("**BLAS / OpenMP pools (app process)**")
+            st.dataframe(libraries, hide_index=True)
@@ -0,0 +1,327 @@
+import os
+import weakref
+from contextlib import contextmanager
+
+import streamlit as st
+
+from engine.dataset import ArtifactStore, footprint
+from engine.store import content_key, get_dataset_store
+
+
+# ===============================
+# Per-session Memory Budget
+# ===============================
+# Derived artifacts (duplicate frames, table sort orders, ...) live in an
+# LRU store instead of loose session_state keys. When the artifacts of a
+# session grow past the budget, the least recently used ones are dropped
+# and rebuilt on demand. The uploaded dataset and the EDA working frame
+# are not counted against the budget and are never evicted; uploads are
+# shared across sessions through engine.store.
+
+DEFAULT_BUDGET_MB = int(os.environ.get("SESSION_MEMORY_BUDGET_MB", "512"))
+
+
+def session_artifacts():
+    store = st.session_state.get("_artifacts")
+    if store is None:
+        store = ArtifactStore(DEFAULT_BUDGET_MB * 1e6)
+        st.session_state["_artifacts"] = store
+    return store
+
+
+def put_artifact(name, value, pinned=False):
+    return session_artifacts().put(
+        name, value, pinned=pinned, base=st.session_state.get("data")
+    )
+
+
+def get_artifact(name, default=None):
+    return session_artifacts().get(name, default)
+
+
+# ===============================
+# Sidebar Memory Panel
+# ===============================
+def render_memory_panel():
+    store = session_artifacts()
+    base = st.session_state.get("data")
+    usage = store.usage(base)
+
+    base_mb = footprint(base) / 1e6 if base is not None else 0.0
+    work = modeling_data()
+    work_mb = footprint(base, work) / 1e6 - base_mb if work is not None else 0.0
+    artifacts_mb = sum(r["MB"] for r in usage)
+
+    with st.sidebar.expander(f"🧠 Session Memory ({base_mb + work_mb + artifacts_mb:.1f} MB)"):
+        budget_mb = st.number_input(
+            "Artifact budget (MB)",
+            min_value=16,
+            max_value=65536,
+            value=int(store.budget_bytes / 1e6),
+            step=64,
+            key="memory_budget_mb"
+        )
+        if budget_mb * 1e6 != store.budget_bytes:
+            store.budget_bytes = budget_mb * 1e6
+            store.enforce(base)
+            usage = store.usage(base)
+            artifacts_mb = sum(r["MB"] for r in usage)
+
+        st.caption(
+            f"Dataset {base_mb:.1f} MB · working frame +{work_mb:.1f} MB · "
+            f"artifacts {artifacts_mb:.1f} / {budget_mb} MB"
+        )
+        if usage:
+            st.dataframe(
+                [{**r, "MB": round(r["MB"], 2)} for r in reversed(usage)],
+                hide_index=True
+            )
+        if store.evicted:
+            st.caption(f"Evicted so far: {', '.join(store.evicted[-5:])}")
+
+        shared = get_dataset_store().entries()
+        if shared:
+            st.caption("Shared datasets (one read-only copy for all sessions)")
+            st.dataframe(
+                [{**e, "MB": round(e["MB"], 1)} for e in shared],
+                hide_index=True
+            )
+
+
+# ===============================
+# Cache Tokens
+# ===============================
+# Cached results are validated against what their inputs hold, never
+# against id(): once an object is garbage-collected its id can be reused
+# by a new one. Frames are keyed by content: an upload by its dataset
+# store content key, a frame derived from it in a deterministic step
+# (imputation, outlier exclusion) by its base's key plus a description
+# of the step, and any other frame by a hash of its content. Other
+# objects (label arrays, job results) are compared by identity through a
+# weak reference.
+
+def register_frame(df, key):
+    keys = st.session_state.setdefault("_frame_keys", {})
+    for k in [k for k, (ref, _) in keys.items() if ref() is None]:
+        del keys[k]
+    keys[id(df)] = (weakref.ref(df), key)
+    return df
+
+
+def derived_frame(base, step, frame):
+    return register_frame(frame, f"{frame_key(base)}|{step}")
+
+
+def frame_key(df):
+    from engine.jobs import fingerprint
+
+    entry = st.session_state.get("_frame_keys", {}).get(id(df))
+    if entry is not None and entry[0]() is df:
+        return entry[1]
+    return fingerprint(df)
+
+
+class _Identity:
+
+    def __init__(self, obj):
+        try:
+            self._ref = weakref.ref(obj)
+        except TypeError:
+            # dicts and tuples cannot be weakly referenced; hold them
+            self._ref = lambda: obj
+
+    def __eq__(self, other):
+        return (
+            isinstance(other, _Identity)
+            and self._ref() is not None
+            and self._ref() is other._ref()
+        )
+
+    def __hash__(self):
+        return id(self._ref())
+
+
+def identity(obj):
+    return _Identity(obj)
+
+
+# ===============================
+# Analysis Data
+# ===============================
+# The frame the analysis pages work on: the upload, with the imputation
+# and the outlier exclusion chosen on the preprocessing page applied once
+# and shared by every page. Both are pinned in the artifact store; the
+# imputed frame only holds copies of the columns that had gaps. Each
+# step is tied to the frame it was built from, so a new upload (or a new
+# imputation) switches the later steps off instead of mixing data.
+
+def active_imputation():
+    df = st.session_state.get("data")
+    cached = get_artifact("imputed_data")
+    if df is None or cached is None or cached[0][0] != frame_key(df):
+        return None
+    return cached[1]
+
+
+def cleaned_data():
+    imputed = active_imputation()
+    return imputed["frame"] if imputed is not None else st.session_state.get("data")
+
+
+def active_outlier_filter():
+    df = cleaned_data()
+    cached = get_artifact("outlier_filter")
+    if df is None or cached is None or cached[0][0] != frame_key(df):
+        return None
+    return cached[1]
+
+
+def analysis_data():
+    excluded = active_outlier_filter()
+    return excluded["frame"] if excluded is not None else cleaned_data()
+
+
+def modeling_data():
+    # The EDA working frame (df_temp): the analysis data without the
+    # columns dropped on the EDA page, rebuilt at use time so an
+    # imputation or exclusion applied afterwards is picked up
+    from engine.dataset import without
+
+    df = analysis_data()
+    drop = st.session_state.get("eda_drop_cols")
+    if df is None or drop is None:
+        return None
+    return without(df, drop)
+
+
+# ===============================
+# Session Identity
+# ===============================
+def session_id():
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+    ctx = get_script_run_ctx()
+    return ctx.session_id if ctx is not None else "-"
+
+
+# ===============================
+# CPU Leases
+# ===============================
+# Compute-heavy stages (fits, sweeps, projections) queue for CPU slots in
+# engine.governor alongside background jobs; the rest of a page renders
+# without waiting. Nested stages run under the outer lease.
+
+@contextmanager
+def cpu_lease(label):
+    from engine.governor import get_governor
+
+    if st.session_state.get("_cpu_lease"):
+        yield
+        return
+
+    wait = st.empty()
+    st.session_state["_cpu_lease"] = True
+    try:
+        with get_governor().interactive(
+            session_id(),
+            label=label,
+            waiting=lambda position: wait.info(f"⏳ Waiting for CPU (queue position {position})…")
+        ):
+            wait.empty()
+            yield
+    finally:
+        st.session_state["_cpu_lease"] = False
+
+
+# ===============================
+# Compute Precision
+# ===============================
+# The choice is applied by app.py before the page runs (it sets the
+# engine.precision context for this script run); changing it reruns the
+# script, so the page recomputes in the new precision.
+
+def render_precision_panel():
+    from engine.precision import PRECISIONS, DEFAULT_PRECISION, precision_report
+
+    with st.sidebar.expander("🎯 Compute Precision"):
+        options = list(PRECISIONS)
+        st.selectbox(
+            "Numeric precision",
+            options,
+            index=options.index(DEFAULT_PRECISION),
+            key="compute_precision",
+            help="float32 halves the memory of scaled data, PCA/factor scores and "
+                 "K-Means inputs and speeds them up. Correlations and eigen-"
+                 "decompositions always use float64."
+        )
+
+        df = st.session_state.get("data")
+        if df is None:
+            st.caption("Upload a dataset to validate float32 against float64.")
+            return
+        features = df.select_dtypes(include="number").columns.tolist()
+        if len(features) < 2:
+            st.caption("At least two numeric columns are needed for validation.")
+            return
+
+        if st.button("Validate float32 on a sample", key="precision_validate"):
+            report = precision_report(df, features)
+            put_artifact("precision_report", (frame_key(df), report))
+
+        cached = get_artifact("precision_report")
+        if cached is not None and cached[0] == frame_key(df):
+            report = cached[1]
+            st.caption(
+                f"{report['rows']:,} sampled rows · K-Means labels agree on "
+                f"{report['label_agreement']:.1%} · tolerance {report['tolerance']:g}"
+            )
+            st.dataframe(report["table"], hide_index=True)
+
+
+# ===============================
+# Shared Dataset Loading
+# ===============================
+def load_shared_dataset(uploaded_file):
+    from engine.io import read_table
+
+    # Hash the upload once per file, not on every rerun
+    cached = st.session_state.get("_upload_key")
+    if cached is None or cached[0] != uploaded_file.file_id:
+        cached = (uploaded_file.file_id, content_key(uploaded_file.getvalue(), uploaded_file.name))
+        st.session_state["_upload_key"] = cached
+
+    df = get_dataset_store().get_or_load(
+        cached[1],
+        lambda: read_table(uploaded_file),
+        name=uploaded_file.name
+    )
+    return register_frame(df, cached[1])
+
+
+# ===============================
+# Cached Correlation Moments
+# ===============================
+def cached_artifact(name, token, build, pinned=False, heavy=False):
+    # heavy: the build is a fit, sweep or full pass and takes a CPU lease
+    cached = get_artifact(name)
+    if cached is None or cached[0] != token:
+        if heavy:
+            with cpu_lease(name):
+                cached = (token, build())
+        else:
+            cached = (token, build())
+        put_artifact(name, cached, pinned=pinned)
+    return cached[1]
+
+
+def cached_comoments(df, features, pairwise=True):
+    # One pass over the rows per (dataset, feature set, missing-data mode);
+    # EDA, factor analysis and PCA all read from the same accumulator
+    from engine.correlation import accumulate_comoments
+
+    return cached_artifact(
+        f"comoments:{'pairwise' if pairwise else 'complete'}:{hash(tuple(features))}",
+        (frame_key(df), tuple(features)),
+        lambda: accumulate_comoments(df, features, pairwise=pairwise),
+        heavy=True
+    )
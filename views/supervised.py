@@ -1,17 +1,14 @@
 import streamlit as st
-import pandas as pd
-import numpy as np
-
-from sklearn.model_selection import train_test_split
-from sklearn.preprocessing import StandardScaler
-from sklearn.metrics import (
-    r2_score, mean_squared_error, mean_absolute_error,
-    accuracy_score, precision_score, recall_score, f1_score
-)
 
-from sklearn.linear_model import LinearRegression, Ridge, LogisticRegression
-from sklearn.ensemble import RandomForestRegressor, RandomForestClassifier
-from sklearn.neighbors import KNeighborsClassifier
+from engine.supervised import (
+    detect_problem_type,
+    model_catalog,
+    prepare_features,
+    train_and_evaluate,
+    best_model
+)
+from views.jobs_ui import background_result
+from views.session import analysis_data, frame_key, modeling_data
 
 
 def supervised_learning_page():
@@ -21,11 +18,11 @@ def supervised_learning_page():
     # ==================================================
     # CHECKS
     # ==================================================
-    if "df_temp" not in st.session_state or "target_var" not in st.session_state:
+    df = modeling_data()
+    if df is None or "target_var" not in st.session_state:
         st.warning("⚠️ Complete EDA first (df_temp / target variable missing).")
         return
 
-    df = st.session_state["df_temp"].copy()
     target = st.session_state["target_var"]
 
     if target not in df.columns:
@@ -36,13 +33,7 @@ def supervised_learning_page():
     # PROBLEM TYPE DETECTION (CORRECT LOGIC)
     # ==================================================
     unique_vals = df[target].nunique()
-
-    if unique_vals == 2:
-        problem_type = "Classification"
-    elif pd.api.types.is_numeric_dtype(df[target]):
-        problem_type = "Regression"
-    else:
-        problem_type = "Classification"
+    problem_type = detect_problem_type(df[target])
 
     st.success(
         f"Detected problem type: **{problem_type}** "
@@ -54,11 +45,8 @@ def supervised_learning_page():
     # ==================================================
     # FEATURE / TARGET SPLIT
     # ==================================================
-    X = df.drop(columns=[target])
-    y = df[target]
-
     # One-hot encode categorical features
-    X = pd.get_dummies(X, drop_first=True)
+    X, y = prepare_features(df, target)
 
     # ==================================================
     # TRAIN-TEST SPLIT
@@ -72,21 +60,6 @@ def supervised_learning_page():
         value=30
     ) / 100
 
-    X_train, X_test, y_train, y_test = train_test_split(
-        X,
-        y,
-        test_size=test_size,
-        random_state=42,
-        stratify=y if problem_type == "Classification" else None
-    )
-
-    # ==================================================
-    # SCALING
-    # ==================================================
-    scaler = StandardScaler()
-    X_train_scaled = scaler.fit_transform(X_train)
-    X_test_scaled = scaler.transform(X_test)
-
     st.divider()
 
     # ==================================================
@@ -94,24 +67,7 @@ def supervised_learning_page():
     # ==================================================
     st.subheader("🧠 Select Models")
 
-    if problem_type == "Regression":
-        model_options = {
-            "Linear Regression": LinearRegression(),
-            "Ridge Regression": Ridge(alpha=1.0),
-            "Random Forest Regressor": RandomForestRegressor(
-                n_estimators=100,
-                random_state=42
-            )
-        }
-    else:
-        model_options = {
-            "Logistic Regression": LogisticRegression(max_iter=1000),
-            "KNN Classifier": KNeighborsClassifier(n_neighbors=5),
-            "Random Forest Classifier": RandomForestClassifier(
-                n_estimators=100,
-                random_state=42
-            )
-        }
+    model_options = model_catalog(problem_type)
 
     selected_models = st.multiselect(
         "Choose models to train:",
@@ -130,47 +86,19 @@ def supervised_learning_page():
     # ==================================================
     st.subheader("📊 Model Performance")
 
-    results = []
-
-    for model_name in selected_models:
-        model = model_options[model_name]
-
-        # Models that require scaling
-        if model_name in [
-            "Linear Regression",
-            "Ridge Regression",
-            "Logistic Regression",
-            "KNN Classifier"
-        ]:
-            model.fit(X_train_scaled, y_train)
-            y_pred = model.predict(X_test_scaled)
-        else:
-            model.fit(X_train, y_train)
-            y_pred = model.predict(X_test)
-
-        if problem_type == "Regression":
-            results.append({
-                "Model": model_name,
-                "R²": r2_score(y_test, y_pred),
-                "RMSE": np.sqrt(mean_squared_error(y_test, y_pred)),
-                "MAE": mean_absolute_error(y_test, y_pred)
-            })
-        else:
-            results.append({
-                "Model": model_name,
-                "Accuracy": accuracy_score(y_test, y_pred),
-                "Precision": precision_score(
-                    y_test, y_pred, average="weighted", zero_division=0
-                ),
-                "Recall": recall_score(
-                    y_test, y_pred, average="weighted", zero_division=0
-                ),
-                "F1 Score": f1_score(
-                    y_test, y_pred, average="weighted", zero_division=0
-                )
-            })
-
-    results_df = pd.DataFrame(results)
+    results_df = background_result(
+        "Model training",
+        train_and_evaluate,
+        X,
+        y,
+        problem_type,
+        model_names=selected_models,
+        test_size=test_size,
+        source=(frame_key(analysis_data()), tuple(st.session_state["eda_drop_cols"]), target)
+    )
+    if results_df is None:
+        return
+
     st.dataframe(results_df, use_container_width=True)
 
     st.divider()
@@ -180,12 +108,7 @@ def supervised_learning_page():
     # ==================================================
     st.subheader("🏆 Best Model")
 
-    if problem_type == "Regression":
-        best_row = results_df.sort_values(by="R²", ascending=False).iloc[0]
-        primary_metric = "R²"
-    else:
-        best_row = results_df.sort_values(by="F1 Score", ascending=False).iloc[0]
-        primary_metric = "F1 Score"
+    best_row, primary_metric = best_model(results_df, problem_type)
 
     st.success(
         f"Best Model: **{best_row['Model']}** "
@@ -2,6 +2,10 @@ import streamlit as st
 import pandas as pd
 import numpy as np
 
+from views.components import render_paginated_table
+from views.session import load_shared_dataset
+from engine.profiling import dataset_overview
+
 
 # ===============================
 # CSS (TABLE + BUTTON STYLING)
@@ -66,9 +70,8 @@ def inject_css():
     """, unsafe_allow_html=True)
 
 
-def render_compact_table(df):
-    html = df.to_html(index=False, classes="custom-table", border=0)
-    st.markdown(f"<div class='table-wrapper'>{html}</div>", unsafe_allow_html=True)
+def render_compact_table(df, key="upload_table"):
+    render_paginated_table(df, key=key)
 
 
 # ===============================
@@ -93,7 +96,7 @@ def upload_page():
     if not uploaded_file:
         return
 
-    df = pd.read_csv(uploaded_file)
+    df = load_shared_dataset(uploaded_file)
     st.session_state["data"] = df
     st.success("✅ Dataset uploaded successfully!")
 
@@ -101,7 +104,7 @@ def upload_page():
     # Preview
     # ===============================
     st.subheader("🔍 Preview of Data")
-    render_compact_table(df.head())
+    render_compact_table(df.head(), key="upload_preview")
 
     st.divider()
 
@@ -110,22 +113,9 @@ def upload_page():
     # ===============================
     st.subheader("📊 Dataset Overview")
 
-    overview_df = pd.DataFrame({
-        "Metric": [
-            "Total Rows",
-            "Total Columns",
-            "Numerical Columns",
-            "Categorical Columns"
-        ],
-        "Value": [
-            df.shape[0],
-            df.shape[1],
-            df.select_dtypes(include=np.number).shape[1],
-            df.select_dtypes(exclude=np.number).shape[1]
-        ]
-    })
-
-    render_compact_table(overview_df)
+    overview_df = dataset_overview(df)
+
+    render_compact_table(overview_df, key="upload_overview")
 
     st.divider()
 
@@ -152,7 +142,7 @@ def upload_page():
             "Index": range(1, len(num_cols) + 1),
             "Numerical Columns": num_cols
         })
-        render_compact_table(num_df)
+        render_compact_table(num_df, key="upload_num_cols")
 
     # ---------- CATEGORICAL ----------
     with st.form("categorical_form"):
@@ -167,4 +157,4 @@ def upload_page():
             "Index": range(1, len(cat_cols) + 1),
             "Categorical Columns": cat_cols
         })
-        render_compact_table(cat_df)
+        render_compact_table(cat_df, key="upload_cat_cols")